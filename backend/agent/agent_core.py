@@ -1,76 +1,36 @@
 from __future__ import annotations
 
-import re
-from typing import Any, Dict, List, Optional, Tuple
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Generator, List, Optional, Tuple
 
+from agent import history
 from agent.data_processing import (
     prepare_case_data,
     prepare_followup_context,
     prepare_knowledge_article_data,
 )
-from agent.memory import MemoryStore
-
-
-_CASE_NUMBER_RE = re.compile(r"\b\d+\b")
-# Typical Salesforce Case Ids start with '500' and must be 18 characters long
-_CASE_ID_RE = re.compile(r"\b500[0-9A-Za-z]{15}\b")
-
-
-def _extract_case_number(text: str) -> Optional[str]:
-    """
-    Extract a numeric case number (like 00001159).
-    """
-    if not text:
-        return None
-    
-    # Look for patterns like "case 00001159" or "CaseNumber = 00001159"
-    case_num_pattern = re.search(r"(?:case|casenumber)\s*[=:]?\s*(\d+)", text, re.IGNORECASE)
-    if case_num_pattern:
-        return case_num_pattern.group(1)
-    
-    # Fallback: any standalone number (but be more specific)
-    standalone_num = re.search(r"\b(\d{5,10})\b", text)
-    if standalone_num:
-        return standalone_num.group(1)
-    
-    return None
-
-
-def _extract_case_id(text: str) -> Optional[str]:
-    m = _CASE_ID_RE.search(text or "")
-    return m.group(0) if m else None
-
+from agent.instructions import INSTRUCTIONS
+from agent.intent_router import (
+    CASE_PARTS as _CASE_PARTS,
+    FULL_CONTEXT_PHRASES as _FULL_CONTEXT_PHRASES,
+    extract_case_id as _extract_case_id,
+    extract_case_number as _extract_case_number,
+    extract_compliance_number as _extract_compliance_number,
+    extract_primary_token as _extract_primary_token,
+    extract_subject as _extract_subject,
+    requested_parts as _requested_parts,
+    route,
+)
+from agent.memory import SessionState, SessionStore
+from agent.search_strategy import SearchRace
+from agent.session_locks import session_locks
+from observability.log import get_logger
+from observability.tracing import observe_stage, record_query, span
 
-def _extract_primary_token(text: str) -> Optional[str]:
-    """
-    Extract a 9–18 character alphanumeric token that could be a Case Id.
-    Prioritize tokens that look like Salesforce IDs (start with numbers or specific patterns).
-    """
-    if not text:
-        return None
-    
-    # First, try to find a proper Salesforce Case ID (starts with 500, 18 chars)
-    case_id_match = _CASE_ID_RE.search(text)
-    if case_id_match:
-        return case_id_match.group(0)
-    
-    # Then, look for any 15-18 character alphanumeric token that looks like an ID
-    # Must start with a number or contain mixed alphanumeric (not just letters)
-    long_id_matches = re.findall(r"\b[A-Za-z0-9]{15,18}\b", text)
-    for token in long_id_matches:
-        # Skip pure alphabetic words (like 'troubleshooting')
-        if not token.isalpha() and not token.lower() in ['salesforce', 'casenumber']:
-            return token
-    
-    # Finally, look for 9-14 character tokens that look like IDs
-    # medium_token_matches = re.findall(r"\b[A-Za-z0-9]{9,14}\b", text)
-    # for token in medium_token_matches:
-    #     # Skip common words and pure alphabetic tokens
-    #     if (not token.isalpha() and 
-    #         token.lower() not in ['salesforce', 'casenumber', 'case', 'troubleshooting']):
-    #         return token
-    
-    return None
+log = get_logger(__name__)
 
 
 def _looks_like_confirmation(text: str) -> Optional[bool]:
@@ -93,104 +53,45 @@ def _case_response_payload(*, case: Dict[str, Any], case_data: Dict[str, Any], s
         "case_number": case.get("CaseNumber"),
         "case_data": case_data,
         "raw_case": case,
-        "instructions": """CRITICAL: You MUST format your response using exactly this 4-section structure with clear headers. Do not provide a simple summary - always use the full structure:
-
-## 1️⃣ Case Summarization & Contextualization
-   - Brief overview of the case type and current state
-   - Context about customer situation and case history
-   - Address the user's specific question in context
-
-## 2️⃣ Technical Case Summary
-   - Issue Type: [Category/Area]
-   - Fix Status: [Current status]
-   - Validation Status: [Testing/verification state]
-   - Current State: [What's happening now]
-   - Closure Dependency: [What's needed for closure]
-
-## 3️⃣ Troubleshooting / Resolution Recommendation Steps
-   - List specific steps to resolve or progress the case
-   - Include validation and verification steps
-   - Mention any dependencies or prerequisites
-   - Address any specific actions related to the user's query
-
-## 4️⃣ Action
-   - Clear next steps to take
-   - Who should do what
-   - Timeline considerations
-   - Specific actions related to the user's question
-
-NEVER provide just a simple status message. Always use this complete 4-section structure even for basic status requests."""
+        "instructions": INSTRUCTIONS["case_response"].text,
+        "instructions_ref": INSTRUCTIONS["case_response"].ref,
     }
 
 
-def _technical_followup_payload(*, case_data: Dict[str, Any], session_id: str, user_question: str) -> Dict[str, Any]:
-    return {
+def _technical_followup_payload(
+    *, context: Dict[str, Any], session_id: str, user_question: str, context_version: str
+) -> Dict[str, Any]:
+    payload = {
         "type": "technical_followup",
         "session_id": session_id,
-        "case_data": case_data,
         "user_question": user_question,
-        "instructions": """This is a follow-up on an existing technical case. Structure your response with these 4 sections:
-
-1. Case Summarization & Contextualization
-   - Summarize the ongoing technical case and current status
-   - Contextualize the customer's follow-up question
-   - Reference any previous work done
-
-2. Technical Case Summary
-   - Issue Type: [Firmware/SDK/Runtime/etc.]
-   - Fix Status: [Implemented/In Progress/Pending/etc.]
-   - Validation Status: [Testing Complete/In Progress/Pending/etc.]
-   - Current State: [Monitoring/Closed/Open/etc.]
-   - Closure Dependency: [What's needed before case closure]
-
-3. Troubleshooting / Resolution Recommendation Steps
-   - Review previously implemented changes
-   - Verify testing results and current status
-   - List steps to confirm resolution or next actions
-   - Include any monitoring or validation steps
-
-4. Action
-   - Immediate next steps required
-   - Who should take action and when
-   - Communication plan for case closure
-   - Timeline considerations
-
-Always include a knowledge article prompt at the end: 'This resolved technical issue can be reused as a reference. Would you like to convert this solution into a Knowledge Article for future cases?'"""
+        "context_version": context_version,
+        "instructions": INSTRUCTIONS["technical_followup"].text,
+        "instructions_ref": INSTRUCTIONS["technical_followup"].ref,
     }
+    if "context_base" in context:
+        payload["context_base"] = context["context_base"]
+    else:
+        payload["case_data"] = context["case_context"]
+    return payload
 
 
 def _followup_answer_payload(
-    *, context_data: Dict[str, Any], session_id: str, stored: bool, new_qa: Optional[Dict[str, str]] = None
+    *,
+    context_data: Dict[str, Any],
+    session_id: str,
+    stored: bool,
+    context_version: str,
+    new_qa: Optional[Dict[str, str]] = None,
 ) -> Dict[str, Any]:
     payload = {
         "type": "followup_answer",
         "session_id": session_id,
         "context_data": context_data,
+        "context_version": context_version,
         "stored_as_conversation": stored,
-        "instructions": """Use the case context and conversation history to answer the user's question. For technical follow-up cases, structure your response with these 4 sections:
-
-1. Case Summarization & Contextualization
-   - Current case status and what has been done
-   - Customer's specific follow-up question context
-
-2. Technical Case Summary
-   - Issue Type: [Category/Area]
-   - Fix Status: [What's been implemented]
-   - Validation Status: [Testing/monitoring state]
-   - Current State: [Current situation]
-   - Closure Dependency: [What's needed for closure]
-
-3. Troubleshooting / Resolution Recommendation Steps
-   - Review what has been done
-   - Verify current status
-   - Confirm next steps needed
-
-4. Action
-   - Immediate next steps
-   - Timeline for completion
-   - Communication plan
-
-If you need more information, ask specific follow-up questions."""
+        "instructions": INSTRUCTIONS["followup_answer"].text,
+        "instructions_ref": INSTRUCTIONS["followup_answer"].ref,
     }
     if new_qa:
         payload["new_qa_pair"] = new_qa
@@ -202,15 +103,16 @@ def _knowledge_article_payload(*, article_data: Dict[str, Any], session_id: str)
         "type": "knowledge_article", 
         "session_id": session_id, 
         "article_data": article_data,
-        "instructions": "Create a knowledge article based on this case data and conversation. Include: title, problem statement, environment, symptoms, root cause, resolution steps, verification steps, and prevention notes."
+        "instructions": INSTRUCTIONS["knowledge_article"].text,
+        "instructions_ref": INSTRUCTIONS["knowledge_article"].ref,
     }
 
 
 def _load_case_by_number(case_number: str) -> Tuple[Optional[Dict[str, Any]], str, Optional[str]]:
     try:
-        from salesforce import case_queries  # lazy import
+        from salesforce import case_cache  # lazy import
 
-        sf_cases = case_queries.get_case(case_number)
+        sf_cases = case_cache.get_case(case_number)
         if sf_cases:
             return sf_cases[0], "salesforce", None
         # Explicitly indicate that Salesforce returned no rows
@@ -222,9 +124,9 @@ def _load_case_by_number(case_number: str) -> Tuple[Optional[Dict[str, Any]], st
 
 def _load_case_by_id(case_id: str) -> Tuple[Optional[Dict[str, Any]], str, Optional[str]]:
     try:
-        from salesforce import case_queries  # lazy import
+        from salesforce import case_cache  # lazy import
 
-        sf_cases = case_queries.get_case_with_id(case_id)
+        sf_cases = case_cache.get_case_with_id(case_id)
         if sf_cases:
             return sf_cases[0], "salesforce", None
         return None, "salesforce_empty", None
@@ -237,7 +139,7 @@ def _load_case_comments(case_id: str) -> Tuple[List[Dict[str, Any]], str, Option
         from salesforce import case_queries  # lazy import
 
         records = case_queries.get_case_comments(case_id)
-        print(records,"records")
+        log.debug("Loaded case comments", case_id=case_id, count=len(records or []), records=records)
         return records or [], "salesforce", None
     except Exception as e:
         return [], "salesforce_error", f"{type(e).__name__}: {e}"
@@ -263,124 +165,297 @@ def _load_case_feed(case_id: str) -> Tuple[List[Dict[str, Any]], str, Optional[s
         return [], "salesforce_error", f"{type(e).__name__}: {e}"
 
 
-def _search_cases(search_text: str) -> List[Dict[str, Any]]:
+# Query focus used for each related collection that can be fetched alongside a case.
+_PART_FOCUS = {
+    "comments": "Focus on analyzing the case comments in your response while maintaining the full 4-section structure. Include comment analysis in section 1 (contextualization) and relevant actions in section 4.",
+    "history": "Focus on analyzing the case history and changes in your response while maintaining the full 4-section structure. Include history analysis in section 1 (contextualization) and track progress in section 2.",
+    "feed": "Focus on analyzing the case feed activities in your response while maintaining the full 4-section structure. Include feed activity analysis in section 1 (contextualization) and relevant insights in section 3.",
+}
+
+# "parallel" runs one query per part concurrently; "subquery" fetches the case and its
+# related collections in a single SOQL statement (Composite API fallback).
+_FETCH_MODE = os.getenv("SF_CASE_FETCH_MODE", "parallel").lower()
+
+_BUNDLE_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CASE_BUNDLE_WORKERS", "8")), thread_name_prefix="case-bundle"
+)
+# Subject searches race three backends and leave the losers running, so they get their own
+# pool: a burst of searches must not hold up comments/history/feed loads.
+_SEARCH_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SUBJECT_SEARCH_WORKERS", "6")), thread_name_prefix="subject-search"
+)
+
+
+@dataclass
+class CaseBundle:
+    """A case plus any related collections, with errors reported per part."""
+
+    case: Optional[Dict[str, Any]]
+    source: str
+    detail: Optional[str]
+    parts: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+def _load_case_bundle(
+    *,
+    case_id: Optional[str] = None,
+    case_number: Optional[str] = None,
+    case: Optional[Dict[str, Any]] = None,
+    parts: Tuple[str, ...] = (),
+) -> CaseBundle:
+    """
+    Load a case and the requested related collections concurrently.
+    With a Case Id (or an already loaded case) everything runs in parallel; with only a
+    CaseNumber the case is resolved first (usually from the cache) and the parts then run in parallel.
+    """
+    if _FETCH_MODE == "subquery" and parts and (case_id or case_number or case):
+        return _load_case_with_related(
+            case_id=case_id or (case or {}).get("Id"), case_number=case_number, parts=parts
+        )
+
+    loaders = {"comments": _load_case_comments, "history": _load_case_history, "feed": _load_case_feed}
+    case_future = None
+    source, detail = "salesforce", None
+    if case is None:
+        if case_id:
+            case_future = _BUNDLE_POOL.submit(_load_case_by_id, case_id)
+        elif case_number:
+            case, source, detail = _load_case_by_number(case_number)
+        else:
+            return CaseBundle(case=None, source="", detail=None)
+
+    parent_id = case_id or (case or {}).get("Id")
+    part_futures = {part: _BUNDLE_POOL.submit(loaders[part], parent_id) for part in parts} if parent_id else {}
+    if case_future is not None:
+        case, source, detail = case_future.result()
+
+    bundle = CaseBundle(case=case, source=source, detail=detail)
+    if case is None:
+        return bundle
+    for part, future in part_futures.items():
+        records, part_source, part_detail = future.result()
+        if part_source == "salesforce_error":
+            bundle.errors[part] = part_detail or "unknown error"
+        else:
+            bundle.parts[part] = records
+    return bundle
+
+
+def _load_case_with_related(
+    *, case_id: Optional[str], case_number: Optional[str], parts: Tuple[str, ...]
+) -> CaseBundle:
+    try:
+        from salesforce import case_cache, case_queries  # lazy import
+
+        case, related, errors = case_queries.get_case_with_related(
+            case_id=case_id, case_number=case_number, parts=parts
+        )
+    except Exception as e:
+        return CaseBundle(case=None, source="salesforce_error", detail=f"{type(e).__name__}: {e}")
+    if case is None:
+        return CaseBundle(case=None, source="salesforce_empty", detail=None)
+    case_cache.case_cache.put(case)
+    return CaseBundle(case=case, source="salesforce", detail=None, parts=related, errors=errors)
+
+
+def _search_cases(search_text: str, fields: str = "full") -> List[Dict[str, Any]]:
     try:
         from salesforce import case_queries  # lazy import
 
-        return case_queries.find_case(search_text)
+        return case_queries.find_case(search_text, fields)
     except Exception:
         return []
 
-def _extract_compliance_number(q: str) -> Optional[str]:
-    """Extract compliance number from various patterns"""
-    import re
-    # Look for patterns like "compliance 123", "compliance: ABC-123", "compliance number XYZ"
-    patterns = [
-        r'\bcompliance[\s:-]*(?:number[\s:-]*)?([A-Za-z0-9-_]+)',
-        r'\bcomp[\s:-]*(?:num[\s:-]*)?([A-Za-z0-9-_]+)',
-        r'\b([A-Za-z]{2,4}-\d{3,6})\b',  # Pattern like ABC-1234
-        r'\b(C\d{4,8})\b',  # Pattern like C12345
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, q, re.I)
-        if match:
-            return match.group(1)
-    return None
 
-def _load_case_by_compliance(compliance_no):
+def _search_mirror(text: str, *, phrase: bool, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+    """Answer a text search from the local case mirror; None means fall through to Salesforce."""
+    try:
+        from salesforce import case_mirror  # lazy import
+
+        return case_mirror.search_local(text, phrase=phrase, limit=limit)
+    except Exception as e:
+        log.warning("⚠️ Case mirror unavailable", error=f"{type(e).__name__}: {e}")
+        return None
+
+
+def _load_case_by_compliance(compliance_no, fields: str = "full"):
+    local = _search_mirror(compliance_no, phrase=True)
+    if local:
+        return local, "local_mirror", None
 
     try:
         from salesforce import case_queries  # lazy import
-        print(compliance_no, "compliance_no")
-        records = case_queries.get_case_by_compliance(compliance_no)
+
+        log.debug("Searching by compliance number", compliance_no=compliance_no)
+        records = case_queries.get_case_by_compliance(compliance_no, fields)
         return records or [], "salesforce", None
     except Exception as e:
         return [], "salesforce_error", f"{type(e).__name__}: {e}"
     
-from typing import Optional
-import re
-
-def _extract_subject(q: str) -> Optional[str]:
-    print(f"🔍 Extracting subject from: '{q}'")
-
-    q = q.strip().lower()
-
-    # Expanded list of command/filler phrases
-    command_phrases = [
-        "get me the details for",
-        "get me case details for",
-        "need details for",
-        "need case details for",
-        "show me details for",
-        "show case details for",
-        "fetch details for",
-        "find details for",
-        "case details for",
-        "details for",
-        "information about",
-        "information regarding",
-        "please show",
-        "please get",
-        "please fetch",
-    ]
-
-    # Remove any matching command phrase at the start
-    for phrase in command_phrases:
-        if q.startswith(phrase):
-            q = q[len(phrase):].strip()
-            break
-
-    # Remove single command words
-    command_words = {
-        "get", "show", "find", "search", "fetch", "display",
-        "case", "cases", "details", "information",
-        "about", "regarding", "subject",
-        "status", "please", "me", "for"
+def _load_in_progress_cases(fields: str = "status") -> Tuple[List[Dict[str, Any]], str, Optional[str]]:
+    try:
+        from salesforce import case_queries  # lazy import
+
+        records = case_queries.list_cases_by_status(["Working", "In Progress"], limit=20, fields=fields)
+        return records or [], "salesforce", None
+    except Exception as e:
+        return [], "salesforce_error", f"{type(e).__name__}: {e}"
+
+
+def _subject_backends(subject: str, fields: str) -> Dict[str, Any]:
+    """Zero-argument callables for each search_strategy.SUBJECT_BACKENDS entry."""
+    from salesforce import case_queries  # lazy import
+
+    return {
+        "sosl_subject": lambda: case_queries.get_case_by_subject(subject, fields),
+        "keywords": lambda: case_queries.search_cases_by_keywords(subject, fields=fields),
+        "find_case": lambda: case_queries.find_case(subject, fields),
     }
 
-    words = q.split()
-    cleaned_words = [w for w in words if w not in command_words]
 
-    # Remove case numbers or IDs
-    cleaned_words = [
-        w for w in cleaned_words
-        if not re.fullmatch(r"[A-Za-z0-9]{9,18}", w)
-    ]
+def _search_by_subject(subject: str, fields: str = "full") -> Tuple[List[Dict[str, Any]], str, Optional[str]]:
+    """
+    Run the subject SOSL, keyword SOQL and free-text SOSL searches concurrently and
+    return the merged, ranked hits once the best available backend has answered.
+    """
+    local = _search_mirror(subject, phrase=False)
+    if local:
+        return local, "local_mirror", None
+
+    try:
+        backends = _subject_backends(subject, fields)
+    except Exception as e:
+        return [], "salesforce_error", f"{type(e).__name__}: {e}"
+    race = SearchRace()
+    futures = {_SEARCH_POOL.submit(fn): name for name, fn in backends.items()}
+    pending = set(futures)
+    while pending and not race.settled:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                race.record(futures[future], future.result())
+            except Exception as e:
+                race.record_error(futures[future], e)
+    # Queries already running on a worker cannot be interrupted; their results are dropped
+    for future in pending:
+        future.cancel()
+    log.info("🏁 Subject search settled", **race.summary(sorted(futures[f] for f in pending)))
+    return race.outcome(subject)
+
+
+def _prefetch_cases(case_ids: List[str]) -> List[str]:
+    """Warm the case cache with listed candidates in the background; returns without waiting."""
+    try:
+        from salesforce import case_cache  # lazy import
+
+        return case_cache.prefetch_cases(case_ids)
+    except Exception as e:
+        log.warning("⚠️ Candidate prefetch failed", error=f"{type(e).__name__}: {e}")
+        return []
+
 
-    # Strip leading stopwords like "the", "a", "an"
-    while cleaned_words and cleaned_words[0] in {"the", "a", "an"}:
-        cleaned_words.pop(0)
+# Salesforce work requested by _query_flow, by name. The flow yields (op, kwargs) and is
+# resumed with the result, so the sync and async handlers share one routing implementation.
+_SYNC_OPS = {
+    "bundle": _load_case_bundle,
+    "compliance": _load_case_by_compliance,
+    "subject": _search_by_subject,
+    "in_progress": _load_in_progress_cases,
+    "search": _search_cases,
+    "prefetch": _prefetch_cases,
+}
 
-    subject = " ".join(cleaned_words).strip()
+# Narrowest Case projection (salesforce.soql.CASE_FIELD_SETS) each kind of answer needs:
+# a single case gets the full response, candidate lists and list views do not show Description.
+_PROJECTIONS = {"case": "full", "candidates": "summary", "list": "status"}
 
-    if subject and len(subject) >= 2:
-        print(f"✅ Extracted subject: '{subject}'")
-        return subject
 
-    print("❌ No subject extracted")
+def _has_projection(record: Dict[str, Any], field_set: str) -> bool:
+    from salesforce import soql  # lazy import
+
+    return soql.has_fields(record, field_set)
+
+
+QueryFlow = Generator[Tuple[str, Dict[str, Any]], Any, Dict[str, Any]]
+
+
+def _pick_candidate(candidates: List[Dict[str, Any]], intent: Any) -> Optional[Dict[str, Any]]:
+    """The listed case a reply refers to, by position ("the second one") or by CaseNumber."""
+    if not candidates:
+        return None
+    ordinal = intent.ordinal
+    if ordinal is not None:
+        if ordinal == -1 or ordinal <= len(candidates):
+            return candidates[ordinal - 1 if ordinal > 0 else -1]
+        return None
+    if intent.case_number:
+        return next((c for c in candidates if c.get("CaseNumber") == intent.case_number), None)
     return None
 
-def _load_case_by_subject(subject: str):
 
-    try: 
+def _remember_candidates(state: SessionState, candidates: List[Dict[str, Any]]) -> QueryFlow:
+    """Keep a listed set of cases on the session and prefetch their full records."""
+    state.candidates = candidates
+    case_ids = [c["Id"] for c in candidates if c.get("Id")]
+    if case_ids:
+        yield "prefetch", {"case_ids": case_ids}
 
-        from salesforce import case_queries  # lazy import
-        print(subject, "subject")
-        records = case_queries.get_case_by_subject(subject)
-        print(records,"records")
-        return records or [], "salesforce", None
-    except Exception as e:
-        return [], "salesforce_error", f"{type(e).__name__}: {e}"
-    
 
-def handle_user_query(*, user_query: str, session_id: str, memory: MemoryStore) -> Dict[str, Any]:
+def _load_outcome(result: Any) -> str:
+    """Stage outcome of a Salesforce op; loaders report failures as a source, not an exception."""
+    if isinstance(result, CaseBundle):
+        source = result.source
+    elif isinstance(result, tuple):
+        source = result[1]
+    else:
+        source = "salesforce"
+    return "error" if source == "salesforce_error" else "ok"
+
+
+def handle_user_query(
+    *, user_query: str, session_id: str, memory: SessionStore, context_version: Optional[str] = None
+) -> Dict[str, Any]:
+    started = step = time.perf_counter()
+    with session_locks.hold(session_id or "default"):
+        flow = _query_flow(user_query=user_query, session_id=session_id, memory=memory, context_version=context_version)
+        try:
+            op, kwargs = next(flow)
+            while True:
+                with span(f"load.{op}") as load:
+                    result = _SYNC_OPS[op](**kwargs)
+                    load.outcome = _load_outcome(result)
+                step = time.perf_counter()
+                op, kwargs = flow.send(result)
+        except StopIteration as done:
+            payload = done.value
+    # The last resumption of the flow, after the final Salesforce result, builds the payload
+    observe_stage("payload", time.perf_counter() - step)
+    record_query(payload, time.perf_counter() - started)
+    return payload
+
+
+def _query_flow(
+    *, user_query: str, session_id: str, memory: SessionStore, context_version: Optional[str] = None
+) -> QueryFlow:
     state = memory.get(session_id)
-    q = (user_query or "").strip()
-    q_lower = q.lower()
-    print(q_lower, "q_lower in the handle")
-    wants_status = "status" in q_lower and ("case" in q_lower or _extract_primary_token(q) is not None)
-    wants_in_progress = ("in progress" in q_lower) or ("in-progress" in q_lower) or ("working" in q_lower)
+    try:
+        return (yield from _route_query(
+            state, user_query=user_query, session_id=session_id, context_version=context_version
+        ))
+    finally:
+        # Re-measures the session and applies the store's limits, also when the query failed
+        memory.save(state)
+
+
+def _route_query(
+    state: SessionState, *, user_query: str, session_id: str, context_version: Optional[str] = None
+) -> QueryFlow:
+    with span("intent"):
+        intent = route(user_query, has_case_context=bool(state.case_data))
+    q = intent.text
+    parts = intent.parts
+    log.debug("Query received", session_id=session_id, query=q)
 
     if state.pending_knowledge_article is not None:
         conf = _looks_like_confirmation(q)
@@ -389,6 +464,7 @@ def handle_user_query(*, user_query: str, session_id: str, memory: MemoryStore)
                 case_data=state.case_data or {},
                 conversation_history=state.level2_qa,
                 title_hint=(state.case_data or {}).get("subject"),
+                earlier_turns=state.history_digest,
             )
             state.pending_knowledge_article = None
             return _knowledge_article_payload(article_data=article_data, session_id=session_id)
@@ -401,7 +477,7 @@ def handle_user_query(*, user_query: str, session_id: str, memory: MemoryStore)
             questions=["Reply 'confirm' to generate it, or 'cancel' to skip."],
         )
 
-    if "knowledge article" in q_lower or "kb" in q_lower or "convert" in q_lower:
+    if intent.wants_kb:
         if not state.level1_case_pack:
             return _clarification_payload(
                 session_id=session_id,
@@ -418,82 +494,62 @@ def handle_user_query(*, user_query: str, session_id: str, memory: MemoryStore)
             questions=["Reply 'confirm' to generate the knowledge article draft, or 'cancel'."],
         )
 
-    primary_token = _extract_primary_token(q)
-    compliance_no = _extract_compliance_number(q)
-    print(compliance_no, "compliance_no after extraction")
-    subject = _extract_subject(q)
-    print(f"🔍 Case detection debug:")
-    print(f"   Input query: '{q}'")
-    print(f"   Primary token: '{primary_token}'")
-    print(f"   Primary token length: {len(primary_token) if primary_token else 'None'}")
-
     # Business rule:
     # - If the primary token is 18 chars long, treat it as Case Id
     # - If it is between 9 and 17 characters and looks like an ID, it is probably an invalid Case Id
     #   → ask the user to enter the correct Case Id instead of treating it as a CaseNumber
     # - Otherwise, treat it as CaseNumber (no strict length limit)
-    if primary_token:
-        if len(primary_token) == 18:
-            case_id = primary_token
-            case_number = None
-            print(f"   → Treating as Case ID: {case_id}")
-        elif 9 <= len(primary_token) < 18:
-            print(f"   → Invalid Case ID length, asking for clarification")
-            return _clarification_payload(
-                session_id=session_id,
-                message="That looks like a Case Id but it is not 18 characters long. Please enter the correct 18-character Case Id, or provide the numeric CaseNumber instead.",
-                questions=[
-                    "Paste the full 18-character Salesforce Case Id.",
-                    "Or share the CaseNumber from Salesforce.",
-                ],
-            )
-        else:
-            # This shouldn't happen with the updated _extract_primary_token, but fallback to case number
-            case_id = None
-            case_number = _extract_case_number(q)
-            print(f"   → Unexpected primary token length, treating as Case Number: {case_number}")
-    else:
-        case_id = None
-        case_number = _extract_case_number(q)
-        print(f"   → No primary token, extracted case number: {case_number}")
+    if intent.invalid_case_id:
+        log.info("Invalid Case Id length, asking for clarification", token=intent.primary_token)
+        return _clarification_payload(
+            session_id=session_id,
+            message="That looks like a Case Id but it is not 18 characters long. Please enter the correct 18-character Case Id, or provide the numeric CaseNumber instead.",
+            questions=[
+                "Paste the full 18-character Salesforce Case Id.",
+                "Or share the CaseNumber from Salesforce.",
+            ],
+        )
+    case_id, case_number = intent.case_id, intent.case_number
+    # A reply to a listed set of cases: resolve it by Id so the (prefetched) cache answers it
+    picked = None if case_id else _pick_candidate(state.candidates, intent)
+    if picked and picked.get("Id"):
+        case_id, case_number = picked["Id"], None
+    log.info(
+        "🔍 Routed query",
+        kind="candidate" if picked else intent.kind,
+        case_id=case_id,
+        case_number=case_number,
+    )
 
     case: Dict[str, Any] | None
     source: str
     detail: Optional[str]
     search_results: List[Dict[str, Any]] = []
+    bundle: Optional[CaseBundle] = None
     
-    print(case_number, subject,"case number")
-    print(case_id,case_number,compliance_no,subject)
-    
-    if case_id:
-        case, source, detail = _load_case_by_id(case_id)
-    elif case_number:
-        case, source, detail = _load_case_by_number(case_number)
-    elif compliance_no:
-        print(compliance_no, "compliance_no inside condition block")
-        search_results, source, detail = _load_case_by_compliance(compliance_no)
+    if case_id or case_number:
+        bundle = yield "bundle", {"case_id": case_id, "case_number": case_number, "parts": parts}
+        case, source, detail = bundle.case, bundle.source, bundle.detail
+    elif intent.compliance_no:
+        search_results, source, detail = yield "compliance", {
+            "compliance_no": intent.compliance_no, "fields": _PROJECTIONS["candidates"]
+        }
         case = search_results[0] if search_results else None
-    elif subject:
-        print("subject in",subject)
-        search_results, source, detail = _load_case_by_subject(subject)
-        
-        # If subject search fails, try the enhanced keyword search as fallback
-        if not search_results and source != "salesforce_error":
-            print(f"Subject search failed, trying keyword search for: '{subject}'")
-            try:
-                from salesforce import case_queries
-                keyword_results = case_queries.search_cases_by_keywords(subject)
-                if keyword_results:
-                    search_results = keyword_results
-                    print(f"Keyword search found {len(keyword_results)} results")
-            except Exception as e:
-                print(f"Keyword search also failed: {e}")
-        
+    elif intent.subject:
+        log.debug("Searching by subject", subject=intent.subject)
+        # Subject SOSL, keyword SOQL and free-text SOSL run concurrently (see search_strategy)
+        search_results, source, detail = yield "subject", {"subject": intent.subject, "fields": _PROJECTIONS["candidates"]}
         case = search_results[0] if search_results else None
     else:
         case, source, detail = None, "", None
-    
-    print(case_id,"caseid")
+
+    # A single search hit is answered in full: upgrade its candidate projection (cache-backed)
+    if case and len(search_results) == 1 and not _has_projection(case, _PROJECTIONS["case"]):
+        bundle = yield "bundle", {"case_id": case.get("Id"), "parts": parts}
+        if bundle.case:
+            case, source, detail = bundle.case, bundle.source, bundle.detail
+        else:
+            bundle = None
     
     # Handle search results with multiple matches
     if search_results and len(search_results) > 1:
@@ -503,103 +559,60 @@ def handle_user_query(*, user_query: str, session_id: str, memory: MemoryStore)
                 "CaseNumber": r.get("CaseNumber"),
                 "Subject": r.get("Subject"),
                 "Status": r.get("Status"),
-                "Description": r.get("Description"),
                 "Priority": r.get("Priority"),
             }
             for r in search_results[:10]
         ]
-        search_type = "compliance number" if compliance_no else "subject"
+        search_type = "compliance number" if intent.compliance_no else "subject"
+        yield from _remember_candidates(state, candidates)
         return {
             "type": "case_search_results",
             "session_id": session_id,
-            "message": f"I found {len(search_results)} cases matching the {search_type} '{compliance_no or subject}'. Reply with the CaseNumber you want me to summarize.",
+            "message": f"I found {len(search_results)} cases matching the {search_type} '{intent.compliance_no or intent.subject}'. Reply with the CaseNumber you want me to summarize.",
             "candidates": candidates,
-            "search_term": compliance_no or subject,
+            "search_term": intent.compliance_no or intent.subject,
             "search_type": search_type,
         }
     
     # Handle single case or first result from search
-    if case_id or case_number or (case and (compliance_no or subject)):
-        # Explicit "comments" request - use 4-section structure with comments focus
-        if "comment" in q_lower:
-            comments, source, detail = _load_case_comments(case_id or (case or {}).get("Id")) if (case_id or case) else ([], "", None)
-            print(comments,"comments")
-            if source == "salesforce_error":
+    if case_id or case_number or (case and (intent.compliance_no or intent.subject)):
+        # Explicit comments / history / feed request - use 4-section structure with that focus
+        if parts and case:
+            if bundle is None:
+                bundle = yield "bundle", {"case": case, "parts": parts}
+            if len(bundle.errors) == len(parts):
                 return {
                     "type": "error",
                     "session_id": session_id,
                     "error": "Salesforce query failed. Check SF credentials / connection.",
                     "case_id": case_id,
                     "case_number": case_number,
-                    "detail": detail,
+                    "detail": next(iter(bundle.errors.values())),
                 }
             
-            # Always use 4-section structure, even for comments
+            # Always use 4-section structure, even for related collections
             case_data = prepare_case_data(case)
             state.case_data = case_data
-            state.level2_qa = []
+            history.reset(state)
+            if not picked:
+                # Loaded by number, Id or search: ordinals no longer refer to an earlier list
+                state.candidates = []
             
             payload = _case_response_payload(case=case, case_data=case_data, session_id=session_id)
             payload["case_source"] = source
-            payload["comments"] = comments
-            payload["query_focus"] = "Focus on analyzing the case comments in your response while maintaining the full 4-section structure. Include comment analysis in section 1 (contextualization) and relevant actions in section 4."
-            return payload
-
-        # Explicit "history" request - use 4-section structure with history focus
-        if "history" in q_lower:
-            history, source, detail = _load_case_history(case_id or (case or {}).get("Id")) if (case_id or case) else ([], "", None)
-            if source == "salesforce_error":
-                return {
-                    "type": "error",
-                    "session_id": session_id,
-                    "error": "Salesforce query failed. Check SF credentials / connection.",
-                    "case_id": case_id,
-                    "case_number": case_number,
-                    "detail": detail,
-                }
-            
-            # Always use 4-section structure, even for history
-            case_data = prepare_case_data(case)
-            state.case_data = case_data
-            state.level2_qa = []
-            
-            payload = _case_response_payload(case=case, case_data=case_data, session_id=session_id)
-            payload["case_source"] = source
-            payload["history"] = history
-            payload["query_focus"] = "Focus on analyzing the case history and changes in your response while maintaining the full 4-section structure. Include history analysis in section 1 (contextualization) and track progress in section 2."
-            return payload
-
-        # Explicit "feed" request - use 4-section structure with feed focus
-        if "feed" in q_lower:
-            feed, source, detail = _load_case_feed(case_id or (case or {}).get("Id")) if (case_id or case) else ([], "", None)
-            if source == "salesforce_error":
-                return {
-                    "type": "error",
-                    "session_id": session_id,
-                    "error": "Salesforce query failed. Check SF credentials / connection.",
-                    "case_id": case_id,
-                    "case_number": case_number,
-                    "detail": detail,
-                }
-            
-            # Always use 4-section structure, even for feed
-            case_data = prepare_case_data(case)
-            state.case_data = case_data
-            state.level2_qa = []
-            
-            payload = _case_response_payload(case=case, case_data=case_data, session_id=session_id)
-            payload["case_source"] = source
-            payload["feed"] = feed
-            payload["query_focus"] = "Focus on analyzing the case feed activities in your response while maintaining the full 4-section structure. Include feed activity analysis in section 1 (contextualization) and relevant insights in section 3."
+            payload.update(bundle.parts)
+            if bundle.errors:
+                payload["part_errors"] = bundle.errors
+            payload["query_focus"] = " ".join(_PART_FOCUS[part] for part in parts)
             return payload
 
         if not case:
             if source == "salesforce_error":
                 search_info = {}
-                if compliance_no:
-                    search_info["compliance_number"] = compliance_no
-                if subject:
-                    search_info["subject"] = subject
+                if intent.compliance_no:
+                    search_info["compliance_number"] = intent.compliance_no
+                if intent.subject:
+                    search_info["subject"] = intent.subject
                     
                 return {
                     "type": "error",
@@ -612,24 +625,24 @@ def handle_user_query(*, user_query: str, session_id: str, memory: MemoryStore)
                 }
             
             # Handle case not found for different search types
-            if compliance_no:
+            if intent.compliance_no:
                 return {
                     "type": "error",
                     "session_id": session_id,
-                    "error": f"No cases found with compliance number '{compliance_no}'",
-                    "compliance_number": compliance_no,
+                    "error": f"No cases found with compliance number '{intent.compliance_no}'",
+                    "compliance_number": intent.compliance_no,
                     "suggestions": [
                         "Check if the compliance number is correct",
                         "Try searching by case number or subject instead",
                         "The compliance number might be in a different field"
                     ]
                 }
-            elif subject:
+            elif intent.subject:
                 return {
                     "type": "error",
                     "session_id": session_id,
-                    "error": f"No cases found with subject containing '{subject}'",
-                    "subject": subject,
+                    "error": f"No cases found with subject containing '{intent.subject}'",
+                    "subject": intent.subject,
                     "suggestions": [
                         "Try different keywords from the case subject",
                         "Search by case number if you know it",
@@ -648,11 +661,13 @@ def handle_user_query(*, user_query: str, session_id: str, memory: MemoryStore)
         # Always use 4-section structure for case queries, but customize the focus based on the question
         case_data = prepare_case_data(case)
         state.case_data = case_data
-        state.level2_qa = []
+        history.reset(state)
+        if not picked:
+            state.candidates = []
 
         # Determine the specific focus of the query for customized instructions
         query_focus = ""
-        if wants_status:
+        if intent.wants_status:
             query_focus = "Focus on providing current status information in section 2 (Technical Case Summary) while maintaining the full 4-section structure."
         
         payload = _case_response_payload(case=case, case_data=case_data, session_id=session_id)
@@ -662,18 +677,15 @@ def handle_user_query(*, user_query: str, session_id: str, memory: MemoryStore)
 
         case_data = prepare_case_data(case)
         state.case_data = case_data
-        state.level2_qa = []
+        history.reset(state)
 
         payload = _case_response_payload(case=case, case_data=case_data, session_id=session_id)
         payload["case_source"] = source
         return payload
 
-    if wants_in_progress and ("case" in q_lower or "cases" in q_lower):
-        print("in progress")
-        try:
-            from salesforce import case_queries  # lazy import
-
-            records = case_queries.list_cases_by_status(["Working", "In Progress"], limit=20)
+    if intent.wants_in_progress and intent.mentions_case:
+        records, source, detail = yield "in_progress", {"fields": _PROJECTIONS["list"]}
+        if source != "salesforce_error":
             candidates = [
                 {
                     "Id": r.get("Id"),
@@ -685,6 +697,7 @@ def handle_user_query(*, user_query: str, session_id: str, memory: MemoryStore)
                 }
                 for r in records
             ]
+            yield from _remember_candidates(state, candidates)
             return {
                 "type": "in_progress_cases",
                 "session_id": session_id,
@@ -692,40 +705,29 @@ def handle_user_query(*, user_query: str, session_id: str, memory: MemoryStore)
                 "cases": candidates,
                 "message": "Reply with a CaseNumber to summarize any of these cases.",
             }
-        except Exception:
-            pass
 
     if state.case_data:
-        # Check if this is a technical follow-up case
-        is_technical_followup = (
-            "follow" in q_lower and ("up" in q_lower or "followup" in q_lower) or
-            "status" in q_lower or "done" in q_lower or "resolved" in q_lower or
-            "fix" in q_lower or "implementation" in q_lower or "changes" in q_lower or
-            "monitoring" in q_lower or "closure" in q_lower or "complete" in q_lower
-        )
-        
-        if is_technical_followup:
-            # Use technical followup structure for follow-up questions
-            new_qa = {"q": q, "a": ""}  # ChatGPT will provide the answer
-            state.level2_qa.append(new_qa)
+        # Only the turns the client has not seen when it sent back its context_version
+        context = history.followup_context(state, context_version)
+        new_qa = {"q": q, "a": ""}  # ChatGPT will provide the answer
+        history.append(state, new_qa)
+        if intent.is_technical_followup:
             return _technical_followup_payload(
-                case_data=state.case_data, 
-                session_id=session_id, 
-                user_question=q
-            )
-        else:
-            # Use regular followup for general questions
-            context_data = prepare_followup_context(
-                case_data=state.case_data,
-                conversation_history=state.level2_qa,
+                context=context,
+                session_id=session_id,
                 user_question=q,
+                context_version=history.context_version(state),
             )
-            
-            new_qa = {"q": q, "a": ""}  # ChatGPT will provide the answer
-            state.level2_qa.append(new_qa)
-            return _followup_answer_payload(context_data=context_data, session_id=session_id, stored=True, new_qa=new_qa)
+        context_data = prepare_followup_context(history_context=context, user_question=q)
+        return _followup_answer_payload(
+            context_data=context_data,
+            session_id=session_id,
+            stored=True,
+            context_version=history.context_version(state),
+            new_qa=new_qa,
+        )
 
-    hits = _search_cases(q) if len(q) >= 5 else []
+    hits = (yield "search", {"search_text": q, "fields": _PROJECTIONS["candidates"]}) if len(q) >= 5 else []
     if hits:
         candidates = [
             {
@@ -733,10 +735,10 @@ def handle_user_query(*, user_query: str, session_id: str, memory: MemoryStore)
                 "CaseNumber": h.get("CaseNumber"),
                 "Subject": h.get("Subject"),
                 "Status": h.get("Status"),
-                "Description": h.get("Description"),
             }
             for h in hits[:10]
         ]
+        yield from _remember_candidates(state, candidates)
         return {
             "type": "case_search_results",
             "session_id": session_id,
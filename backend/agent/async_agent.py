@@ -0,0 +1,328 @@
+"""
+Async entrypoint for the agent.
+
+Runs the same routing flow as agent_core.handle_user_query, but fulfils its
+Salesforce requests on the pooled async client instead of blocking a thread.
+
+astream_user_query is the streaming variant: a single-case answer emits the case header
+as soon as the case is loaded, then each requested related collection as it arrives,
+and finally the complete response.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from agent import agent_core
+from agent.agent_core import CaseBundle
+from agent.data_processing import prepare_case_data
+from agent.memory import SessionStore
+from agent.search_strategy import SearchRace
+from agent.session_locks import session_locks
+from observability.log import get_logger
+from observability.tracing import observe_stage, record_query, span
+
+log = get_logger(__name__)
+
+LoadResult = Tuple[Optional[Dict[str, Any]], str, Optional[str]]
+ListResult = Tuple[List[Dict[str, Any]], str, Optional[str]]
+# Receives stream events: {"event": "case", ...}, {"event": "part", ...}
+Emit = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def _error(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+async def _aload_case_by_number(case_number: str) -> LoadResult:
+    try:
+        from salesforce import case_cache  # lazy import
+
+        sf_cases = await case_cache.aget_case(case_number)
+        if sf_cases:
+            return sf_cases[0], "salesforce", None
+        return None, "salesforce_empty", None
+    except Exception as e:
+        return None, "salesforce_error", _error(e)
+
+
+async def _aload_case_by_id(case_id: str) -> LoadResult:
+    try:
+        from salesforce import case_cache  # lazy import
+
+        sf_cases = await case_cache.aget_case_with_id(case_id)
+        if sf_cases:
+            return sf_cases[0], "salesforce", None
+        return None, "salesforce_empty", None
+    except Exception as e:
+        return None, "salesforce_error", _error(e)
+
+
+async def _aload_records(query_name: str, *args: Any, **kwargs: Any) -> ListResult:
+    try:
+        from salesforce import async_case_queries  # lazy import
+
+        records = await getattr(async_case_queries, query_name)(*args, **kwargs)
+        return records or [], "salesforce", None
+    except Exception as e:
+        return [], "salesforce_error", _error(e)
+
+
+_PART_QUERIES = {"comments": "get_case_comments", "history": "get_case_history", "feed": "get_case_feed"}
+
+
+async def _aload_case_with_related(
+    *, case_id: Optional[str], case_number: Optional[str], parts: Tuple[str, ...]
+) -> CaseBundle:
+    try:
+        from salesforce import async_case_queries, case_cache  # lazy import
+
+        case, related, errors = await async_case_queries.get_case_with_related(
+            case_id=case_id, case_number=case_number, parts=parts
+        )
+    except Exception as e:
+        return CaseBundle(case=None, source="salesforce_error", detail=_error(e))
+    if case is None:
+        return CaseBundle(case=None, source="salesforce_empty", detail=None)
+    case_cache.case_cache.put(case)
+    return CaseBundle(case=case, source="salesforce", detail=None, parts=related, errors=errors)
+
+
+async def _aload_case_bundle(
+    *,
+    case_id: Optional[str] = None,
+    case_number: Optional[str] = None,
+    case: Optional[Dict[str, Any]] = None,
+    parts: Tuple[str, ...] = (),
+    emit: Optional[Emit] = None,
+) -> CaseBundle:
+    """
+    Async twin of agent_core._load_case_bundle. With `emit`, the case header and then each
+    related collection are emitted as soon as they arrive (parts never precede the header).
+    """
+    if agent_core._FETCH_MODE == "subquery" and parts and (case_id or case_number or case):
+        bundle = await _aload_case_with_related(
+            case_id=case_id or (case or {}).get("Id"), case_number=case_number, parts=parts
+        )
+        if emit is not None and bundle.case is not None:
+            await emit(_case_event(bundle.case, bundle.source))
+            for part in parts:
+                await emit(_part_event(part, bundle.parts.get(part), bundle.errors.get(part)))
+        return bundle
+
+    source, detail = "salesforce", None
+    case_task = None
+    if case is None:
+        if case_id:
+            case_task = asyncio.ensure_future(_aload_case_by_id(case_id))
+        elif case_number:
+            case, source, detail = await _aload_case_by_number(case_number)
+        else:
+            return CaseBundle(case=None, source="", detail=None)
+    if case is not None and emit is not None:
+        await emit(_case_event(case, source))
+
+    parent_id = case_id or (case or {}).get("Id")
+    part_tasks = (
+        {asyncio.ensure_future(_aload_records(_PART_QUERIES[part], parent_id)): part for part in parts}
+        if parent_id
+        else {}
+    )
+    results: Dict[str, ListResult] = {}
+    pending = set(part_tasks)
+    if case_task is not None:
+        pending.add(case_task)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if case_task in done:
+                case, source, detail = case_task.result()
+                if case is None:
+                    break
+                if emit is not None:
+                    await emit(_case_event(case, source))
+                    # Parts that finished before the header was out
+                    for part in parts:
+                        if part in results:
+                            await emit(_part_event(part, results[part][0], results[part][2]))
+            for task in done:
+                if task is case_task:
+                    continue
+                part = part_tasks[task]
+                results[part] = _as_part_result(task.result())
+                if emit is not None and (case_task is None or case_task.done()):
+                    await emit(_part_event(part, results[part][0], results[part][2]))
+    finally:
+        for task in pending:
+            task.cancel()
+
+    bundle = CaseBundle(case=case, source=source, detail=detail)
+    if case is None:
+        return bundle
+    for part in parts:
+        records, part_source, part_detail = results.get(part, ([], "salesforce", None))
+        if part_source == "salesforce_error":
+            bundle.errors[part] = part_detail or "unknown error"
+        else:
+            bundle.parts[part] = records
+    return bundle
+
+
+def _as_part_result(result: ListResult) -> ListResult:
+    records, source, detail = result
+    if source == "salesforce_error":
+        return records, source, detail or "unknown error"
+    return records, source, None
+
+
+def _case_event(case: Dict[str, Any], source: str) -> Dict[str, Any]:
+    return {
+        "event": "case",
+        "case_id": case.get("Id"),
+        "case_number": case.get("CaseNumber"),
+        "case_data": prepare_case_data(case),
+        "case_source": source,
+    }
+
+
+def _part_event(part: str, records: Optional[List[Dict[str, Any]]], error: Optional[str]) -> Dict[str, Any]:
+    if error:
+        return {"event": "part", "part": part, "error": error}
+    return {"event": "part", "part": part, "records": records or []}
+
+
+async def _asearch_mirror(text: str, *, phrase: bool, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+    return await asyncio.to_thread(agent_core._search_mirror, text, phrase=phrase, limit=limit)
+
+
+async def _aload_case_by_compliance(compliance_no: str, fields: str = "full") -> ListResult:
+    local = await _asearch_mirror(compliance_no, phrase=True)
+    if local:
+        return local, "local_mirror", None
+    return await _aload_records("get_case_by_compliance", compliance_no, fields)
+
+
+async def _asearch_by_subject(subject: str, fields: str = "full") -> ListResult:
+    """Async twin of agent_core._search_by_subject; slower searches are cancelled once settled."""
+    local = await _asearch_mirror(subject, phrase=False)
+    if local:
+        return local, "local_mirror", None
+
+    try:
+        from salesforce import async_case_queries  # lazy import
+    except Exception as e:
+        return [], "salesforce_error", _error(e)
+
+    backends = {
+        "sosl_subject": async_case_queries.get_case_by_subject(subject, fields),
+        "keywords": async_case_queries.search_cases_by_keywords(subject, fields=fields),
+        "find_case": async_case_queries.find_case(subject, fields),
+    }
+    race = SearchRace()
+    tasks = {asyncio.ensure_future(coro): name for name, coro in backends.items()}
+    pending = set(tasks)
+    try:
+        while pending and not race.settled:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    race.record(tasks[task], task.result())
+                except Exception as e:
+                    race.record_error(tasks[task], e)
+    finally:
+        for task in pending:
+            task.cancel()
+    log.info("🏁 Subject search settled", **race.summary(sorted(tasks[t] for t in pending)))
+    return race.outcome(subject)
+
+
+async def _asearch_cases(search_text: str, fields: str = "full") -> List[Dict[str, Any]]:
+    records, _source, _detail = await _aload_records("find_case", search_text, fields)
+    return records
+
+
+async def _aload_in_progress_cases(fields: str = "status") -> ListResult:
+    return await _aload_records("list_cases_by_status", ["Working", "In Progress"], 20, fields)
+
+
+async def _aprefetch_cases(case_ids: List[str]) -> List[str]:
+    # Only schedules work on the cache's background pool
+    return agent_core._prefetch_cases(case_ids)
+
+
+_ASYNC_OPS = {
+    "bundle": _aload_case_bundle,
+    "compliance": _aload_case_by_compliance,
+    "subject": _asearch_by_subject,
+    "in_progress": _aload_in_progress_cases,
+    "search": _asearch_cases,
+    "prefetch": _aprefetch_cases,
+}
+
+
+async def ahandle_user_query(
+    *,
+    user_query: str,
+    session_id: str,
+    memory: SessionStore,
+    emit: Optional[Emit] = None,
+    context_version: Optional[str] = None,
+) -> Dict[str, Any]:
+    ops = dict(_ASYNC_OPS)
+    if emit is not None:
+        ops["bundle"] = functools.partial(ops["bundle"], emit=emit)
+    started = step = time.perf_counter()
+    async with session_locks.ahold(session_id or "default"):
+        # Shared session stores do blocking I/O, so loading and saving run off the event loop
+        state = await asyncio.to_thread(memory.get, session_id)
+        flow = agent_core._route_query(
+            state, user_query=user_query, session_id=session_id, context_version=context_version
+        )
+        try:
+            op, kwargs = next(flow)
+            while True:
+                with span(f"load.{op}") as load:
+                    result = await ops[op](**kwargs)
+                    load.outcome = agent_core._load_outcome(result)
+                step = time.perf_counter()
+                op, kwargs = flow.send(result)
+        except StopIteration as done:
+            payload = done.value
+        finally:
+            await asyncio.to_thread(memory.save, state)
+    observe_stage("payload", time.perf_counter() - step)
+    record_query(payload, time.perf_counter() - started)
+    return payload
+
+
+async def astream_user_query(
+    *, user_query: str, session_id: str, memory: SessionStore, context_version: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield stream events for one query, ending with {"event": "result", "response": payload}.
+    Closing the iterator early (client disconnected) cancels the outstanding Salesforce work.
+    """
+    events: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+
+    async def emit(event: Dict[str, Any]) -> None:
+        events.put_nowait(event)
+
+    task = asyncio.ensure_future(
+        ahandle_user_query(
+            user_query=user_query, session_id=session_id, memory=memory, emit=emit, context_version=context_version
+        )
+    )
+    task.add_done_callback(lambda _: events.put_nowait(None))
+    try:
+        while (event := await events.get()) is not None:
+            yield event
+        try:
+            response = task.result()
+        except Exception as e:
+            response = {"type": "error", "session_id": session_id, "error": "Query failed.", "detail": _error(e)}
+        yield {"event": "result", "response": response}
+    finally:
+        task.cancel()
@@ -0,0 +1,166 @@
+"""
+Batch case lookup for automations that would otherwise call `ask` once per case.
+
+References are classified without NL parsing (18-character Case Id, numeric CaseNumber,
+anything else invalid), served from the case cache where fresh, and the misses (stale
+entries included) are resolved with chunked `Id IN (...)` / `CaseNumber IN (...)` queries.
+Comments for every found case can be added with chunked `ParentId IN (...)` queries, so
+200 cases cost a handful of Salesforce calls instead of 200.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent.intent_router import CASE_ID_RE
+from observability.log import get_logger
+
+log = get_logger(__name__)
+
+BATCH_MAX_REFS = int(os.getenv("CASE_BATCH_MAX_REFS", "1000"))
+BATCH_MAX_COMMENT_ROWS = int(os.getenv("SF_BATCH_MAX_COMMENT_ROWS", "2000"))
+
+
+def classify(ref: str) -> Optional[str]:
+    """"id", "number", or None for a reference that is neither."""
+    if CASE_ID_RE.fullmatch(ref):
+        return "id"
+    if ref.isdigit():
+        return "number"
+    return None
+
+
+def _is_outage(e: BaseException) -> bool:
+    from salesforce.resilience import CircuitOpenError, is_transient  # lazy import
+
+    return isinstance(e, CircuitOpenError) or is_transient(e)
+
+
+def _error(e: BaseException) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def _from_cache(refs: List[str]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """
+    Fresh cache entries are served as is. Stale ones join the misses, so they are reloaded
+    by the chunked IN (...) queries instead of one background refresh per case.
+    """
+    from salesforce import case_cache  # lazy import
+
+    if not case_cache.CACHE_ENABLED:
+        return {}, refs
+    hits, misses = {}, []
+    for ref in refs:
+        record = case_cache.case_cache.peek(ref, fresh_only=True)
+        if record is not None:
+            hits[ref] = record
+        else:
+            misses.append(ref)
+    return hits, misses
+
+
+async def alookup_cases(
+    refs: List[str], *, include_comments: bool = False, fields: str = "full"
+) -> Dict[str, Any]:
+    """Resolve many case references at once; results keep the order of `refs` (deduplicated)."""
+    ordered = list(dict.fromkeys(ref.strip() for ref in refs if ref and ref.strip()))
+    if len(ordered) > BATCH_MAX_REFS:
+        return {
+            "type": "error",
+            "error": f"Too many case references ({len(ordered)}); the limit is {BATCH_MAX_REFS} per call.",
+        }
+
+    kinds = {ref: classify(ref) for ref in ordered}
+    valid = [ref for ref in ordered if kinds[ref]]
+    found: Dict[str, Tuple[Dict[str, Any], str]] = {}
+    failed: Dict[str, str] = {}
+    calls = 0
+
+    cached, misses = _from_cache(valid)
+    found.update((ref, (record, "cache")) for ref, record in cached.items())
+    if misses:
+        from salesforce import async_case_queries, case_cache  # lazy import
+
+        try:
+            records, chunk_errors, calls = await async_case_queries.get_cases_by_refs(
+                [ref for ref in misses if kinds[ref] == "id"],
+                [ref for ref in misses if kinds[ref] == "number"],
+                fields,
+            )
+        except Exception as e:
+            records, chunk_errors = [], {ref: e for ref in misses}
+        by_key = {}
+        for record in records:
+            by_key[record.get("Id")] = by_key[record.get("CaseNumber")] = record
+            if case_cache.CACHE_ENABLED:
+                case_cache.case_cache.put(record)
+        for ref in misses:
+            if ref in by_key:
+                found[ref] = (by_key[ref], "salesforce")
+            elif ref in chunk_errors:
+                e = chunk_errors[ref]
+                fallback = case_cache.case_cache.last_known(ref) if _is_outage(e) else None
+                if fallback is not None:
+                    found[ref] = (fallback, "last_known")
+                else:
+                    failed[ref] = _error(e)
+
+    comments: Dict[str, List[Dict[str, Any]]] = {}
+    comments_error = None
+    incomplete: set = set()
+    case_ids = list(dict.fromkeys(record["Id"] for record, _ in found.values() if record.get("Id")))
+    if include_comments and case_ids:
+        from salesforce import async_case_queries  # lazy import
+
+        try:
+            rows, statements, incomplete = await async_case_queries.get_comments_by_parent_ids(
+                case_ids, max_rows=BATCH_MAX_COMMENT_ROWS
+            )
+            calls += statements
+        except Exception as e:
+            rows, comments_error = [], _error(e)
+        for row in rows:
+            row = dict(row)
+            comments.setdefault(row.pop("ParentId", None), []).append(row)
+
+    results = []
+    for ref in ordered:
+        if not kinds[ref]:
+            results.append({
+                "ref": ref,
+                "status": "invalid",
+                "error": "Expected an 18-character Case Id or a numeric CaseNumber.",
+            })
+        elif ref in found:
+            record, source = found[ref]
+            result = {"ref": ref, "status": "found", "case_source": source, "case": record}
+            if include_comments and comments_error is None:
+                result["comments"] = comments.get(record.get("Id"), [])
+                if record.get("Id") in incomplete:
+                    result["comments_truncated"] = True
+            results.append(result)
+        elif ref in failed:
+            results.append({"ref": ref, "status": "error", "error": failed[ref]})
+        else:
+            results.append({"ref": ref, "status": "not_found"})
+
+    payload: Dict[str, Any] = {
+        "type": "case_batch",
+        "requested": len(ordered),
+        "found": sum(1 for r in results if r["status"] == "found"),
+        "salesforce_queries": calls,
+        "results": results,
+    }
+    if comments_error:
+        payload["comments_error"] = comments_error
+    if incomplete:
+        payload["comments_truncated"] = True
+    log.info(
+        "📦 Batch case lookup",
+        requested=len(ordered),
+        found=payload["found"],
+        cached=len(cached),
+        salesforce_queries=calls,
+    )
+    return payload
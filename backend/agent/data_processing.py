@@ -30,17 +30,17 @@ def prepare_case_data(case_info: Dict[str, Any]) -> Dict[str, Any]:
 
 def prepare_followup_context(
     *,
-    case_data: Dict[str, Any],
-    conversation_history: List[Dict[str, str]],
+    history_context: Dict[str, Any],
     user_question: str,
 ) -> Dict[str, Any]:
     """
     Prepare context for ChatGPT to answer follow-up questions.
+    history_context comes from agent.history.followup_context: the case context and
+    conversation so far, or only the turns the client has not seen yet.
     Returns structured data without AI processing.
     """
     return {
-        "case_context": case_data,
-        "conversation_history": conversation_history,
+        **history_context,
         "current_question": user_question,
         "instructions": "Use the case context and conversation history to answer the user's question. If you need more information, ask specific follow-up questions."
     }
@@ -51,6 +51,7 @@ def prepare_knowledge_article_data(
     case_data: Dict[str, Any],
     conversation_history: List[Dict[str, str]],
     title_hint: Optional[str] = None,
+    earlier_turns: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Prepare data for ChatGPT to generate a knowledge article.
@@ -58,6 +59,7 @@ def prepare_knowledge_article_data(
     """
     return {
         "case_data": case_data,
+        "earlier_turns": earlier_turns,
         "conversation_history": conversation_history,
         "title_hint": title_hint,
         "instructions": "Create a knowledge article based on this case data and conversation. Include: title, problem statement, environment, symptoms, root cause, resolution steps, verification steps, and prevention notes."
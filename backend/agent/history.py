@@ -0,0 +1,114 @@
+"""
+Bounded follow-up history for a case conversation.
+
+The last HISTORY_MAX_TURNS turns are kept verbatim in state.level2_qa, as long as they
+fit in HISTORY_MAX_BYTES; older turns are folded into state.history_digest, a count
+plus the most recent folded questions (shortened) within HISTORY_DIGEST_MAX_CHARS.
+
+Every follow-up response carries a context version "<context_id>.<turns>": the case
+context it was built on and how many turns the client has seen. A client that sends it
+back with the next query receives only the turns it has not seen, without the case
+context it already holds. Unknown, stale or folded-away versions get the full context.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import uuid
+from typing import Any, Dict, List, Optional
+
+from agent.memory import SessionState
+
+HISTORY_MAX_TURNS = int(os.getenv("HISTORY_MAX_TURNS", "6"))
+HISTORY_MAX_BYTES = int(os.getenv("HISTORY_MAX_BYTES", "6000"))
+HISTORY_DIGEST_MAX_CHARS = int(os.getenv("HISTORY_DIGEST_MAX_CHARS", "1200"))
+
+# Folded questions are shortened to this many characters in the digest
+_DIGEST_QUESTION_CHARS = 120
+
+
+def _size(turn: Dict[str, str]) -> int:
+    return len(json.dumps(turn, ensure_ascii=False, separators=(",", ":")))
+
+
+def reset(state: SessionState) -> None:
+    """Start a new conversation for the case just loaded into state.case_data."""
+    state.level2_qa = []
+    state.history_digest = None
+    state.context_id = uuid.uuid4().hex[:12]
+
+
+def total_turns(state: SessionState) -> int:
+    folded = state.history_digest["turns"] if state.history_digest else 0
+    return folded + len(state.level2_qa)
+
+
+def context_version(state: SessionState) -> str:
+    if not state.context_id:  # session started before context versions existed
+        state.context_id = uuid.uuid4().hex[:12]
+    return f"{state.context_id}.{total_turns(state)}"
+
+
+def append(state: SessionState, turn: Dict[str, str]) -> None:
+    """Record a turn, folding the oldest verbatim turns into the digest to stay within budget."""
+    state.level2_qa.append(turn)
+    turns = state.level2_qa
+    size = sum(_size(t) for t in turns)
+    folded = []
+    while len(turns) > 1 and (len(turns) > HISTORY_MAX_TURNS or size > HISTORY_MAX_BYTES):
+        oldest = turns.pop(0)
+        size -= _size(oldest)
+        folded.append(oldest)
+    if folded:
+        _fold(state, folded)
+
+
+def _fold(state: SessionState, turns: List[Dict[str, str]]) -> None:
+    digest = state.history_digest or {"turns": 0, "questions": []}
+    questions = digest["questions"] + [
+        q if len(q := t.get("q", "")) <= _DIGEST_QUESTION_CHARS else q[: _DIGEST_QUESTION_CHARS - 1] + "…"
+        for t in turns
+    ]
+    # Keep the most recent folded questions that fit the budget
+    kept, used = [], 0
+    for q in reversed(questions):
+        used += len(q)
+        if used > HISTORY_DIGEST_MAX_CHARS:
+            break
+        kept.append(q)
+    state.history_digest = {"turns": digest["turns"] + len(turns), "questions": kept[::-1]}
+
+
+def _base_turns(state: SessionState, known_version: Optional[str]) -> Optional[int]:
+    """Turns the client already holds, or None when it needs the full context."""
+    if not known_version or not state.context_id:
+        return None
+    context_id, _, turns = known_version.rpartition(".")
+    if context_id != state.context_id or not turns.isdigit():
+        return None
+    turns = int(turns)
+    folded = state.history_digest["turns"] if state.history_digest else 0
+    # Turns the client has not seen must still be verbatim
+    if turns < folded or turns > total_turns(state):
+        return None
+    return turns
+
+
+def followup_context(state: SessionState, known_version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    The case context and history a follow-up answer is built on: everything when the client
+    has no usable context version, otherwise only the turns after the one it holds.
+    """
+    base = _base_turns(state, known_version)
+    if base is None:
+        context: Dict[str, Any] = {"case_context": state.case_data}
+        if state.history_digest:
+            context["earlier_turns"] = state.history_digest
+        context["conversation_history"] = list(state.level2_qa)
+        return context
+    folded = state.history_digest["turns"] if state.history_digest else 0
+    return {
+        "context_base": f"{state.context_id}.{base}",
+        "conversation_history": state.level2_qa[base - folded:],
+    }
@@ -0,0 +1,124 @@
+"""
+Instruction templates attached to agent responses.
+
+Each template has a stable id and a version. Responses carry both the text and an
+"instructions_ref" ({"id", "version"}), so a client using the compact response format can
+fetch a template once (get_instructions tool / GET /instructions/{id}) and cache it.
+Bump the version whenever a template's text changes.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict
+
+
+@dataclass(frozen=True)
+class InstructionTemplate:
+    id: str
+    version: int
+    text: str
+
+    @property
+    def ref(self) -> Dict[str, Any]:
+        return {"id": self.id, "version": self.version}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "version": self.version, "text": self.text}
+
+
+CASE_RESPONSE_TEXT = """CRITICAL: You MUST format your response using exactly this 4-section structure with clear headers. Do not provide a simple summary - always use the full structure:
+
+## 1️⃣ Case Summarization & Contextualization
+   - Brief overview of the case type and current state
+   - Context about customer situation and case history
+   - Address the user's specific question in context
+
+## 2️⃣ Technical Case Summary
+   - Issue Type: [Category/Area]
+   - Fix Status: [Current status]
+   - Validation Status: [Testing/verification state]
+   - Current State: [What's happening now]
+   - Closure Dependency: [What's needed for closure]
+
+## 3️⃣ Troubleshooting / Resolution Recommendation Steps
+   - List specific steps to resolve or progress the case
+   - Include validation and verification steps
+   - Mention any dependencies or prerequisites
+   - Address any specific actions related to the user's query
+
+## 4️⃣ Action
+   - Clear next steps to take
+   - Who should do what
+   - Timeline considerations
+   - Specific actions related to the user's question
+
+NEVER provide just a simple status message. Always use this complete 4-section structure even for basic status requests."""
+
+TECHNICAL_FOLLOWUP_TEXT = """This is a follow-up on an existing technical case. Structure your response with these 4 sections:
+
+1. Case Summarization & Contextualization
+   - Summarize the ongoing technical case and current status
+   - Contextualize the customer's follow-up question
+   - Reference any previous work done
+
+2. Technical Case Summary
+   - Issue Type: [Firmware/SDK/Runtime/etc.]
+   - Fix Status: [Implemented/In Progress/Pending/etc.]
+   - Validation Status: [Testing Complete/In Progress/Pending/etc.]
+   - Current State: [Monitoring/Closed/Open/etc.]
+   - Closure Dependency: [What's needed before case closure]
+
+3. Troubleshooting / Resolution Recommendation Steps
+   - Review previously implemented changes
+   - Verify testing results and current status
+   - List steps to confirm resolution or next actions
+   - Include any monitoring or validation steps
+
+4. Action
+   - Immediate next steps required
+   - Who should take action and when
+   - Communication plan for case closure
+   - Timeline considerations
+
+Always include a knowledge article prompt at the end: 'This resolved technical issue can be reused as a reference. Would you like to convert this solution into a Knowledge Article for future cases?'"""
+
+FOLLOWUP_ANSWER_TEXT = """Use the case context and conversation history to answer the user's question. For technical follow-up cases, structure your response with these 4 sections:
+
+1. Case Summarization & Contextualization
+   - Current case status and what has been done
+   - Customer's specific follow-up question context
+
+2. Technical Case Summary
+   - Issue Type: [Category/Area]
+   - Fix Status: [What's been implemented]
+   - Validation Status: [Testing/monitoring state]
+   - Current State: [Current situation]
+   - Closure Dependency: [What's needed for closure]
+
+3. Troubleshooting / Resolution Recommendation Steps
+   - Review what has been done
+   - Verify current status
+   - Confirm next steps needed
+
+4. Action
+   - Immediate next steps
+   - Timeline for completion
+   - Communication plan
+
+If you need more information, ask specific follow-up questions."""
+
+KNOWLEDGE_ARTICLE_TEXT = (
+    "Create a knowledge article based on this case data and conversation. Include: title, problem statement, "
+    "environment, symptoms, root cause, resolution steps, verification steps, and prevention notes."
+)
+
+INSTRUCTIONS: Dict[str, InstructionTemplate] = {
+    template.id: template
+    for template in (
+        InstructionTemplate("case_response", 1, CASE_RESPONSE_TEXT),
+        InstructionTemplate("technical_followup", 1, TECHNICAL_FOLLOWUP_TEXT),
+        InstructionTemplate("followup_answer", 1, FOLLOWUP_ANSWER_TEXT),
+        InstructionTemplate("knowledge_article", 1, KNOWLEDGE_ARTICLE_TEXT),
+    )
+}
@@ -0,0 +1,324 @@
+"""
+Single-pass intent router for user queries.
+
+route() scans the lowercased query once with an Aho-Corasick automaton built from every
+keyword / command phrase the agent reacts to, and uses precompiled patterns for case
+Ids, case numbers and compliance numbers. The resulting Intent exposes the same routing
+signals agent_core used to compute with repeated substring checks; the more expensive
+extractions (compliance number, subject) only run if the routing actually reaches them.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+
+class PhraseAutomaton:
+    """Aho-Corasick matcher: reports every (start, phrase) occurring in a text in one pass."""
+
+    def __init__(self, phrases: Iterable[str]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[str, ...]] = [()]
+        for phrase in dict.fromkeys(phrases):
+            node = 0
+            for ch in phrase:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] += (phrase,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for phrase in self._out[node]:
+                yield i - len(phrase) + 1, phrase
+
+
+# Related collections that can be fetched alongside a case
+CASE_PARTS = ("comments", "history", "feed")
+_PART_PHRASES = {"comments": "comment", "history": "history", "feed": "feed"}
+FULL_CONTEXT_PHRASES = ("full context", "everything", "all details", "full details")
+
+_KB_PHRASES = ("knowledge article", "kb", "convert")
+_IN_PROGRESS_PHRASES = ("in progress", "in-progress", "working")
+_FOLLOWUP_PHRASES = (
+    "status", "done", "resolved", "fix", "implementation", "changes", "monitoring", "closure", "complete",
+)
+
+# Leading command phrases stripped before a subject search, in priority order
+_COMMAND_PHRASES = (
+    "get me the details for",
+    "get me case details for",
+    "need details for",
+    "need case details for",
+    "show me details for",
+    "show case details for",
+    "fetch details for",
+    "find details for",
+    "case details for",
+    "details for",
+    "information about",
+    "information regarding",
+    "please show",
+    "please get",
+    "please fetch",
+)
+_COMMAND_PRIORITY = {phrase: i for i, phrase in enumerate(_COMMAND_PHRASES)}
+_COMMAND_WORDS = frozenset({
+    "get", "show", "find", "search", "fetch", "display",
+    "case", "cases", "details", "information",
+    "about", "regarding", "subject",
+    "status", "please", "me", "for",
+})
+_LEADING_STOPWORDS = frozenset({"the", "a", "an"})
+
+_AUTOMATON = PhraseAutomaton(
+    _KB_PHRASES + _IN_PROGRESS_PHRASES + _FOLLOWUP_PHRASES + FULL_CONTEXT_PHRASES
+    + tuple(_PART_PHRASES.values()) + _COMMAND_PHRASES + ("case", "follow", "up")
+)
+
+# Typical Salesforce Case Ids start with '500' and must be 18 characters long
+CASE_ID_RE = re.compile(r"\b500[0-9A-Za-z]{15}\b")
+_ID_LIKE_RE = re.compile(r"\b[A-Za-z0-9]{15,18}\b")
+_CASE_NUMBER_AFTER_KEYWORD_RE = re.compile(r"(?:case|casenumber)\s*[=:]?\s*(\d+)", re.IGNORECASE)
+_STANDALONE_NUMBER_RE = re.compile(r"\b(\d{5,10})\b")
+_COMPLIANCE_RES = tuple(
+    re.compile(pattern, re.I)
+    for pattern in (
+        r'\bcompliance[\s:-]*(?:number[\s:-]*)?([A-Za-z0-9-_]+)',
+        r'\bcomp[\s:-]*(?:num[\s:-]*)?([A-Za-z0-9-_]+)',
+        r'\b([A-Za-z]{2,4}-\d{3,6})\b',  # Pattern like ABC-1234
+        r'\b(C\d{4,8})\b',  # Pattern like C12345
+    )
+)
+_ID_WORD_RE = re.compile(r"[A-Za-z0-9]{9,18}")
+
+# Picking an entry of the last listed cases: "the second one", "2nd", "#3", "open the last case"
+_ORDINAL_WORDS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5,
+    "sixth": 6, "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10, "last": -1,
+}
+_ORDINAL_RE = re.compile(
+    r"(?:(?:show|open|summari[sz]e|pick|select|get|take|use)\s+(?:me\s+)?)?(?:the\s+)?"
+    r"(?:(?P<word>" + "|".join(_ORDINAL_WORDS) + r")|(?P<num>\d{1,2})(?:st|nd|rd|th)?"
+    r"|(?:number|no\.?|option|#)\s*(?P<pick>\d{1,2}))"
+    r"(?:\s+(?:one|case|result|option))?(?:,?\s+please)?\s*[.!?]?"
+)
+
+
+def extract_case_number(text: str) -> Optional[str]:
+    """Extract a numeric case number (like 00001159)."""
+    if not text:
+        return None
+    # Look for patterns like "case 00001159" or "CaseNumber = 00001159"
+    match = _CASE_NUMBER_AFTER_KEYWORD_RE.search(text) or _STANDALONE_NUMBER_RE.search(text)
+    return match.group(1) if match else None
+
+
+def extract_case_id(text: str) -> Optional[str]:
+    m = CASE_ID_RE.search(text or "")
+    return m.group(0) if m else None
+
+
+def extract_primary_token(text: str) -> Optional[str]:
+    """
+    Extract a 15-18 character alphanumeric token that could be a Case Id, preferring
+    proper Case Ids (500..., 18 chars) and skipping purely alphabetic words.
+    """
+    if not text:
+        return None
+    case_id = CASE_ID_RE.search(text)
+    if case_id:
+        return case_id.group(0)
+    for token in _ID_LIKE_RE.findall(text):
+        if not token.isalpha():
+            return token
+    return None
+
+
+def extract_compliance_number(text: str) -> Optional[str]:
+    """Extract compliance number from patterns like "compliance: ABC-123" or "C12345"."""
+    for pattern in _COMPLIANCE_RES:
+        match = pattern.search(text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def extract_ordinal(text: str) -> Optional[int]:
+    """
+    1-based position picked by a reply that consists only of an ordinal reference
+    ("the second one", "#3", "2"); -1 means "the last one". Anything else is None, so
+    ordinary follow-up questions that merely contain "first" are not mistaken for a pick.
+    """
+    match = _ORDINAL_RE.fullmatch((text or "").strip().lower())
+    if not match:
+        return None
+    if match.group("word"):
+        return _ORDINAL_WORDS[match.group("word")]
+    position = int(match.group("num") or match.group("pick"))
+    return position if position > 0 else None
+
+
+def _subject_from(lower: str, command_phrase: Optional[str]) -> Optional[str]:
+    if command_phrase:
+        lower = lower[len(command_phrase):].strip()
+    words = [
+        w for w in lower.split()
+        if w not in _COMMAND_WORDS and not _ID_WORD_RE.fullmatch(w)  # drop case numbers / Ids
+    ]
+    start = 0
+    while start < len(words) and words[start] in _LEADING_STOPWORDS:
+        start += 1
+    subject = " ".join(words[start:]).strip()
+    return subject if len(subject) >= 2 else None
+
+
+def extract_subject(text: str) -> Optional[str]:
+    lower = (text or "").strip().lower()
+    return _subject_from(lower, _leading_command(_AUTOMATON.matches(lower)))
+
+
+def _leading_command(matches: Iterable[Tuple[int, str]]) -> Optional[str]:
+    leading = [phrase for start, phrase in matches if start == 0 and phrase in _COMMAND_PRIORITY]
+    return min(leading, key=_COMMAND_PRIORITY.__getitem__) if leading else None
+
+
+def requested_parts(lower: str) -> Tuple[str, ...]:
+    return _parts_from(frozenset(phrase for _, phrase in _AUTOMATON.matches(lower)))
+
+
+def _parts_from(phrases: FrozenSet[str]) -> Tuple[str, ...]:
+    if phrases.intersection(FULL_CONTEXT_PHRASES):
+        return CASE_PARTS
+    return tuple(part for part in CASE_PARTS if _PART_PHRASES[part] in phrases)
+
+
+@dataclass
+class Intent:
+    """
+    Routing signals for one query. kind is the first matching route:
+    kb, invalid_case_id, case_id, case_number, compliance, subject, in_progress,
+    followup, search, clarify.
+    """
+
+    text: str
+    lower: str
+    phrases: FrozenSet[str]
+    command_phrase: Optional[str]
+    primary_token: Optional[str]
+    has_case_context: bool = False
+    parts: Tuple[str, ...] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.parts = _parts_from(self.phrases)
+
+    @property
+    def wants_kb(self) -> bool:
+        return not self.phrases.isdisjoint(_KB_PHRASES)
+
+    @property
+    def mentions_case(self) -> bool:
+        return "case" in self.phrases
+
+    @property
+    def wants_status(self) -> bool:
+        return "status" in self.phrases and (self.mentions_case or self.primary_token is not None)
+
+    @property
+    def wants_in_progress(self) -> bool:
+        return not self.phrases.isdisjoint(_IN_PROGRESS_PHRASES)
+
+    @property
+    def is_technical_followup(self) -> bool:
+        return (
+            "follow" in self.phrases and "up" in self.phrases
+            or not self.phrases.isdisjoint(_FOLLOWUP_PHRASES)
+        )
+
+    @property
+    def invalid_case_id(self) -> bool:
+        # Id-like tokens between 9 and 17 characters are mistyped Case Ids, not CaseNumbers
+        return self.primary_token is not None and 9 <= len(self.primary_token) < 18
+
+    @property
+    def case_id(self) -> Optional[str]:
+        if self.primary_token and len(self.primary_token) == 18:
+            return self.primary_token
+        return None
+
+    @cached_property
+    def case_number(self) -> Optional[str]:
+        if self.case_id or self.invalid_case_id:
+            return None
+        return extract_case_number(self.text)
+
+    @cached_property
+    def compliance_no(self) -> Optional[str]:
+        return extract_compliance_number(self.text)
+
+    @cached_property
+    def subject(self) -> Optional[str]:
+        return _subject_from(self.lower, self.command_phrase)
+
+    @cached_property
+    def ordinal(self) -> Optional[int]:
+        return extract_ordinal(self.lower)
+
+    @cached_property
+    def kind(self) -> str:
+        if self.wants_kb:
+            return "kb"
+        if self.invalid_case_id:
+            return "invalid_case_id"
+        if self.case_id:
+            return "case_id"
+        if self.case_number:
+            return "case_number"
+        if self.compliance_no:
+            return "compliance"
+        if self.subject:
+            return "subject"
+        if self.wants_in_progress and self.mentions_case:
+            return "in_progress"
+        if self.has_case_context:
+            return "followup"
+        return "search" if len(self.text) >= 5 else "clarify"
+
+
+def route(text: str, *, has_case_context: bool = False) -> Intent:
+    q = (text or "").strip()
+    lower = q.lower()
+    matches = list(_AUTOMATON.matches(lower))
+    return Intent(
+        text=q,
+        lower=lower,
+        phrases=frozenset(phrase for _, phrase in matches),
+        command_phrase=_leading_command(matches),
+        primary_token=extract_primary_token(q),
+        has_case_context=has_case_context,
+    )
@@ -1,29 +1,218 @@
+"""
+Per-session conversation state and the in-process session store.
+
+MemoryStore is bounded: sessions idle for longer than the TTL are dropped, and beyond
+max_sessions / max_bytes the least recently used sessions are evicted. Sizes are
+estimates (JSON length) taken when the query flow hands a session back with save().
+Identical case_data is stored once and shared by every session looking at that case
+version, so it must be treated as read-only.
+
+MemoryStore only works with a single worker process; agent/session_store.py has the
+shared SQLite and Redis stores and picks one from SESSION_STORE.
+"""
+
 from __future__ import annotations
 
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Protocol
+
+from observability import metrics
+
+SESSION_IDLE_TTL_SECONDS = float(os.getenv("SESSION_IDLE_TTL_SECONDS", "3600"))
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "10000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(256 * 1024 * 1024)))
 
+# Fixed per-session overhead added to the measured fields
+_SESSION_OVERHEAD_BYTES = 512
 
-@dataclass
+
+@dataclass(slots=True)
 class SessionState:
     session_id: str
     case_data: Optional[Dict[str, Any]] = None  # Structured case data for ChatGPT
-    level2_qa: List[Dict[str, str]] = field(default_factory=list)  # {"q": "...", "a": "..."}
+    level2_qa: List[Dict[str, str]] = field(default_factory=list)  # {"q": "...", "a": "..."}, recent turns only
+    history_digest: Optional[Dict[str, Any]] = None  # older turns folded by agent.history
+    context_id: Optional[str] = None  # changes with every case loaded, see agent.history
     pending_knowledge_article: Optional[Dict[str, Any]] = None
+    candidates: List[Dict[str, Any]] = field(default_factory=list)  # last listed cases, for "the second one"
+    version: int = field(default=0, compare=False)  # revision in a shared store, for compare-and-set saves
 
 
-class MemoryStore:
+class SessionStore(Protocol):
+    """What the query flow needs from a session store: load, hand back after the query, forget."""
+
+    def get(self, session_id: str) -> SessionState: ...
+
+    def save(self, state: SessionState) -> None: ...
+
+    def reset(self, session_id: str) -> None: ...
+
+    def stats(self) -> Dict[str, Any]: ...
+
+
+def _approx_size(value: Any) -> int:
+    if not value:
+        return 0
+    return len(json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":")))
+
+
+class _SharedCaseData(dict):
+    """A dict that can be weakly referenced, so pooled case data dies with its last session."""
+
+
+class _CaseDataPool:
+    """Interns case_data by content; bytes are counted once per distinct case version."""
+
     def __init__(self) -> None:
-        self._sessions: Dict[str, SessionState] = {}
+        self._entries: "weakref.WeakValueDictionary[str, _SharedCaseData]" = weakref.WeakValueDictionary()
+        self.bytes = 0
+        self.shared = 0  # times an existing copy was reused
+
+    def intern(self, case_data: Dict[str, Any]) -> Dict[str, Any]:
+        if isinstance(case_data, _SharedCaseData):
+            return case_data
+        key = json.dumps(case_data, default=str, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        existing = self._entries.get(key)
+        if existing is not None:
+            self.shared += 1
+            return existing
+        pooled = _SharedCaseData(case_data)
+        self._entries[key] = pooled
+        self.bytes += len(key)
+        weakref.finalize(pooled, self._release, len(key))
+        return pooled
+
+    def _release(self, size: int) -> None:
+        self.bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Slot:
+    __slots__ = ("state", "last_used", "bytes")
+
+    def __init__(self, state: SessionState, now: float) -> None:
+        self.state = state
+        self.last_used = now
+        self.bytes = _SESSION_OVERHEAD_BYTES
+
+
+class MemoryStore:
+    def __init__(
+        self,
+        *,
+        idle_ttl_seconds: float = SESSION_IDLE_TTL_SECONDS,
+        max_sessions: int = SESSION_MAX_COUNT,
+        max_bytes: int = SESSION_MAX_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_sessions = max(1, int(max_sessions))
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._sessions: "OrderedDict[str, _Slot]" = OrderedDict()
+        self._case_data = _CaseDataPool()
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self.evictions = {"expired": 0, "max_sessions": 0, "max_bytes": 0}
 
     def get(self, session_id: str) -> SessionState:
         if not session_id:
             session_id = "default"
-        if session_id not in self._sessions:
-            self._sessions[session_id] = SessionState(session_id=session_id)
-        return self._sessions[session_id]
+        with self._lock:
+            now = self._clock()
+            slot = self._sessions.get(session_id)
+            if slot is not None and now - slot.last_used > self.idle_ttl_seconds:
+                self._drop(session_id, "expired")
+                slot = None
+            if slot is None:
+                slot = self._sessions[session_id] = _Slot(SessionState(session_id=session_id), now)
+                self._bytes += slot.bytes
+            else:
+                slot.last_used = now
+                self._sessions.move_to_end(session_id)
+            self._evict(keep=session_id)
+            self._publish()
+            return slot.state
+
+    def save(self, state: SessionState) -> None:
+        """Re-measure a session after a query changed it, sharing its case_data, and enforce the limits."""
+        with self._lock:
+            slot = self._sessions.get(state.session_id)
+            if slot is None or slot.state is not state:
+                return  # evicted or reset while the query ran
+            if state.case_data is not None:
+                state.case_data = self._case_data.intern(state.case_data)
+            size = _SESSION_OVERHEAD_BYTES + sum(
+                _approx_size(v)
+                for v in (state.level2_qa, state.history_digest, state.pending_knowledge_article, state.candidates)
+            )
+            self._bytes += size - slot.bytes
+            slot.bytes = size
+            slot.last_used = self._clock()
+            self._sessions.move_to_end(state.session_id)
+            self._evict(keep=state.session_id)
+            self._publish()
 
     def reset(self, session_id: str) -> None:
-        if session_id in self._sessions:
-            del self._sessions[session_id]
+        with self._lock:
+            if session_id in self._sessions:
+                self._drop(session_id, None)
+                self._publish()
+
+    def _drop(self, session_id: str, reason: Optional[str]) -> None:
+        slot = self._sessions.pop(session_id)
+        self._bytes -= slot.bytes
+        if reason:
+            self.evictions[reason] += 1
+            metrics.session_evictions.inc(reason=reason)
+
+    def _publish(self) -> None:
+        metrics.sessions.set(len(self._sessions))
+        metrics.session_bytes.set(self.total_bytes)
+
+    def _evict(self, *, keep: str) -> None:
+        # Caller holds the lock; sessions are ordered least recently used first
+        now = self._clock()
+        while self._sessions:
+            session_id, slot = next(iter(self._sessions.items()))
+            if session_id == keep:
+                break
+            if now - slot.last_used > self.idle_ttl_seconds:
+                reason = "expired"
+            elif len(self._sessions) > self.max_sessions:
+                reason = "max_sessions"
+            elif self.total_bytes > self.max_bytes:
+                reason = "max_bytes"
+            else:
+                break
+            self._drop(session_id, reason)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes + self._case_data.bytes
+
+    def __len__(self) -> int:
+        return len(self._sessions)
 
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "approx_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "shared_case_data": len(self._case_data),
+                "shared_case_data_bytes": self._case_data.bytes,
+                "case_data_reused": self._case_data.shared,
+                "evictions": dict(self.evictions),
+            }
@@ -0,0 +1,53 @@
+"""
+Wire formats for agent responses.
+
+"full" is the historical payload. "compact" is the same information without the
+duplication: the raw Salesforce record (also present as case_data) and
+case_data["raw_case_data"] are dropped, Salesforce "attributes" metadata and empty
+fields are removed, and instruction text is replaced by its instructions_ref, which
+clients resolve (and cache) through get_instructions / GET /instructions/{id}.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional
+
+from agent.instructions import INSTRUCTIONS
+
+RESPONSE_FORMATS = ("full", "compact")
+DEFAULT_RESPONSE_FORMAT = os.getenv("RESPONSE_FORMAT", "full").lower()
+
+# Copies of a record that is already in the payload under another key
+_DUPLICATE_KEYS = frozenset({"raw_case", "raw_case_data", "attributes"})
+_TEMPLATE_TEXTS = frozenset(template.text for template in INSTRUCTIONS.values())
+
+
+def _strip(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: _strip(item)
+            for key, item in value.items()
+            if key not in _DUPLICATE_KEYS
+            and item is not None
+            and not (key == "instructions" and item in _TEMPLATE_TEXTS)
+        }
+    if isinstance(value, list):
+        return [_strip(item) for item in value]
+    return value
+
+
+def compact(payload: Dict[str, Any]) -> Dict[str, Any]:
+    out = _strip(payload)
+    raw_case = payload.get("raw_case")
+    if isinstance(raw_case, dict) and raw_case.get("Id"):
+        # case_data has no Id; keep it so clients can still address the record
+        out.setdefault("case_id", raw_case["Id"])
+    return out
+
+
+def render(payload: Dict[str, Any], response_format: Optional[str] = None) -> Dict[str, Any]:
+    fmt = (response_format or DEFAULT_RESPONSE_FORMAT).lower()
+    if fmt not in RESPONSE_FORMATS:
+        raise ValueError(f"Unknown response_format {fmt!r}; expected one of {', '.join(RESPONSE_FORMATS)}")
+    return compact(payload) if fmt == "compact" else payload
@@ -0,0 +1,102 @@
+"""
+Concurrent subject search.
+
+A subject query used to try SOSL on the subject, then a keyword SOQL LIKE query, then a
+free-text SOSL search, one after another. SearchRace lets the callers start all of them
+at once and decide when enough has arrived:
+
+- backends are ranked in the order the sequential chain used to try them
+- the race is settled as soon as the best backend that can still answer has returned hits
+  (or every backend has finished); the slower ones are then cancelled
+- records from every finished backend are merged, deduplicated by Id and ranked
+
+The drivers live in agent_core (thread pool) and async_agent (asyncio tasks).
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Backend names in priority order
+SUBJECT_BACKENDS = ("sosl_subject", "keywords", "find_case")
+
+
+class SearchRace:
+    def __init__(self, backends: Tuple[str, ...] = SUBJECT_BACKENDS) -> None:
+        self.backends = backends
+        self.results: Dict[str, List[Dict[str, Any]]] = {}
+        self.errors: Dict[str, str] = {}
+        self.started = time.perf_counter()
+        self.settled_after: Optional[float] = None
+
+    def record(self, name: str, records: Optional[List[Dict[str, Any]]]) -> None:
+        self.results[name] = list(records or [])
+
+    def record_error(self, name: str, error: BaseException) -> None:
+        self.errors[name] = f"{type(error).__name__}: {error}"
+
+    @property
+    def winner(self) -> Optional[str]:
+        """The best backend that has returned hits, if no better one is still running."""
+        for name in self.backends:
+            if name not in self.results and name not in self.errors:
+                return None
+            if self.results.get(name):
+                return name
+        return None
+
+    @property
+    def settled(self) -> bool:
+        if self.winner is not None or len(self.results) + len(self.errors) == len(self.backends):
+            if self.settled_after is None:
+                self.settled_after = time.perf_counter() - self.started
+            return True
+        return False
+
+    def merged(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Dedupe by Id and rank: found by more backends first, then by the best backend,
+        then by how many query terms appear in the Subject, then by backend order.
+        """
+        terms = [t for t in text.lower().split() if t]
+        entries: Dict[Any, Dict[str, Any]] = {}
+        position = 0
+        for rank, name in enumerate(self.backends):
+            for record in self.results.get(name, []):
+                key = record.get("Id") or f"{name}:{position}"
+                entry = entries.get(key)
+                if entry is None:
+                    subject = (record.get("Subject") or "").lower()
+                    entries[key] = {
+                        "record": record,
+                        "backends": 1,
+                        "rank": rank,
+                        "hits": sum(1 for t in terms if t in subject),
+                        "position": position,
+                    }
+                else:
+                    entry["backends"] += 1
+                position += 1
+        ordered = sorted(
+            entries.values(), key=lambda e: (-e["backends"], e["rank"], -e["hits"], e["position"])
+        )
+        return [e["record"] for e in ordered]
+
+    def outcome(self, text: str) -> Tuple[List[Dict[str, Any]], str, Optional[str]]:
+        """(records, source, detail) in the loader convention used by the query flow."""
+        records = self.merged(text)
+        if not records and self.errors and not self.results:
+            return [], "salesforce_error", next(iter(self.errors.values()))
+        return records, "salesforce", None
+
+    def summary(self, cancelled: List[str]) -> Dict[str, Any]:
+        """Log fields describing how the race went."""
+        elapsed = (self.settled_after or (time.perf_counter() - self.started)) * 1000
+        return {
+            "elapsed_ms": round(elapsed),
+            "winner": self.winner,
+            "finished": sorted(self.results),
+            "errors": sorted(self.errors),
+            "cancelled": cancelled,
+        }
@@ -0,0 +1,108 @@
+"""
+Per-session serialization of queries.
+
+A query loads the session, may wait on Salesforce and then changes the state (case_data,
+level2_qa, pending_knowledge_article, candidates), so two queries on the same session,
+e.g. a double-submit from the UI, must not interleave. Each session gets its own lock
+while it has queries running; queries on different sessions never wait on each other.
+
+The sync driver (threads) and the async driver (event loop) use separate lock tables,
+since a process serves queries through one of them. Across worker processes the shared
+session stores' versioned saves take over (agent/session_store.py).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+
+from observability import metrics
+
+
+class _Entry:
+    __slots__ = ("lock", "users")
+
+    def __init__(self, lock: Any) -> None:
+        self.lock = lock
+        self.users = 0  # queries holding or waiting for the lock
+
+
+class SessionLocks:
+    def __init__(self) -> None:
+        self._guard = threading.Lock()
+        self._threads: Dict[str, _Entry] = {}
+        self._tasks: Dict[str, _Entry] = {}
+        self.acquired = 0
+        self.contended = 0
+        self.wait_seconds = 0.0
+
+    def _checkout(self, table: Dict[str, _Entry], session_id: str, factory: Callable[[], Any]) -> _Entry:
+        with self._guard:
+            entry = table.get(session_id)
+            if entry is None:
+                entry = table[session_id] = _Entry(factory())
+            entry.users += 1
+            self.acquired += 1
+            return entry
+
+    def _checkin(self, table: Dict[str, _Entry], session_id: str, entry: _Entry) -> None:
+        with self._guard:
+            entry.users -= 1
+            if entry.users == 0:
+                del table[session_id]
+
+    def _waited(self, seconds: float) -> None:
+        with self._guard:
+            self.contended += 1
+            self.wait_seconds += seconds
+        metrics.session_lock_waits.inc()
+        metrics.session_lock_wait_seconds.observe(seconds)
+
+    @contextmanager
+    def hold(self, session_id: str) -> Iterator[None]:
+        """Hold the session for a query running on this thread."""
+        entry = self._checkout(self._threads, session_id, threading.Lock)
+        try:
+            if not entry.lock.acquire(blocking=False):
+                started = time.perf_counter()
+                entry.lock.acquire()
+                self._waited(time.perf_counter() - started)
+            try:
+                yield
+            finally:
+                entry.lock.release()
+        finally:
+            self._checkin(self._threads, session_id, entry)
+
+    @asynccontextmanager
+    async def ahold(self, session_id: str) -> AsyncIterator[None]:
+        """Hold the session for a query running on the event loop."""
+        entry = self._checkout(self._tasks, session_id, asyncio.Lock)
+        try:
+            if entry.lock.locked():
+                started = time.perf_counter()
+                await entry.lock.acquire()
+                self._waited(time.perf_counter() - started)
+            else:
+                await entry.lock.acquire()
+            try:
+                yield
+            finally:
+                entry.lock.release()
+        finally:
+            self._checkin(self._tasks, session_id, entry)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._guard:
+            return {
+                "active_sessions": len(self._threads) + len(self._tasks),
+                "acquired": self.acquired,
+                "contended": self.contended,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
+session_locks = SessionLocks()
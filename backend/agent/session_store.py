@@ -0,0 +1,286 @@
+"""
+Session stores shared between worker processes and replicas.
+
+With more than one uvicorn worker (or container) a follow-up can land on a process that
+did not answer the previous question, so the session has to live outside the process:
+
+- "memory": agent.memory.MemoryStore, the single-process default
+- "sqlite": one WAL-mode SQLite file shared by the workers on one host (SESSION_STORE_PATH)
+- "redis": any Redis-protocol server shared by every replica (SESSION_REDIS_URL)
+
+Sessions are serialized as compact JSON (zlib-compressed above SESSION_COMPRESS_MIN_BYTES)
+and saved with compare-and-set on a per-session version: if another worker saved the same
+session while this query ran, this save is dropped and counted as a conflict instead of
+overwriting the newer state. Idle sessions expire after SESSION_IDLE_TTL_SECONDS.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import fields
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from agent.memory import SESSION_IDLE_TTL_SECONDS, MemoryStore, SessionState, SessionStore
+from observability.log import get_logger
+
+log = get_logger(__name__)
+
+SESSION_STORE = os.getenv("SESSION_STORE", "memory").lower()
+SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", "sessions.db")
+SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL") or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+SESSION_COMPRESS_MIN_BYTES = int(os.getenv("SESSION_COMPRESS_MIN_BYTES", "1024"))
+
+# Fields that are part of the storage record rather than the serialized body
+_RECORD_FIELDS = frozenset({"session_id", "version"})
+_STATE_FIELDS = tuple(f.name for f in fields(SessionState) if f.name not in _RECORD_FIELDS)
+
+_JSON, _ZLIB = b"j", b"z"
+
+
+def dumps(state: SessionState) -> bytes:
+    """Empty fields are left out; bodies of SESSION_COMPRESS_MIN_BYTES or more are zlib-compressed."""
+    body = {name: value for name in _STATE_FIELDS if (value := getattr(state, name))}
+    raw = json.dumps(body, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(raw) >= SESSION_COMPRESS_MIN_BYTES:
+        return _ZLIB + zlib.compress(raw, 6)
+    return _JSON + raw
+
+
+def loads(session_id: str, data: Optional[bytes], version: int) -> SessionState:
+    state = SessionState(session_id=session_id, version=version)
+    if data:
+        data = bytes(data)
+        raw = zlib.decompress(data[1:]) if data[:1] == _ZLIB else data[1:]
+        for name, value in json.loads(raw).items():
+            if name in _STATE_FIELDS:
+                setattr(state, name, value)
+    return state
+
+
+class _SharedStore(ABC):
+    """
+    Common get/save logic. Backends implement _read (current version and body, None body
+    when absent or expired), _write (compare-and-set, False on a version mismatch) and _delete.
+    """
+
+    backend = "shared"
+
+    def __init__(self, *, idle_ttl_seconds: float = SESSION_IDLE_TTL_SECONDS) -> None:
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.loads = 0
+        self.saves = 0
+        self.conflicts = 0
+
+    def get(self, session_id: str) -> SessionState:
+        if not session_id:
+            session_id = "default"
+        version, data = self._read(session_id)
+        self.loads += 1
+        return loads(session_id, data, version)
+
+    def save(self, state: SessionState) -> None:
+        data = dumps(state)
+        if self._write(state.session_id, data, state.version):
+            state.version += 1
+            self.saves += 1
+            return
+        self.conflicts += 1
+        log.warning(
+            "⚠️ Session changed by another request; keeping the stored version",
+            session_id=state.session_id,
+            version=state.version,
+        )
+
+    def reset(self, session_id: str) -> None:
+        self._delete(session_id)
+
+    @abstractmethod
+    def _read(self, session_id: str) -> Tuple[int, Optional[bytes]]:
+        ...
+
+    @abstractmethod
+    def _write(self, session_id: str, data: bytes, expected_version: int) -> bool:
+        ...
+
+    @abstractmethod
+    def _delete(self, session_id: str) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            "loads": self.loads,
+            "saves": self.saves,
+            "conflicts": self.conflicts,
+        }
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+"""
+
+# Expired rows are deleted once every this many saves
+_PRUNE_EVERY = 500
+
+
+class SQLiteSessionStore(_SharedStore):
+    """Sessions in a WAL-mode SQLite file; every worker on the host opens the same path."""
+
+    backend = "sqlite"
+
+    def __init__(
+        self,
+        path: str = SESSION_STORE_PATH,
+        *,
+        idle_ttl_seconds: float = SESSION_IDLE_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__(idle_ttl_seconds=idle_ttl_seconds)
+        self.path = path
+        self._clock = clock  # wall clock: timestamps are compared across processes
+        self._lock = threading.Lock()
+        self._pid = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._db.executescript(_SCHEMA)
+        self.expired = 0
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared across fork(); each worker process opens its own
+        if self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=5.0)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._pid = os.getpid()
+        return self._connection
+
+    def _read(self, session_id: str) -> Tuple[int, Optional[bytes]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT version, data, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return 0, None
+        version, data, updated_at = row
+        if self._clock() - updated_at > self.idle_ttl_seconds:
+            # Keep the version so the next save still compares against the stored row
+            self.expired += 1
+            return version, None
+        return version, data
+
+    def _write(self, session_id: str, data: bytes, expected_version: int) -> bool:
+        now = self._clock()
+        with self._lock:
+            # Single statements are atomic, so the version check and the write cannot interleave
+            cur = self._db.execute(
+                "UPDATE sessions SET version = version + 1, data = ?, updated_at = ? "
+                "WHERE session_id = ? AND version = ?",
+                (data, now, session_id, expected_version),
+            )
+            written = cur.rowcount == 1
+            if not written and expected_version == 0:
+                cur = self._db.execute(
+                    "INSERT OR IGNORE INTO sessions (session_id, version, data, updated_at) VALUES (?, 1, ?, ?)",
+                    (session_id, data, now),
+                )
+                written = cur.rowcount == 1
+            if written and (self.saves + 1) % _PRUNE_EVERY == 0:
+                self._db.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.idle_ttl_seconds,))
+        return written
+
+    def _delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = self._db.execute("SELECT count(*) FROM sessions").fetchone()[0]
+            data_bytes = self._db.execute("SELECT coalesce(sum(length(data)), 0) FROM sessions").fetchone()[0]
+        return {
+            **super().stats(),
+            "path": self.path,
+            "sessions": sessions,
+            "data_bytes": data_bytes,
+            "expired": self.expired,
+        }
+
+
+class RedisSessionStore(_SharedStore):
+    """
+    Sessions as Redis hashes {v: version, d: body} with a sliding TTL. `client` is anything
+    speaking redis-py's API (redis.Redis, fakeredis.FakeRedis) with decode_responses off; by
+    default one is created from SESSION_REDIS_URL.
+    """
+
+    backend = "redis"
+
+    def __init__(
+        self,
+        client: Any = None,
+        *,
+        url: str = SESSION_REDIS_URL,
+        prefix: str = "sf_agent:session:",
+        idle_ttl_seconds: float = SESSION_IDLE_TTL_SECONDS,
+    ) -> None:
+        super().__init__(idle_ttl_seconds=idle_ttl_seconds)
+        if client is None:
+            import redis  # lazy import
+
+            client = redis.Redis.from_url(url)
+        self._redis = client
+        self.prefix = prefix
+
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+
+    def _read(self, session_id: str) -> Tuple[int, Optional[bytes]]:
+        version, data = self._redis.hmget(self._key(session_id), "v", "d")
+        return int(version or 0), data
+
+    def _write(self, session_id: str, data: bytes, expected_version: int) -> bool:
+        from redis.exceptions import WatchError  # lazy import
+
+        key = self._key(session_id)
+        with self._redis.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if int(pipe.hget(key, "v") or 0) != expected_version:
+                    return False
+                pipe.multi()
+                pipe.hset(key, mapping={"v": expected_version + 1, "d": data})
+                pipe.expire(key, max(1, int(self.idle_ttl_seconds)))
+                pipe.execute()
+                return True
+            except WatchError:
+                return False
+
+    def _delete(self, session_id: str) -> None:
+        self._redis.delete(self._key(session_id))
+
+
+def create_session_store(backend: Optional[str] = None) -> SessionStore:
+    """Build the store named by SESSION_STORE ("memory", "sqlite" or "redis")."""
+    backend = (backend or SESSION_STORE).lower()
+    if backend == "memory":
+        return MemoryStore()
+    if backend == "sqlite":
+        store: SessionStore = SQLiteSessionStore()
+    elif backend == "redis":
+        store = RedisSessionStore()
+    else:
+        raise ValueError(f"Unknown SESSION_STORE {backend!r}; expected memory, sqlite or redis")
+    log.info("🗄️ Shared session store", backend=backend)
+    return store
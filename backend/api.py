@@ -1,21 +1,44 @@
 
 from __future__ import annotations
 
+import json
 import os
 import sys
+from contextlib import asynccontextmanager
 
 if __package__ is None:  # running as a script: `python backend/api.py`
     _repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     if _repo_root not in sys.path:
         sys.path.insert(0, _repo_root)
 
-from tools.ask_tool import ask, salesforce_health
-from fastapi import FastAPI
+from typing import Literal
+
+from agent.instructions import INSTRUCTIONS
+from observability.metrics import CONTENT_TYPE, registry
+from observability.tracing import span
+from tools.ask_tool import ask, ask_stream, get_cases, salesforce_health
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from salesforce.api_budget import api_budget
+    from salesforce.health_probe import health_prober
+
+    health_prober.start()
+    api_budget.start()
+    yield
+    await health_prober.stop()
+    await api_budget.stop()
+    from salesforce.async_client import async_sf
+
+    await async_sf.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -32,15 +55,101 @@ app.add_middleware(
 class QueryRequest(BaseModel):
     query: str
     session_id: str | None = None
+    response_format: Literal["full", "compact"] | None = None
+    context_version: str | None = None
 
 
 @app.post("/query")
-def query_endpoint(req: QueryRequest):
+async def query_endpoint(req: QueryRequest):
     """Query endpoint that uses MCP tools"""
-    return ask(req.query, session_id=req.session_id or "default")
+    payload = await ask(
+        req.query,
+        session_id=req.session_id or "default",
+        response_format=req.response_format,
+        context_version=req.context_version,
+    )
+    with span("serialize.json"):
+        body = json.dumps(payload, default=str, ensure_ascii=False)
+    return Response(content=body, media_type="application/json")
+
+
+class CaseBatchRequest(BaseModel):
+    case_refs: list[str]
+    include_comments: bool = False
+    response_format: Literal["full", "compact"] | None = None
+
+
+@app.post("/cases/batch")
+async def case_batch_endpoint(req: CaseBatchRequest):
+    """Look up many cases by CaseNumber / Case Id with chunked IN (...) queries"""
+    payload = await get_cases(req.case_refs, include_comments=req.include_comments, response_format=req.response_format)
+    if payload.get("type") == "error":
+        raise HTTPException(status_code=400, detail=payload["error"])
+    return payload
+
+
+@app.post("/query/stream")
+async def query_stream_endpoint(req: QueryRequest, request: Request):
+    """
+    Streaming variant of /query: the case header, then each related collection as it
+    arrives, then {"event": "result", "response": ...}. Served as Server-Sent Events when
+    the client accepts text/event-stream, NDJSON otherwise.
+    """
+    events = ask_stream(
+        req.query,
+        session_id=req.session_id or "default",
+        response_format=req.response_format,
+        context_version=req.context_version,
+    )
+    sse = "text/event-stream" in request.headers.get("accept", "")
+
+    async def body():
+        async for event in events:
+            data = json.dumps(event, default=str)
+            yield f"event: {event['event']}\ndata: {data}\n\n" if sse else data + "\n"
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/instructions/{template_id}")
+async def instructions_endpoint(template_id: str, response: Response):
+    """Instruction template referenced by instructions_ref in compact responses (cacheable)"""
+    template = INSTRUCTIONS.get(template_id)
+    if template is None:
+        raise HTTPException(status_code=404, detail=f"Unknown instruction template '{template_id}'")
+    response.headers["ETag"] = f'"{template.id}-v{template.version}"'
+    response.headers["Cache-Control"] = "public, max-age=86400"
+    return template.as_dict()
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus metrics: per-stage latency, queries by type/outcome, Salesforce calls by function"""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/health/live")
+async def liveness_endpoint():
+    """Liveness: the process answers, whatever the state of Salesforce"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_endpoint(response: Response):
+    """Readiness from the background Salesforce probe's cached result"""
+    from salesforce.health_probe import health_prober
+
+    ready = health_prober.ready()
+    if not ready:
+        response.status_code = 503
+    return {"status": "ready" if ready else "not_ready", "probe": health_prober.snapshot()}
 
 
 @app.get("/health/salesforce")
-def salesforce_health_endpoint():
-    """Health check using MCP tool"""
-    return salesforce_health()
+async def salesforce_health_endpoint(refresh: bool = False):
+    """Health check using MCP tool; cached unless refresh=true"""
+    return await salesforce_health(refresh=refresh)
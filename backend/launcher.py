@@ -0,0 +1,198 @@
+"""
+Production launcher: pre-forked uvicorn workers (WEB_CONCURRENCY, "auto" = one per core).
+
+The parent process imports the app together with the modules that are otherwise
+imported lazily on the first request, binds the listening socket and then forks
+the workers, so the import cost is paid once and the loaded code is shared
+copy-on-write. Every worker runs its own event loop on the shared socket and only
+starts accepting connections once its lifespan startup (including the Salesforce
+warm-up in server.py) has finished. The parent restarts workers that die and
+forwards SIGTERM / SIGINT for a graceful shutdown.
+
+Conversation state is per process unless SESSION_STORE is sqlite or redis
+(see agent/session_store.py).
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import signal
+import socket
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import uvicorn
+
+from observability.log import get_logger
+
+log = get_logger(__name__)
+
+# "auto" = one worker per available core (respecting CPU affinity and cgroup quotas)
+SERVER_WORKERS = os.getenv("WEB_CONCURRENCY", "1")
+SERVER_GRACEFUL_TIMEOUT_SECONDS = float(os.getenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30"))
+
+# Modules the request path imports lazily; loading them before fork shares them between workers
+PRELOAD_MODULES = (
+    "simple_salesforce",
+    "salesforce.connection",
+    "salesforce.case_cache",
+    "salesforce.case_queries",
+    "salesforce.async_case_queries",
+    "salesforce.case_mirror",
+    "salesforce.health",
+    "salesforce.resilience",
+    "agent.response_format",
+)
+
+# Respawning faster than this means the worker is crash looping
+_MIN_WORKER_LIFETIME_SECONDS = 5.0
+
+
+def available_cpus() -> int:
+    """Cores this process may use: CPU affinity, capped by a cgroup v2 / v1 CPU quota (containers)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            limit, period = f.read().split()[:2]
+            if limit != "max":
+                quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                limit = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+    if quota is not None:
+        cpus = min(cpus, max(1, int(quota)))
+    return max(1, cpus)
+
+
+def worker_count(value: Optional[str] = None) -> int:
+    value = (value if value is not None else SERVER_WORKERS).strip().lower()
+    if value in {"", "auto", "0"}:
+        return available_cpus()
+    return max(1, int(value))
+
+
+def server_options() -> Dict[str, str]:
+    """uvloop / httptools when installed (pip install uvloop httptools), else the pure-Python defaults."""
+    options = {"loop": "asyncio", "http": "h11"}
+    for option, module, name in (("loop", "uvloop", "uvloop"), ("http", "httptools", "httptools")):
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            continue
+        options[option] = name
+    return options
+
+
+def preload(modules: Iterable[str] = PRELOAD_MODULES) -> None:
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            log.warning("Preload failed", module=name, error=f"{type(e).__name__}: {e}")
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app: Any, sock: socket.socket, options: Dict[str, str]) -> None:
+    # Back to default signal handling; uvicorn installs its own graceful-shutdown handlers
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(app, lifespan="on", **options)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(app: Any, sock: socket.socket, options: Dict[str, str]) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(app, sock, options)
+        except BaseException:
+            log.exception("Worker crashed", pid=os.getpid())
+            code = 1
+        finally:
+            from observability.log import flush  # lazy import
+
+            flush()
+            os._exit(code)
+    log.info("Worker started", pid=pid)
+    return pid
+
+
+def serve(app: Any, *, host: str, port: int, workers: Optional[int] = None) -> None:
+    """Serve `app` with `workers` processes (default: WEB_CONCURRENCY); one worker runs in-process."""
+    workers = workers or worker_count()
+    options = server_options()
+    log.info("🚀 Starting server", host=host, port=port, workers=workers, **options)
+    if workers == 1 or not hasattr(os, "fork"):
+        uvicorn.run(app, host=host, port=port, **options)
+        return
+
+    preload()
+    sock = _bind(host, port)
+    children: Dict[int, float] = {}  # pid -> start time
+    deadline: Optional[float] = None  # set once shutdown starts
+
+    def _stop(signum: int, frame: Any) -> None:
+        nonlocal deadline
+        if deadline is None:
+            deadline = time.monotonic() + SERVER_GRACEFUL_TIMEOUT_SECONDS
+        _signal_children(children, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    for _ in range(workers):
+        children[_spawn(app, sock, options)] = time.monotonic()
+
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            if deadline is not None and time.monotonic() > deadline:
+                log.warning("Graceful shutdown timed out; killing workers", workers=len(children))
+                _signal_children(children, signal.SIGKILL)
+                deadline = float("inf")
+            time.sleep(0.2)
+            continue
+        started = children.pop(pid, None)
+        if started is None:
+            continue
+        if deadline is not None:
+            log.info("Worker stopped", pid=pid)
+            continue
+        log.warning("Worker exited; restarting", pid=pid, exit_code=os.waitstatus_to_exitcode(status))
+        if time.monotonic() - started < _MIN_WORKER_LIFETIME_SECONDS:
+            time.sleep(_MIN_WORKER_LIFETIME_SECONDS)
+        children[_spawn(app, sock, options)] = time.monotonic()
+
+    sock.close()
+    log.info("Server stopped")
+
+
+def _signal_children(children: Dict[int, float], signum: int) -> None:
+    for pid in list(children):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
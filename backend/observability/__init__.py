@@ -0,0 +1,2 @@
+"""Logging, tracing and metrics shared by the agent and the Salesforce layer."""
+
@@ -0,0 +1,205 @@
+"""
+Structured, non-blocking logging.
+
+get_logger(name) returns a logger whose calls take an event message plus key/value
+fields. Records are handed to a queue in the calling thread and formatted / written by
+a single background listener, so a request never waits on stderr. On top of the level
+threshold (LOG_LEVEL):
+
+- DEBUG events are sampled (LOG_DEBUG_SAMPLE_RATE), except when the sample rate is 1
+- field values are rendered compactly and truncated to LOG_MAX_FIELD_CHARS, so a record
+  list or a SOSL statement never lands in the log in full by default
+- LOG_FORMAT=json emits one JSON object per line instead of "key=value" text
+
+All loggers live under the "sf_agent" namespace so third-party libraries keep their own
+configuration.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+ROOT = "sf_agent"
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+LOG_MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", "200"))
+
+
+def truncate(value: Any, limit: int = LOG_MAX_FIELD_CHARS) -> str:
+    """Render a field value on one line, cut to `limit` characters (0 = no limit)."""
+    if isinstance(value, str):
+        text = value
+    else:
+        try:
+            text = json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":"))
+        except (TypeError, ValueError):
+            text = repr(value)
+    if isinstance(value, (list, tuple)) and limit and len(text) > limit:
+        text = f"[{len(value)} items] {text}"
+    if limit and len(text) > limit:
+        return f"{text[:limit]}… (+{len(text) - limit} chars)"
+    return text
+
+
+class DebugSampler(logging.Filter):
+    """Keep every record at INFO and above, and a `rate` fraction of DEBUG records."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self, max_chars: int = LOG_MAX_FIELD_CHARS) -> None:
+        super().__init__("%(asctime)s %(levelname)s %(name)s %(message)s")
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{k}={truncate(v, self.max_chars)}" for k, v in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    def __init__(self, max_chars: int = LOG_MAX_FIELD_CHARS) -> None:
+        super().__init__()
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        out: Dict[str, Any] = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in (getattr(record, "fields", None) or {}).items():
+            out[key] = value if isinstance(value, (int, float, bool)) or value is None else truncate(value, self.max_chars)
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, ensure_ascii=False)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class StructLogger:
+    """Thin wrapper: log.info("🔍 Routed query", kind="case_number", case_id=None)."""
+
+    __slots__ = ("_logger",)
+
+    def __init__(self, logger: logging.Logger) -> None:
+        self._logger = logger
+
+    def enabled(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
+    def _log(self, level: int, msg: str, fields: Dict[str, Any], exc_info: Any = None) -> None:
+        if self._logger.isEnabledFor(level):
+            self._logger._log(level, msg, (), exc_info=exc_info, extra={"fields": fields}, stacklevel=3)
+
+    def debug(self, msg: str, **fields: Any) -> None:
+        self._log(logging.DEBUG, msg, fields)
+
+    def info(self, msg: str, **fields: Any) -> None:
+        self._log(logging.INFO, msg, fields)
+
+    def warning(self, msg: str, **fields: Any) -> None:
+        self._log(logging.WARNING, msg, fields)
+
+    def error(self, msg: str, **fields: Any) -> None:
+        self._log(logging.ERROR, msg, fields)
+
+    def exception(self, msg: str, **fields: Any) -> None:
+        self._log(logging.ERROR, msg, fields, exc_info=True)
+
+
+_configure_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure(
+    *,
+    level: str = LOG_LEVEL,
+    fmt: str = LOG_FORMAT,
+    sample_rate: float = LOG_DEBUG_SAMPLE_RATE,
+    max_chars: int = LOG_MAX_FIELD_CHARS,
+    stream: Any = None,
+) -> None:
+    """(Re)configure the sf_agent logger tree; get_logger does this with the env defaults."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+        root = logging.getLogger(ROOT)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter(max_chars) if fmt == "json" else TextFormatter(max_chars))
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        handler = _DeferredQueueHandler(records)
+        handler.addFilter(DebugSampler(sample_rate))
+
+        root.addHandler(handler)
+        root.setLevel(level)
+        root.propagate = False
+        _listener = logging.handlers.QueueListener(records, output)
+        _listener.start()
+
+
+def flush() -> None:
+    """Write everything queued so far (restarts the listener)."""
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener.start()
+
+
+def _shutdown() -> None:
+    if _listener is not None:
+        _listener.stop()
+
+
+def _restart_after_fork() -> None:
+    # The listener thread does not survive fork(), and records still queued in the parent
+    # would be written twice: a forked worker gets a fresh queue and listener
+    global _listener
+    if _listener is None:
+        return
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    for handler in logging.getLogger(ROOT).handlers:
+        if isinstance(handler, _DeferredQueueHandler):
+            handler.queue = records
+    _listener = logging.handlers.QueueListener(records, *_listener.handlers)
+    _listener.start()
+
+
+atexit.register(_shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def get_logger(name: str) -> StructLogger:
+    if _listener is None:
+        configure()
+    return StructLogger(logging.getLogger(f"{ROOT}.{name}"))
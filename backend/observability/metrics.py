@@ -0,0 +1,177 @@
+"""
+In-process metrics in the Prometheus text exposition format (0.0.4).
+
+Counters, gauges and histograms are kept per label set in a single registry and rendered by
+/metrics on server.py and api.py; there is no dependency on prometheus_client. Each
+process keeps its own registry, so a multi-worker deployment is scraped per worker.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels.get(n, "")) for n in self.labelnames), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}_total{_labels(self.labelnames, key)} {_number(v)}" for key, v in items]
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels.get(n, "")) for n in self.labelnames), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(v)}" for key, v in items]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._values.get(tuple(str(labels.get(n, "")) for n in self.labelnames))
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, n in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_number(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {series[-1]!r}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_number(cumulative)}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, "Counter | Gauge | Histogram"] = {}
+
+    def register(self, metric: "Counter | Gauge | Histogram") -> "Counter | Gauge | Histogram":
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+stage_seconds = registry.register(Histogram(
+    "sf_agent_stage_duration_seconds", "Time spent per request stage", ("stage", "outcome")
+))
+queries = registry.register(Counter(
+    "sf_agent_queries", "Answered queries by response type and outcome", ("query_type", "outcome")
+))
+query_seconds = registry.register(Histogram(
+    "sf_agent_query_duration_seconds", "End-to-end query latency by response type", ("query_type",)
+))
+salesforce_requests = registry.register(Counter(
+    "sf_agent_salesforce_requests", "Salesforce query functions called, by outcome", ("function", "outcome")
+))
+salesforce_seconds = registry.register(Histogram(
+    "sf_agent_salesforce_request_duration_seconds", "Salesforce query function latency", ("function", "outcome")
+))
+sessions = registry.register(Gauge("sf_agent_sessions", "Conversation sessions held in memory"))
+session_bytes = registry.register(Gauge(
+    "sf_agent_session_bytes", "Approximate memory held by sessions, including shared case data"
+))
+session_evictions = registry.register(Counter(
+    "sf_agent_session_evictions", "Sessions dropped by the memory store, by reason", ("reason",)
+))
+session_lock_waits = registry.register(Counter(
+    "sf_agent_session_lock_waits", "Queries that waited for another query on the same session"
+))
+session_lock_wait_seconds = registry.register(Histogram(
+    "sf_agent_session_lock_wait_seconds", "Time contended queries waited for their session"
+))
+salesforce_up = registry.register(Gauge("sf_agent_salesforce_up", "1 if the last Salesforce health probe succeeded"))
+salesforce_probe_seconds = registry.register(Histogram(
+    "sf_agent_salesforce_probe_duration_seconds", "Salesforce health probe latency", ("outcome",)
+))
+salesforce_api_remaining = registry.register(Gauge(
+    "sf_agent_salesforce_api_remaining", "Daily Salesforce API requests remaining for the org"
+))
+salesforce_api_max = registry.register(Gauge("sf_agent_salesforce_api_max", "Daily Salesforce API request allowance"))
+salesforce_background_calls = registry.register(Counter(
+    "sf_agent_salesforce_background_calls", "Non-essential Salesforce calls by kind and throttle outcome",
+    ("kind", "outcome"),
+))
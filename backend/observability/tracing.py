@@ -0,0 +1,171 @@
+"""
+Latency spans for the request path.
+
+span("intent") / span("salesforce.bundle") / span("payload") / span("serialize") time a
+stage into sf_agent_stage_duration_seconds; @traced_query does the same for each
+Salesforce query function (per function and outcome), and record_query counts answered
+queries by response type.
+
+When OTEL_EXPORTER_OTLP_ENDPOINT is set and the OpenTelemetry SDK and OTLP exporter are
+installed, every span is also exported to that collector (service OTEL_SERVICE_NAME).
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, Dict, Iterator, Optional
+
+from observability import metrics
+from observability.log import get_logger
+
+log = get_logger(__name__)
+
+OTEL_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "salesforce-mcp-agent")
+
+_tracer: Any = None
+_tracer_lock = threading.Lock()
+_tracer_ready = False
+
+
+def _otel_tracer() -> Any:
+    """The OpenTelemetry tracer, or None when exporting is not configured / not installed."""
+    global _tracer, _tracer_ready
+    if _tracer_ready:
+        return _tracer
+    with _tracer_lock:
+        if not _tracer_ready:
+            _tracer = _build_tracer() if OTEL_ENDPOINT else None
+            _tracer_ready = True
+    return _tracer
+
+
+def _build_tracer() -> Any:
+    try:
+        from opentelemetry import trace  # lazy import
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        log.warning("⚠️ OpenTelemetry export disabled: SDK not installed", error=str(e))
+        return None
+    provider = TracerProvider(resource=Resource.create({"service.name": OTEL_SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    log.info("📡 Exporting spans over OTLP", endpoint=OTEL_ENDPOINT, service=OTEL_SERVICE_NAME)
+    return trace.get_tracer("sf_agent")
+
+
+class Span:
+    __slots__ = ("name", "attributes", "outcome", "_otel")
+
+    def __init__(self, name: str, attributes: Dict[str, Any], otel: Any) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.outcome = "ok"
+        self._otel = otel
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+        if self._otel is not None:
+            for key, value in attributes.items():
+                if value is not None:
+                    self._otel.set_attribute(key, value if isinstance(value, (str, bool, int, float)) else str(value))
+
+
+@contextmanager
+def _timed(name: str, attributes: Dict[str, Any], record: Callable[[Span, float], None]) -> Iterator[Span]:
+    tracer = _otel_tracer()
+    if tracer is None:
+        current = Span(name, attributes, None)
+        started = time.perf_counter()
+        try:
+            yield current
+        except BaseException:
+            current.outcome = "error"
+            raise
+        finally:
+            record(current, time.perf_counter() - started)
+        return
+
+    with tracer.start_as_current_span(name) as otel_span:
+        current = Span(name, {}, otel_span)
+        current.set(**attributes)
+        started = time.perf_counter()
+        try:
+            yield current
+        except BaseException:
+            current.outcome = "error"
+            raise
+        finally:
+            record(current, time.perf_counter() - started)
+            otel_span.set_attribute("outcome", current.outcome)
+
+
+def _record_stage(current: Span, seconds: float) -> None:
+    metrics.stage_seconds.observe(seconds, stage=current.name, outcome=current.outcome)
+
+
+def span(name: str, **attributes: Any) -> ContextManager[Span]:
+    """Time one stage of a request; set span.outcome to override "ok" / "error"."""
+    return _timed(name, attributes, _record_stage)
+
+
+def observe_stage(name: str, seconds: float, outcome: str = "ok") -> None:
+    """Record a stage whose duration was measured by the caller."""
+    metrics.stage_seconds.observe(seconds, stage=name, outcome=outcome)
+
+
+def record_query(payload: Dict[str, Any], seconds: float) -> None:
+    query_type = str(payload.get("type") or "unknown")
+    outcome = "error" if query_type == "error" else "ok"
+    metrics.queries.inc(query_type=query_type, outcome=outcome)
+    metrics.query_seconds.observe(seconds, query_type=query_type)
+
+
+def _query_outcome(result: Any) -> str:
+    return "ok" if result else "empty"
+
+
+def _record_salesforce(current: Span, seconds: float) -> None:
+    function = current.attributes["function"]
+    metrics.salesforce_requests.inc(function=function, outcome=current.outcome)
+    metrics.salesforce_seconds.observe(seconds, function=function, outcome=current.outcome)
+
+
+def traced_query(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorator timing a (sync or async) Salesforce query function; outcome is ok / empty / error."""
+    function = fn.__name__
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with _timed(f"salesforce.{function}", {"function": function, "api": "async"}, _record_salesforce) as s:
+                result = await fn(*args, **kwargs)
+                s.outcome = _query_outcome(result)
+                return result
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with _timed(f"salesforce.{function}", {"function": function, "api": "sync"}, _record_salesforce) as s:
+            result = fn(*args, **kwargs)
+            s.outcome = _query_outcome(result)
+            return result
+
+    return wrapper
+
+
+def reset_tracer(tracer: Optional[Any] = None) -> None:
+    """Replace the OpenTelemetry tracer (tests, or re-initialising after a fork)."""
+    global _tracer, _tracer_ready
+    with _tracer_lock:
+        _tracer, _tracer_ready = tracer, True
@@ -0,0 +1,176 @@
+"""
+Salesforce API request budget and throttling of non-essential calls.
+
+The org's daily API request allowance (a rolling 24 hours) is tracked from the
+Sforce-Limit-Info header Salesforce returns on REST responses ("api-usage=used/max") and
+from GET /limits (DailyApiRequests), polled every SF_LIMITS_POLL_SECONDS, and published
+as metrics.
+
+Background work (candidate prefetch, stale case cache refreshes, case mirror sync, health
+probes) takes tokens from a bucket refilled at SF_BACKGROUND_CALLS_PER_MINUTE. The refill
+rate shrinks linearly once the remaining share of the allowance falls below
+SF_API_SLOWDOWN_FRACTION and stops below SF_API_RESERVE_FRACTION, leaving the reserve to
+user queries, which are never throttled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from observability import metrics
+from observability.log import get_logger
+
+log = get_logger(__name__)
+
+SF_LIMITS_POLL_SECONDS = float(os.getenv("SF_LIMITS_POLL_SECONDS", "300"))
+SF_BACKGROUND_CALLS_PER_MINUTE = float(os.getenv("SF_BACKGROUND_CALLS_PER_MINUTE", "60"))
+SF_BACKGROUND_BURST = float(os.getenv("SF_BACKGROUND_BURST", "20"))
+SF_API_SLOWDOWN_FRACTION = float(os.getenv("SF_API_SLOWDOWN_FRACTION", "0.5"))
+SF_API_RESERVE_FRACTION = float(os.getenv("SF_API_RESERVE_FRACTION", "0.1"))
+
+_API_USAGE = re.compile(r"(?:^|[;,\s])api-usage=(\d+)/(\d+)")
+
+
+class ApiBudget:
+    def __init__(
+        self,
+        *,
+        calls_per_minute: float = SF_BACKGROUND_CALLS_PER_MINUTE,
+        burst: float = SF_BACKGROUND_BURST,
+        slowdown_fraction: float = SF_API_SLOWDOWN_FRACTION,
+        reserve_fraction: float = SF_API_RESERVE_FRACTION,
+        poll_seconds: float = SF_LIMITS_POLL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.calls_per_minute = calls_per_minute
+        self.burst = burst
+        self.slowdown_fraction = slowdown_fraction
+        self.reserve_fraction = reserve_fraction
+        self.poll_seconds = poll_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = burst
+        self._refilled_at = clock()
+        self._task: Optional[asyncio.Task] = None
+        self.used: Optional[int] = None
+        self.max: Optional[int] = None
+        self.responded_at: Optional[float] = None  # last usage header or /limits answer
+        self.allowed: Dict[str, int] = {}
+        self.throttled: Dict[str, int] = {}
+
+    # ------------------------------------------------------------ observing
+
+    def observe_header(self, value: Optional[str]) -> None:
+        """Record the usage from a Sforce-Limit-Info response header."""
+        match = _API_USAGE.search(value) if value else None
+        if match:
+            self._set(int(match.group(1)), int(match.group(2)))
+
+    def observe_limits(self, limits: Dict[str, Any]) -> None:
+        """Record the usage from a GET /limits response."""
+        daily = (limits or {}).get("DailyApiRequests") or {}
+        if "Max" in daily and "Remaining" in daily:
+            self._set(int(daily["Max"]) - int(daily["Remaining"]), int(daily["Max"]))
+
+    def _set(self, used: int, max_: int) -> None:
+        with self._lock:
+            self.used, self.max = used, max_
+            self.responded_at = self._clock()
+        metrics.salesforce_api_remaining.set(max(0, max_ - used))
+        metrics.salesforce_api_max.set(max_)
+
+    def responded_within(self, seconds: float) -> bool:
+        """Whether Salesforce answered a request (or the /limits poll) in the last `seconds`."""
+        responded_at = self.responded_at
+        return responded_at is not None and self._clock() - responded_at <= seconds
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if self.max is None:
+            return None
+        return max(0, self.max - self.used)
+
+    @property
+    def remaining_fraction(self) -> Optional[float]:
+        if not self.max:
+            return None
+        return self.remaining / self.max
+
+    # ----------------------------------------------------------- throttling
+
+    def rate_factor(self) -> float:
+        """Share of the configured background rate allowed at the current budget (1 when unknown)."""
+        fraction = self.remaining_fraction
+        if fraction is None or fraction >= self.slowdown_fraction:
+            return 1.0
+        if fraction <= self.reserve_fraction:
+            return 0.0
+        return (fraction - self.reserve_fraction) / (self.slowdown_fraction - self.reserve_fraction)
+
+    def allow(self, kind: str) -> bool:
+        """Take a token for one non-essential call; False means skip or defer it."""
+        factor = self.rate_factor()
+        with self._lock:
+            now = self._clock()
+            refill = (now - self._refilled_at) * self.calls_per_minute / 60.0 * factor
+            self._tokens = min(self.burst, self._tokens + refill)
+            self._refilled_at = now
+            ok = factor > 0 and self._tokens >= 1
+            if ok:
+                self._tokens -= 1
+            counts = self.allowed if ok else self.throttled
+            counts[kind] = counts.get(kind, 0) + 1
+        metrics.salesforce_background_calls.inc(kind=kind, outcome="allowed" if ok else "throttled")
+        if not ok:
+            log.debug("Background Salesforce call throttled", kind=kind, remaining=self.remaining)
+        return ok
+
+    # -------------------------------------------------------------- polling
+
+    async def poll(self) -> None:
+        from salesforce.async_client import async_sf  # lazy import
+
+        self.observe_limits(await async_sf.restful("limits/"))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except Exception as e:
+                log.warning("⚠️ Salesforce limits poll failed", error=f"{type(e).__name__}: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self) -> None:
+        """Poll /limits in the background on the running event loop."""
+        if self.poll_seconds > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        fraction = self.remaining_fraction
+        with self._lock:
+            return {
+                "used": self.used,
+                "max": self.max,
+                "remaining": self.remaining,
+                "remaining_fraction": round(fraction, 4) if fraction is not None else None,
+                "background_rate_factor": round(self.rate_factor(), 3),
+                "background_allowed": dict(self.allowed),
+                "background_throttled": dict(self.throttled),
+            }
+
+
+api_budget = ApiBudget()
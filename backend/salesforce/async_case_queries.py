@@ -0,0 +1,169 @@
+"""
+Async counterparts of salesforce.case_queries, sharing the same query text and
+result shapes but running on the pooled async client.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from simple_salesforce.exceptions import SalesforceMalformedRequest
+
+from observability.tracing import traced_query
+from salesforce import case_queries as q
+from salesforce.async_client import async_sf
+from salesforce.singleflight import coalesce
+
+
+async def aiter_result(result, *, max_rows: int | None = None, page_size: int | None = None):
+    """Async twin of case_queries.iter_result: follows nextRecordsUrl as records are consumed."""
+    rows = 0
+    while result:
+        for record in result.get("records", []):
+            if max_rows is not None and rows >= max_rows:
+                return
+            rows += 1
+            yield record
+        next_url = result.get("nextRecordsUrl")
+        if result.get("done", True) or not next_url or (max_rows is not None and rows >= max_rows):
+            return
+        result = await async_sf.query_more(next_url, headers=q.page_headers(page_size))
+
+
+async def aiter_query(soql: str, *, max_rows: int | None = q.QUERY_MAX_ROWS, page_size: int | None = None):
+    first_page = await async_sf.query(soql, headers=q.page_headers(page_size))
+    async for record in aiter_result(first_page, max_rows=max_rows, page_size=page_size):
+        yield record
+
+
+async def _collect(soql: str, max_rows: int | None = q.QUERY_MAX_ROWS):
+    return [record async for record in aiter_query(soql, max_rows=max_rows)]
+
+
+@coalesce
+@traced_query
+async def get_case_with_id(case_id: str):
+    return (await async_sf.query(q.case_by_id_query(case_id))).get("records", [])
+
+
+@coalesce
+@traced_query
+async def get_case(case_number: str):
+    return (await async_sf.query(q.case_by_number_query(case_number)))["records"]
+
+
+@coalesce
+@traced_query
+async def get_case_modstamp(case_id: str):
+    records = (await async_sf.query(q.case_modstamp_query(case_id))).get("records", [])
+    return records[0].get("SystemModstamp") if records else None
+
+
+@coalesce
+@traced_query
+async def find_case(search_text: str, fields: str = "full"):
+    return (await async_sf.search(q.find_case_search(search_text, fields))).get("searchRecords", [])
+
+
+@coalesce
+@traced_query
+async def list_cases_by_status(statuses: list[str], limit: int = 20, fields: str = "status"):
+    if not statuses:
+        return []
+    return await _collect(q.cases_by_status_query(statuses, limit, fields), max_rows=limit)
+
+
+@coalesce
+@traced_query
+async def get_case_comments(case_id: str, max_rows: int = q.QUERY_MAX_ROWS):
+    return await _collect(q.case_comments_query(case_id), max_rows=max_rows)
+
+
+@coalesce
+@traced_query
+async def get_case_history(case_id: str):
+    return await _collect(q.case_history_query(case_id))
+
+
+@coalesce
+@traced_query
+async def get_case_feed(case_id: str):
+    return await _collect(q.case_feed_query(case_id))
+
+
+@coalesce
+@traced_query
+async def get_case_by_compliance(compliance_no: str, fields: str = "full"):
+    return await _collect(q.case_by_compliance_query(compliance_no, fields))
+
+
+@coalesce
+@traced_query
+async def get_case_by_subject(subject: str, fields: str = "full"):
+    return (await async_sf.search(q.case_by_subject_search(subject, fields))).get("searchRecords", [])
+
+
+@coalesce
+@traced_query
+async def search_cases_by_keywords(keywords: str, max_rows: int | None = q.QUERY_MAX_ROWS, fields: str = "full"):
+    return await _collect(q.cases_by_keywords_query(keywords, limit=max_rows, fields=fields), max_rows=max_rows)
+
+
+@coalesce
+@traced_query
+async def get_case_with_related(*, case_id: str | None = None, case_number: str | None = None, parts=("comments", "history", "feed")):
+    where = q.case_where(case_id=case_id, case_number=case_number)
+    try:
+        records = (await async_sf.query(q.case_with_related_query(where, parts))).get("records", [])
+        case, related, errors = q.split_related(records, parts)
+    except SalesforceMalformedRequest:
+        api_version = await async_sf.api_version()
+        result = await async_sf.restful(
+            "composite", method="POST", json=q.composite_related_request(where, parts, api_version)
+        )
+        case, related, errors = q.parse_composite_related(result, parts)
+    drained = {}
+    for part, child in related.items():
+        drained[part] = [record async for record in aiter_result(child, max_rows=q.QUERY_MAX_ROWS)]
+    return case, drained, errors
+
+
+@traced_query
+async def get_cases_by_refs(case_ids, case_numbers, fields: str = "full"):
+    """
+    Batch lookup: one `Id IN (...)` / `CaseNumber IN (...)` statement per chunk, all chunks
+    concurrently. Returns (records, {ref: exception} for chunks that failed, statements issued).
+    """
+    chunks = [(chunk, q.cases_by_ids_query(chunk, fields)) for chunk in q.chunked(case_ids)]
+    chunks += [(chunk, q.cases_by_numbers_query(chunk, fields)) for chunk in q.chunked(case_numbers)]
+    results = await asyncio.gather(*(_collect(soql, max_rows=None) for _, soql in chunks), return_exceptions=True)
+    records, failed = [], {}
+    for (chunk, _), result in zip(chunks, results):
+        if isinstance(result, Exception):
+            failed.update((ref, result) for ref in chunk)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            records.extend(result)
+    return records, failed, len(chunks)
+
+
+@traced_query
+async def get_comments_by_parent_ids(case_ids, max_rows: int | None = None):
+    """
+    Comments for many cases with one `ParentId IN (...)` statement per chunk, each capped at
+    max_rows. Returns (records, statements issued, Ids of the cases whose comments may be
+    incomplete because their chunk hit the cap).
+    """
+    id_chunks = list(q.chunked(case_ids))
+    chunks = await asyncio.gather(
+        *(_collect(q.comments_by_parent_query(chunk), max_rows=max_rows) for chunk in id_chunks)
+    )
+    incomplete = set()
+    for ids, rows in zip(id_chunks, chunks):
+        if max_rows is not None and len(rows) >= max_rows:
+            # Rows come ordered by ParentId: the cases seen before the last one are complete,
+            # the last one may be cut off and the rest may not have been reached
+            complete = {row.get("ParentId") for row in rows} - {rows[-1].get("ParentId")}
+            incomplete.update(case_id for case_id in ids if case_id not in complete)
+    return [record for chunk in chunks for record in chunk], len(chunks), incomplete
@@ -0,0 +1,129 @@
+"""
+Non-blocking Salesforce REST client.
+
+Reuses the session managed by salesforce.connection and sends requests over a
+pooled keep-alive httpx.AsyncClient, so many queries can be in flight at once
+without tying up a worker thread each.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+from simple_salesforce.util import exception_handler
+
+from salesforce.api_budget import api_budget
+
+
+def _is_invalid_session(response: httpx.Response) -> bool:
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return isinstance(body, list) and bool(body) and body[0].get("errorCode") == "INVALID_SESSION_ID"
+
+
+class AsyncSalesforceClient:
+    def __init__(
+        self,
+        *,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        timeout_seconds: float = 30.0,
+    ) -> None:
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._timeout = httpx.Timeout(timeout_seconds)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # httpx clients are bound to the loop they were first used on
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(limits=self._limits, timeout=self._timeout)
+            self._loop = loop
+        return self._client
+
+    @staticmethod
+    async def _connection():
+        from salesforce.connection import connection_manager  # lazy import
+
+        # Logging in is blocking; aget() only leaves the event loop when it has to
+        return await connection_manager.aget()
+
+    @staticmethod
+    def _base_url(sf) -> str:
+        return f"https://{sf.sf_instance}/services/data/v{sf.sf_version}/"
+
+    async def api_version(self) -> str:
+        return (await self._connection()).sf_version
+
+    async def _request(self, method: str, url: str, *, name: str = "", **kwargs: Any) -> httpx.Response:
+        from salesforce.resilience import guard  # lazy import
+
+        return await guard.acall(self._send, method, url, name=name, idempotent=method == "GET", **kwargs)
+
+    async def _send(
+        self, method: str, url: str, *, name: str = "", extra_headers: Optional[Dict[str, str]] = None, **kwargs: Any
+    ) -> httpx.Response:
+        client = self._get_client()
+        for attempt in range(2):
+            sf = await self._connection()
+            headers = {"Authorization": f"Bearer {sf.session_id}", "Content-Type": "application/json"}
+            headers.update(extra_headers or {})
+            response = await client.request(method, url, headers=headers, **kwargs)
+            if response.status_code == 401 and attempt == 0 and _is_invalid_session(response):
+                # Log in again off the event loop, then retry once with the new token
+                from salesforce.connection import connection_manager  # lazy import
+
+                await asyncio.to_thread(connection_manager.refresh, sf.session_id)
+                continue
+            break
+        api_budget.observe_header(response.headers.get("Sforce-Limit-Info"))
+        if response.status_code >= 300:
+            exception_handler(response, name=name)
+        return response
+
+    async def query(self, soql: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        sf = await self._connection()
+        response = await self._request(
+            "GET", self._base_url(sf) + "query/", name="query", params={"q": soql}, extra_headers=headers
+        )
+        return response.json()
+
+    async def query_more(self, next_records_url: str, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        sf = await self._connection()
+        response = await self._request(
+            "GET", f"https://{sf.sf_instance}{next_records_url}", name="query_more", extra_headers=headers
+        )
+        return response.json()
+
+    async def search(self, sosl: str) -> Dict[str, Any]:
+        sf = await self._connection()
+        response = await self._request("GET", self._base_url(sf) + "search/", name="search", params={"q": sosl})
+        return response.json() or {}
+
+    async def restful(self, path: str, method: str = "GET", **kwargs: Any) -> Optional[Any]:
+        sf = await self._connection()
+        response = await self._request(method, self._base_url(sf) + path, name=path, **kwargs)
+        if response.status_code == 204 or not response.content:
+            return None
+        return response.json()
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+async_sf = AsyncSalesforceClient(
+    max_connections=int(os.getenv("SF_ASYNC_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("SF_ASYNC_MAX_KEEPALIVE", "20")),
+    timeout_seconds=float(os.getenv("SF_ASYNC_TIMEOUT_SECONDS", os.getenv("SF_TIMEOUT_SECONDS", "15"))),
+)
@@ -0,0 +1,373 @@
+"""
+Read-through cache for Salesforce Case records.
+
+Entries are keyed by Case Id with a secondary CaseNumber index, bounded by an
+LRU limit and aged in two steps:
+- fresh (younger than ttl): served directly
+- stale (younger than ttl + stale_ttl): served directly while a background
+  refresh revalidates it against SystemModstamp / LastModifiedDate (skipped while
+  the Salesforce API budget is low, see salesforce/api_budget.py)
+- expired: treated as a miss and reloaded synchronously; if Salesforce is
+  unreachable (or the circuit breaker is open) the last known record is served
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+Loader = Callable[[str], List[Dict[str, Any]]]
+BatchLoader = Callable[[List[str]], List[Dict[str, Any]]]
+Revalidator = Callable[[str], Optional[str]]
+
+
+@dataclass
+class _Entry:
+    record: Dict[str, Any]
+    fetched_at: float
+
+    @property
+    def version(self) -> Optional[str]:
+        return self.record.get("SystemModstamp") or self.record.get("LastModifiedDate")
+
+
+class CaseCache:
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1000,
+        ttl_seconds: float = 30.0,
+        stale_ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        background: bool = True,
+    ) -> None:
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._number_index: Dict[str, str] = {}
+        self._refreshing: set[str] = set()
+        self._lock = threading.RLock()
+        self._executor = (
+            ThreadPoolExecutor(max_workers=2, thread_name_prefix="case-cache") if background else None
+        )
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.revalidated = 0
+        self.refresh_errors = 0
+        self.fallbacks = 0
+        self.prefetched = 0
+
+    # ------------------------------------------------------------------ reads
+
+    def get_by_id(
+        self, case_id: str, loader: Loader, revalidator: Optional[Revalidator] = None
+    ) -> Optional[Dict[str, Any]]:
+        record = self.lookup(case_id, loader, revalidator)
+        return record if record is not None else self._load(case_id, loader)
+
+    def get_by_number(
+        self, case_number: str, loader: Loader, revalidator: Optional[Revalidator] = None
+    ) -> Optional[Dict[str, Any]]:
+        record = self.lookup(case_number, lambda _id: loader(case_number), revalidator)
+        return record if record is not None else self._load(case_number, loader)
+
+    def lookup(
+        self, key: str, loader: Loader, revalidator: Optional[Revalidator] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return a fresh or stale cached record by Id or CaseNumber (scheduling a background
+        refresh for stale ones), or None on a miss. The caller loads and put()s on a miss.
+        """
+        with self._lock:
+            case_id = self._number_index.get(key, key)
+            entry = self._entries.get(case_id)
+            if entry is not None:
+                age = self._age(entry)
+                if age <= self.ttl_seconds:
+                    self.hits += 1
+                    self._entries.move_to_end(case_id)
+                    return dict(entry.record)
+                if age <= self.ttl_seconds + self.stale_ttl_seconds:
+                    self.stale_hits += 1
+                    self._entries.move_to_end(case_id)
+                    self._schedule_refresh(case_id, loader, revalidator)
+                    return dict(entry.record)
+            self.misses += 1
+            return None
+
+    def peek(self, key: str, *, fresh_only: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Return a cached record by Id or CaseNumber without loading, refreshing or touching
+        counters. Expired entries are not returned, nor stale ones with fresh_only.
+        """
+        with self._lock:
+            case_id = self._number_index.get(key, key)
+            entry = self._entries.get(case_id)
+            max_age = self.ttl_seconds if fresh_only else self.ttl_seconds + self.stale_ttl_seconds
+            if entry is None or self._age(entry) > max_age:
+                return None
+            return dict(entry.record)
+
+    def last_known(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached record by Id or CaseNumber regardless of age, for serving
+        while Salesforce is failing or the circuit breaker is open.
+        """
+        with self._lock:
+            entry = self._entries.get(self._number_index.get(key, key))
+            if entry is None:
+                return None
+            self.fallbacks += 1
+            return dict(entry.record)
+
+    def _load(self, key: str, loader: Loader) -> Optional[Dict[str, Any]]:
+        try:
+            records = loader(key)
+        except Exception as e:
+            fallback = self.last_known(key) if _is_outage(e) else None
+            if fallback is None:
+                raise
+            return fallback
+        if not records:
+            return None
+        self.put(records[0])
+        return dict(records[0])
+
+    # ----------------------------------------------------------------- writes
+
+    def put(self, record: Dict[str, Any]) -> None:
+        case_id = record.get("Id")
+        if not case_id:
+            return
+        with self._lock:
+            self._entries[case_id] = _Entry(record=dict(record), fetched_at=self._clock())
+            self._entries.move_to_end(case_id)
+            if record.get("CaseNumber"):
+                self._number_index[record["CaseNumber"]] = case_id
+            while len(self._entries) > self.max_entries:
+                evicted_id, evicted = self._entries.popitem(last=False)
+                self._drop_number(evicted_id, evicted)
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            case_id = self._number_index.get(key, key)
+            entry = self._entries.pop(case_id, None)
+            if entry is not None:
+                self._drop_number(case_id, entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._number_index.clear()
+
+    def _drop_number(self, case_id: str, entry: _Entry) -> None:
+        number = entry.record.get("CaseNumber")
+        if number and self._number_index.get(number) == case_id:
+            del self._number_index[number]
+
+    # ---------------------------------------------------------------- refresh
+
+    def _schedule_refresh(self, case_id: str, loader: Loader, revalidator: Optional[Revalidator]) -> None:
+        # Caller holds the lock
+        from salesforce.api_budget import api_budget  # lazy import
+
+        # Revalidation is non-essential: while the API budget is low the stale copy is served as is
+        if case_id in self._refreshing or not api_budget.allow("cache_refresh"):
+            return
+        self._refreshing.add(case_id)
+        if self._executor is None:
+            self._refresh(case_id, loader, revalidator)
+        else:
+            self._executor.submit(self._refresh, case_id, loader, revalidator)
+
+    def _refresh(self, case_id: str, loader: Loader, revalidator: Optional[Revalidator]) -> None:
+        try:
+            with self._lock:
+                entry = self._entries.get(case_id)
+                known_version = entry.version if entry else None
+            if revalidator is not None and known_version:
+                current_version = revalidator(case_id)
+                if current_version and current_version == known_version:
+                    with self._lock:
+                        entry = self._entries.get(case_id)
+                        if entry is not None:
+                            entry.fetched_at = self._clock()
+                        self.revalidated += 1
+                    return
+            records = loader(case_id)
+            with self._lock:
+                self.refreshes += 1
+            if records:
+                self.put(records[0])
+            else:
+                self.invalidate(case_id)
+        except Exception:
+            with self._lock:
+                self.refresh_errors += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(case_id)
+
+    def prefetch(self, case_ids: List[str], loader: BatchLoader) -> List[str]:
+        """
+        Load the Ids that are not cached (or already being loaded) with one batch call on
+        the background pool, so a follow-up that picks one of them is served locally.
+        Returns the Ids scheduled.
+        """
+        with self._lock:
+            missing = [
+                case_id for case_id in dict.fromkeys(case_ids)
+                if case_id and case_id not in self._refreshing
+                and (case_id not in self._entries or self._age(self._entries[case_id]) > self.ttl_seconds)
+            ]
+            self._refreshing.update(missing)
+        if missing:
+            if self._executor is None:
+                self._prefetch(missing, loader)
+            else:
+                self._executor.submit(self._prefetch, missing, loader)
+        return missing
+
+    def _prefetch(self, case_ids: List[str], loader: BatchLoader) -> None:
+        try:
+            records = loader(case_ids)
+            for record in records:
+                self.put(record)
+            with self._lock:
+                self.prefetched += len(records)
+        except Exception:
+            with self._lock:
+                self.refresh_errors += 1
+        finally:
+            with self._lock:
+                self._refreshing.difference_update(case_ids)
+
+    # ------------------------------------------------------------------ stats
+
+    def _age(self, entry: _Entry) -> float:
+        return self._clock() - entry.fetched_at
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "stale_ttl_seconds": self.stale_ttl_seconds,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "refreshes": self.refreshes,
+                "prefetched": self.prefetched,
+                "revalidated": self.revalidated,
+                "refresh_errors": self.refresh_errors,
+                "fallbacks": self.fallbacks,
+                "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _is_outage(exc: BaseException) -> bool:
+    from salesforce.resilience import CircuitOpenError, is_transient  # lazy import
+
+    return isinstance(exc, CircuitOpenError) or is_transient(exc)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+CACHE_ENABLED = os.getenv("CASE_CACHE_ENABLED", "true").lower() not in {"0", "false", "no"}
+
+case_cache = CaseCache(
+    max_entries=int(_env_float("CASE_CACHE_MAX_ENTRIES", 1000)),
+    ttl_seconds=_env_float("CASE_CACHE_TTL_SECONDS", 30.0),
+    stale_ttl_seconds=_env_float("CASE_CACHE_STALE_SECONDS", 300.0),
+)
+
+
+def get_case(case_number: str) -> List[Dict[str, Any]]:
+    """Cached equivalent of case_queries.get_case (same return shape)."""
+    from salesforce import case_queries  # lazy import
+
+    if not CACHE_ENABLED:
+        return case_queries.get_case(case_number)
+    record = case_cache.get_by_number(case_number, case_queries.get_case, case_queries.get_case_modstamp)
+    return [record] if record else []
+
+
+def get_case_with_id(case_id: str) -> List[Dict[str, Any]]:
+    """Cached equivalent of case_queries.get_case_with_id (same return shape)."""
+    from salesforce import case_queries  # lazy import
+
+    if not CACHE_ENABLED:
+        return case_queries.get_case_with_id(case_id)
+    record = case_cache.get_by_id(case_id, case_queries.get_case_with_id, case_queries.get_case_modstamp)
+    return [record] if record else []
+
+
+async def aget_case(case_number: str) -> List[Dict[str, Any]]:
+    """Async equivalent of get_case; stale entries are still refreshed on the background pool."""
+    from salesforce import async_case_queries, case_queries  # lazy import
+
+    if CACHE_ENABLED:
+        record = case_cache.lookup(
+            case_number, lambda _id: case_queries.get_case(case_number), case_queries.get_case_modstamp
+        )
+        if record is not None:
+            return [record]
+    try:
+        records = await async_case_queries.get_case(case_number)
+    except Exception as e:
+        fallback = case_cache.last_known(case_number) if CACHE_ENABLED and _is_outage(e) else None
+        if fallback is None:
+            raise
+        return [fallback]
+    if records and CACHE_ENABLED:
+        case_cache.put(records[0])
+    return records
+
+
+async def aget_case_with_id(case_id: str) -> List[Dict[str, Any]]:
+    """Async equivalent of get_case_with_id."""
+    from salesforce import async_case_queries, case_queries  # lazy import
+
+    if CACHE_ENABLED:
+        record = case_cache.lookup(case_id, case_queries.get_case_with_id, case_queries.get_case_modstamp)
+        if record is not None:
+            return [record]
+    try:
+        records = await async_case_queries.get_case_with_id(case_id)
+    except Exception as e:
+        fallback = case_cache.last_known(case_id) if CACHE_ENABLED and _is_outage(e) else None
+        if fallback is None:
+            raise
+        return [fallback]
+    if records and CACHE_ENABLED:
+        case_cache.put(records[0])
+    return records
+
+
+def prefetch_cases(case_ids: List[str]) -> List[str]:
+    """Warm the cache with the full records of listed cases in the background (no-op when disabled)."""
+    from salesforce import case_queries  # lazy import
+    from salesforce.api_budget import api_budget  # lazy import
+
+    if not CACHE_ENABLED or not api_budget.allow("prefetch"):
+        return []
+    return case_cache.prefetch(case_ids, case_queries.get_cases_by_ids)
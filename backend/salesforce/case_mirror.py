@@ -0,0 +1,352 @@
+"""
+Optional local mirror of Case (and CaseComment) records in SQLite.
+
+The mirror is synced incrementally using a SystemModstamp watermark and keeps an
+FTS5 index over CaseNumber / Subject / Description (and comment bodies), so subject,
+keyword and compliance-number searches can be answered locally instead of with
+non-selective LIKE / SOSL queries against Salesforce.
+
+Enabled by setting CASE_MIRROR_PATH; see get_mirror().
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from observability.log import get_logger
+
+log = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    case_number TEXT,
+    subject TEXT,
+    description TEXT,
+    status TEXT,
+    priority TEXT,
+    contact_name TEXT,
+    last_modified_date TEXT,
+    system_modstamp TEXT
+);
+CREATE INDEX IF NOT EXISTS cases_case_number ON cases(case_number);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5(
+    case_number, subject, description, content='cases', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS cases_ai AFTER INSERT ON cases BEGIN
+    INSERT INTO cases_fts(rowid, case_number, subject, description)
+    VALUES (new.rowid, new.case_number, new.subject, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS cases_ad AFTER DELETE ON cases BEGIN
+    INSERT INTO cases_fts(cases_fts, rowid, case_number, subject, description)
+    VALUES ('delete', old.rowid, old.case_number, old.subject, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS cases_au AFTER UPDATE ON cases BEGIN
+    INSERT INTO cases_fts(cases_fts, rowid, case_number, subject, description)
+    VALUES ('delete', old.rowid, old.case_number, old.subject, old.description);
+    INSERT INTO cases_fts(rowid, case_number, subject, description)
+    VALUES (new.rowid, new.case_number, new.subject, new.description);
+END;
+
+CREATE TABLE IF NOT EXISTS case_comments (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    parent_id TEXT NOT NULL,
+    body TEXT,
+    created_date TEXT,
+    created_by TEXT
+);
+CREATE INDEX IF NOT EXISTS case_comments_parent ON case_comments(parent_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5(
+    body, content='case_comments', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS comments_ai AFTER INSERT ON case_comments BEGIN
+    INSERT INTO comments_fts(rowid, body) VALUES (new.rowid, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS comments_ad AFTER DELETE ON case_comments BEGIN
+    INSERT INTO comments_fts(comments_fts, rowid, body) VALUES ('delete', old.rowid, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS comments_au AFTER UPDATE ON case_comments BEGIN
+    INSERT INTO comments_fts(comments_fts, rowid, body) VALUES ('delete', old.rowid, old.body);
+    INSERT INTO comments_fts(rowid, body) VALUES (new.rowid, new.body);
+END;
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    object TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at REAL
+);
+"""
+
+_CASE_SYNC_FIELDS = (
+    "Id, CaseNumber, Subject, Description, Status, Priority, Contact.Name, "
+    "LastModifiedDate, SystemModstamp, IsDeleted"
+)
+_COMMENT_SYNC_FIELDS = "Id, ParentId, CommentBody, CreatedDate, CreatedBy.Name, SystemModstamp, IsDeleted"
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+
+
+def _soql_datetime(modstamp: str) -> str:
+    """'2024-01-02T03:04:05.000+0000' -> '2024-01-02T03:04:05Z' (SOQL datetime literal)."""
+    parsed = datetime.strptime(modstamp, "%Y-%m-%dT%H:%M:%S.%f%z")
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _fts_query(text: str, *, phrase: bool) -> Optional[str]:
+    tokens = _TOKEN_RE.findall(text or "")
+    if not tokens:
+        return None
+    if phrase:
+        return '"' + " ".join(tokens) + '"'
+    return " AND ".join(f'"{t}"' for t in tokens)
+
+
+class CaseMirror:
+    def __init__(self, path: str, *, include_comments: bool = False) -> None:
+        self.path = path
+        self.include_comments = include_comments
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._sync_thread: Optional[threading.Thread] = None
+        self.local_searches = 0
+        self.last_sync: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------ sync
+
+    def watermark(self, obj: str = "Case") -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT watermark FROM sync_state WHERE object = ?", (obj,)).fetchone()
+        return row["watermark"] if row else None
+
+    @property
+    def ready(self) -> bool:
+        return self.watermark("Case") is not None
+
+    def sync(self, query_iter=None) -> Dict[str, Any]:
+        """
+        Pull every Case (and comment) changed since the stored watermark.
+        query_iter(soql) must yield Salesforce records including deleted rows (queryAll).
+        """
+        if query_iter is None:
+            from salesforce import case_queries  # lazy import
+
+            def query_iter(soql: str):
+                return case_queries.iter_query(soql, max_rows=None, include_deleted=True)
+
+        started = time.perf_counter()
+        result = {"cases": self._sync_object("Case", _CASE_SYNC_FIELDS, query_iter, self._upsert_cases)}
+        if self.include_comments:
+            result["comments"] = self._sync_object(
+                "CaseComment", _COMMENT_SYNC_FIELDS, query_iter, self._upsert_comments
+            )
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        self.last_sync = result
+        return result
+
+    def _sync_object(self, obj: str, fields: str, query_iter, upsert) -> int:
+        watermark = self.watermark(obj)
+        where = f" WHERE SystemModstamp >= {_soql_datetime(watermark)}" if watermark else ""
+        soql = f"SELECT {fields} FROM {obj}{where} ORDER BY SystemModstamp ASC"
+        batch: List[Dict[str, Any]] = []
+        count = 0
+        for record in query_iter(soql):
+            batch.append(record)
+            if len(batch) >= 500:
+                count += upsert(batch, obj)
+                batch = []
+        if batch:
+            count += upsert(batch, obj)
+        if watermark is None and count == 0:
+            # Empty org: still mark the mirror as initialised
+            self._set_watermark(obj, "1970-01-01T00:00:00.000+0000")
+        return count
+
+    def _set_watermark(self, obj: str, watermark: str) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO sync_state(object, watermark, synced_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(object) DO UPDATE SET watermark = excluded.watermark, synced_at = excluded.synced_at",
+                (obj, watermark, time.time()),
+            )
+
+    def _upsert_cases(self, records: Iterable[Dict[str, Any]], obj: str) -> int:
+        return self._upsert(
+            obj,
+            records,
+            "INSERT INTO cases(id, case_number, subject, description, status, priority, contact_name, "
+            "last_modified_date, system_modstamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET case_number = excluded.case_number, subject = excluded.subject, "
+            "description = excluded.description, status = excluded.status, priority = excluded.priority, "
+            "contact_name = excluded.contact_name, last_modified_date = excluded.last_modified_date, "
+            "system_modstamp = excluded.system_modstamp",
+            "DELETE FROM cases WHERE id = ?",
+            lambda r: (
+                r.get("Id"), r.get("CaseNumber"), r.get("Subject"), r.get("Description"), r.get("Status"),
+                r.get("Priority"), (r.get("Contact") or {}).get("Name"), r.get("LastModifiedDate"),
+                r.get("SystemModstamp"),
+            ),
+        )
+
+    def _upsert_comments(self, records: Iterable[Dict[str, Any]], obj: str) -> int:
+        return self._upsert(
+            obj,
+            records,
+            "INSERT INTO case_comments(id, parent_id, body, created_date, created_by) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET body = excluded.body",
+            "DELETE FROM case_comments WHERE id = ?",
+            lambda r: (
+                r.get("Id"), r.get("ParentId"), r.get("CommentBody"), r.get("CreatedDate"),
+                (r.get("CreatedBy") or {}).get("Name"),
+            ),
+        )
+
+    def _upsert(self, obj: str, records, upsert_sql: str, delete_sql: str, to_row) -> int:
+        records = list(records)
+        with self._lock, self._db:
+            for record in records:
+                if record.get("IsDeleted"):
+                    self._db.execute(delete_sql, (record.get("Id"),))
+                else:
+                    self._db.execute(upsert_sql, to_row(record))
+            watermark = max(r.get("SystemModstamp") or "" for r in records)
+            self._db.execute(
+                "INSERT INTO sync_state(object, watermark, synced_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(object) DO UPDATE SET watermark = max(watermark, excluded.watermark), "
+                "synced_at = excluded.synced_at",
+                (obj, watermark, time.time()),
+            )
+        return len(records)
+
+    def start_background_sync(self, interval_seconds: float) -> None:
+        if self._sync_thread is not None:
+            return
+
+        from salesforce.api_budget import api_budget  # lazy import
+
+        def _loop() -> None:
+            while True:
+                try:
+                    # Non-essential: skipped while the API budget is low; searches fall back to Salesforce
+                    if api_budget.allow("mirror_sync"):
+                        self.sync()
+                except Exception as e:
+                    log.warning("⚠️ Case mirror sync failed", error=f"{type(e).__name__}: {e}")
+                time.sleep(interval_seconds)
+
+        self._sync_thread = threading.Thread(target=_loop, name="case-mirror-sync", daemon=True)
+        self._sync_thread.start()
+
+    # ---------------------------------------------------------------- search
+
+    def search(self, text: str, *, phrase: bool = False, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Full-text search over CaseNumber / Subject / Description (and comments when mirrored).
+        phrase=True requires the words to appear together (like a LIKE '%text%' match);
+        otherwise every word must appear somewhere (like SOSL). Best matches first.
+        """
+        match = _fts_query(text, phrase=phrase)
+        if match is None:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT c.* FROM cases_fts JOIN cases c ON c.rowid = cases_fts.rowid "
+                "WHERE cases_fts MATCH ? ORDER BY bm25(cases_fts), c.last_modified_date DESC LIMIT ?",
+                (match, int(limit)),
+            ).fetchall()
+            if self.include_comments and len(rows) < limit:
+                # Cases matched only through their comments rank after direct matches
+                seen = {row["id"] for row in rows}
+                for row in self._db.execute(
+                    "SELECT c.* FROM comments_fts JOIN case_comments cc ON cc.rowid = comments_fts.rowid "
+                    "JOIN cases c ON c.id = cc.parent_id WHERE comments_fts MATCH ? "
+                    "ORDER BY bm25(comments_fts), c.last_modified_date DESC",
+                    (match,),
+                ):
+                    if len(rows) >= limit:
+                        break
+                    if row["id"] not in seen:
+                        seen.add(row["id"])
+                        rows.append(row)
+            self.local_searches += 1
+        return [self._to_record(row) for row in rows]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM cases WHERE id = ? OR case_number = ?", (key, key)).fetchone()
+        return self._to_record(row) if row else None
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> Dict[str, Any]:
+        # Same keys as the Salesforce query results the agent already consumes
+        return {
+            "Id": row["id"],
+            "CaseNumber": row["case_number"],
+            "Subject": row["subject"],
+            "Description": row["description"],
+            "Status": row["status"],
+            "Priority": row["priority"],
+            "Contact": {"Name": row["contact_name"]} if row["contact_name"] else None,
+            "LastModifiedDate": row["last_modified_date"],
+            "SystemModstamp": row["system_modstamp"],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cases = self._db.execute("SELECT count(*) FROM cases").fetchone()[0]
+            comments = self._db.execute("SELECT count(*) FROM case_comments").fetchone()[0]
+        return {
+            "path": self.path,
+            "ready": self.ready,
+            "cases": cases,
+            "comments": comments,
+            "watermark": self.watermark("Case"),
+            "local_searches": self.local_searches,
+            "last_sync": self.last_sync,
+        }
+
+
+_mirror: Optional[CaseMirror] = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror() -> Optional[CaseMirror]:
+    """
+    Return the process-wide mirror when CASE_MIRROR_PATH is set (starting its background
+    sync on first use), otherwise None.
+    """
+    global _mirror
+    path = os.getenv("CASE_MIRROR_PATH")
+    if not path:
+        return None
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = CaseMirror(
+                path, include_comments=os.getenv("CASE_MIRROR_COMMENTS", "false").lower() in {"1", "true", "yes"}
+            )
+            _mirror.start_background_sync(float(os.getenv("CASE_MIRROR_SYNC_SECONDS", "60")))
+    return _mirror
+
+
+def search_local(text: str, *, phrase: bool, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+    """Search the mirror if it is enabled and has completed a sync; None means "ask Salesforce"."""
+    mirror = get_mirror()
+    if mirror is None or not mirror.ready:
+        return None
+    try:
+        return mirror.search(text, phrase=phrase, limit=limit) or None
+    except sqlite3.Error as e:
+        log.warning("⚠️ Case mirror search failed", error=str(e))
+        return None
@@ -1,138 +1,351 @@
+import os
+from urllib.parse import quote
+
+from simple_salesforce.exceptions import SalesforceMalformedRequest
+
+from observability.log import get_logger
+from observability.tracing import traced_query
+from salesforce import soql
 from salesforce.connection import sf
+from salesforce.singleflight import coalesce
+
+log = get_logger(__name__)
+_CASE_FIELDS = soql.case_fields("full")
+
+# Rows per REST page (Sforce-Query-Options batchSize, 200-2000) and the hard cap on rows any
+# list/search helper will materialize.
+QUERY_PAGE_SIZE = int(os.getenv("SF_QUERY_PAGE_SIZE", "200"))
+QUERY_MAX_ROWS = int(os.getenv("SF_QUERY_MAX_ROWS", "500"))
+# Values per IN (...) list in batch lookups; keeps each statement well under the URL limit.
+BATCH_CHUNK_SIZE = int(os.getenv("SF_BATCH_CHUNK_SIZE", "200"))
+
+# Child relationship subqueries on Case, mirroring get_case_comments / get_case_history / get_case_feed.
+_RELATED_SUBQUERIES = {
+    "comments": ("CaseComments", "SELECT CommentBody, CreatedDate, CreatedBy.Name FROM CaseComments ORDER BY CreatedDate DESC"),
+    "history": ("Histories", "SELECT Field, OldValue, NewValue, CreatedDate, CreatedBy.Name FROM Histories ORDER BY CreatedDate DESC LIMIT 20"),
+    "feed": ("Feeds", "SELECT Body, Type, CreatedDate, CreatedBy.Name FROM Feeds ORDER BY CreatedDate DESC LIMIT 20"),
+}
+
+# Standalone equivalents used by the Composite API fallback; @{case...} is resolved server-side.
+_COMPOSITE_PART_QUERIES = {
+    "comments": "SELECT CommentBody, CreatedDate, CreatedBy.Name FROM CaseComment WHERE ParentId = '@{case.records[0].Id}' ORDER BY CreatedDate DESC",
+    "history": "SELECT Field, OldValue, NewValue, CreatedDate, CreatedBy.Name FROM CaseHistory WHERE CaseId = '@{case.records[0].Id}' ORDER BY CreatedDate DESC LIMIT 20",
+    "feed": "SELECT Body, Type, CreatedDate, CreatedBy.Name FROM CaseFeed WHERE ParentId = '@{case.records[0].Id}' ORDER BY CreatedDate DESC LIMIT 20",
+}
+
+
+# ---------------------------------------------------------------------------
+# Query text builders (shared with salesforce/async_case_queries.py)
+# ---------------------------------------------------------------------------
+
+def case_by_id_query(case_id: str, fields: str = "full") -> str:
+    return soql.select(soql.case_fields(fields), "Case", where=f"Id = {soql.literal(case_id)}", limit=1)
+
+
+def case_by_number_query(case_number: str, fields: str = "full") -> str:
+    return soql.select(soql.case_fields(fields), "Case", where=f"CaseNumber = {soql.literal(case_number)}", limit=1)
+
+
+def case_modstamp_query(case_id: str) -> str:
+    return soql.select("Id, SystemModstamp", "Case", where=f"Id = {soql.literal(case_id)}", limit=1)
+
+
+def find_case_search(search_text: str, fields: str = "full") -> str:
+    return soql.find(search_text, "Case", soql.case_fields(fields))
+
+
+def cases_by_status_query(statuses: list[str], limit: int = 20, fields: str = "status") -> str:
+    return soql.select(
+        soql.case_fields(fields),
+        "Case",
+        where=f"Status IN {soql.in_list(statuses)}",
+        order_by="LastModifiedDate DESC",
+        limit=limit,
+    )
+
+
+def case_comments_query(case_id: str) -> str:
+    return soql.select(
+        "CommentBody, CreatedDate, CreatedBy.Name",
+        "CaseComment",
+        where=f"ParentId = {soql.literal(case_id)}",
+        order_by="CreatedDate DESC",
+    )
+
+
+def case_history_query(case_id: str) -> str:
+    return soql.select(
+        "Field, OldValue, NewValue, CreatedDate, CreatedBy.Name",
+        "CaseHistory",
+        where=f"CaseId = {soql.literal(case_id)}",
+        order_by="CreatedDate DESC",
+        limit=20,
+    )
+
+
+def case_feed_query(case_id: str) -> str:
+    return soql.select(
+        "Body, Type, CreatedDate, CreatedBy.Name",
+        "CaseFeed",
+        where=f"ParentId = {soql.literal(case_id)}",
+        order_by="CreatedDate DESC",
+        limit=20,
+    )
+
+
+def case_by_compliance_query(compliance_no: str, fields: str = "full") -> str:
+    pattern = soql.contains(compliance_no)
+    return soql.select(
+        soql.case_fields(fields),
+        "Case",
+        where=f"Subject LIKE {pattern} OR Description LIKE {pattern}",
+        order_by="CreatedDate DESC",
+        limit=10,
+    )
+
+
+def case_by_subject_search(subject: str, fields: str = "full") -> str:
+    # SOSL query: searches across all fields
+    return soql.find(subject, "Case", soql.case_fields(fields), order_by="CreatedDate DESC", limit=10)
+
+
+def cases_by_keywords_query(keywords: str, limit: int | None = None, fields: str = "full") -> str:
+    pattern = soql.contains(keywords)
+    return soql.select(
+        soql.case_fields(fields),
+        "Case",
+        where=f"Subject LIKE {pattern} OR Description LIKE {pattern} OR CaseNumber LIKE {pattern}",
+        order_by="LastModifiedDate DESC",
+        limit=limit,
+    )
+
+
+def chunked(values, size: int | None = None):
+    values = list(values)
+    size = max(1, size or BATCH_CHUNK_SIZE)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def cases_by_ids_query(case_ids, fields: str = "full") -> str:
+    return soql.select(soql.case_fields(fields), "Case", where=f"Id IN {soql.in_list(case_ids)}")
+
+
+def cases_by_numbers_query(case_numbers, fields: str = "full") -> str:
+    return soql.select(soql.case_fields(fields), "Case", where=f"CaseNumber IN {soql.in_list(case_numbers)}")
+
+
+def comments_by_parent_query(case_ids) -> str:
+    return soql.select(
+        "ParentId, CommentBody, CreatedDate, CreatedBy.Name",
+        "CaseComment",
+        where=f"ParentId IN {soql.in_list(case_ids)}",
+        order_by="ParentId, CreatedDate DESC",
+    )
+
+
+def case_where(*, case_id: str | None = None, case_number: str | None = None) -> str:
+    return f"Id = {soql.literal(case_id)}" if case_id else f"CaseNumber = {soql.literal(case_number)}"
+
 
+def case_with_related_query(where: str, parts) -> str:
+    subqueries = ", ".join(f"({_RELATED_SUBQUERIES[part][1]})" for part in parts)
+    return f"SELECT {_CASE_FIELDS}{', ' + subqueries if subqueries else ''} FROM Case WHERE {where} LIMIT 1"
 
+
+def split_related(records, parts):
+    """
+    Pop the child subquery results off a Case record: (case or None, {part: child result}, {}).
+    Each child result is a query result dict and may carry its own nextRecordsUrl.
+    """
+    if not records:
+        return None, {}, {}
+    case = records[0]
+    related = {part: case.pop(_RELATED_SUBQUERIES[part][0], None) or {} for part in parts}
+    return case, related, {}
+
+
+def page_headers(page_size: int | None = None) -> dict:
+    return {"Sforce-Query-Options": f"batchSize={max(200, min(2000, int(page_size or QUERY_PAGE_SIZE)))}"}
+
+
+def composite_related_request(where: str, parts, api_version: str) -> dict:
+    def _query_url(soql: str) -> str:
+        return f"/services/data/v{api_version}/query?q={quote(soql, safe='@{}[].')}"
+
+    sub_requests = [{"method": "GET", "url": _query_url(f"SELECT {_CASE_FIELDS} FROM Case WHERE {where} LIMIT 1"), "referenceId": "case"}]
+    sub_requests += [
+        {"method": "GET", "url": _query_url(_COMPOSITE_PART_QUERIES[part]), "referenceId": part}
+        for part in parts
+    ]
+    return {"allOrNone": False, "compositeRequest": sub_requests}
+
+
+def parse_composite_related(result, parts):
+    responses = {r.get("referenceId"): r for r in (result or {}).get("compositeResponse", [])}
+
+    case_response = responses.get("case") or {}
+    if case_response.get("httpStatusCode") != 200:
+        raise RuntimeError(f"Composite case query failed: {case_response.get('body')}")
+    case_records = case_response["body"].get("records", [])
+    if not case_records:
+        return None, {}, {}
+
+    related, errors = {}, {}
+    for part in parts:
+        response = responses.get(part) or {}
+        if response.get("httpStatusCode") == 200:
+            related[part] = response["body"]
+        else:
+            errors[part] = str(response.get("body"))
+    return case_records[0], related, errors
+
+
+# ---------------------------------------------------------------------------
+# Blocking queries
+# ---------------------------------------------------------------------------
+
+def iter_result(result, *, max_rows: int | None = None, page_size: int | None = None):
+    """
+    Yield records from a query result, fetching further pages via nextRecordsUrl only
+    as the caller consumes them, and stopping after max_rows.
+    """
+    rows = 0
+    while result:
+        for record in result.get("records", []):
+            if max_rows is not None and rows >= max_rows:
+                return
+            rows += 1
+            yield record
+        next_url = result.get("nextRecordsUrl")
+        # A page that ends exactly at the cap must not pull the next one
+        if result.get("done", True) or not next_url or (max_rows is not None and rows >= max_rows):
+            return
+        result = sf.query_more(next_url, identifier_is_url=True, headers=page_headers(page_size))
+
+
+def iter_query(
+    soql: str, *, max_rows: int | None = QUERY_MAX_ROWS, page_size: int | None = None, include_deleted: bool = False
+):
+    """
+    Lazily iterate over every row of a SOQL query, one REST page at a time.
+    include_deleted uses queryAll so deleted rows (IsDeleted = true) are returned too.
+    """
+    if include_deleted:
+        first_page = sf.query(soql, include_deleted=True, headers=page_headers(page_size))
+    else:
+        first_page = sf.query(soql, headers=page_headers(page_size))
+    yield from iter_result(first_page, max_rows=max_rows, page_size=page_size)
+
+
+@coalesce
+@traced_query
 def get_case_with_id(case_id: str):
     # INTEGRATED: Used in agent_core.py _load_case_by_id()
-    query = (
-        "SELECT Id, CaseNumber, Subject, Description, Status, Priority, Contact.Name "
-        f"FROM Case WHERE Id = '{case_id}' LIMIT 1"
-    )
-    return sf.query(query).get("records", [])
+    return sf.query(case_by_id_query(case_id)).get("records", [])
 
 
+@coalesce
+@traced_query
 def get_case(case_number: str):
     # INTEGRATED: Used in agent_core.py _load_case_by_number()
-    query = f"""
-    SELECT Id, CaseNumber, Subject, Description, Status, Priority, Contact.Name
-    FROM Case
-    WHERE CaseNumber = '{case_number}'
-    LIMIT 1
-    """
-    return sf.query(query)["records"]
+    return sf.query(case_by_number_query(case_number))["records"]
+
+
+@coalesce
+@traced_query
+def get_case_modstamp(case_id: str):
+    # INTEGRATED: Used by salesforce/case_cache.py to revalidate stale entries
+    records = sf.query(case_modstamp_query(case_id)).get("records", [])
+    return records[0].get("SystemModstamp") if records else None
 
 
-def find_case(search_text: str):
+@coalesce
+@traced_query
+def find_case(search_text: str, fields: str = "full"):
     # INTEGRATED: Used in agent_core.py _search_cases()
-    escaped = search_text.replace("'", "\\'")
-    query = f"""
-    FIND {{{escaped}}}
-    IN ALL FIELDS
-    RETURNING Case(Id, CaseNumber, Subject, Status, Description)
-    """
-    return sf.search(query).get("searchRecords", [])
+    return sf.search(find_case_search(search_text, fields)).get("searchRecords", [])
 
 
-def list_cases_by_status(statuses: list[str], limit: int = 20):
+@coalesce
+@traced_query
+def list_cases_by_status(statuses: list[str], limit: int = 20, fields: str = "status"):
     # INTEGRATED: Used in agent_core.py for "in progress" case queries
     if not statuses:
         return []
-    escaped_statuses = [s.replace("'", "\\'") for s in statuses]
-    status_list = ",".join([f"'{s}'" for s in escaped_statuses])
-    query = f"""
-    SELECT Id, CaseNumber, Subject, Status, Priority, LastModifiedDate
-    FROM Case
-    WHERE Status IN ({status_list})
-    ORDER BY LastModifiedDate DESC
-    LIMIT {int(limit)}
-    """
-    return sf.query(query).get("records", [])
+    return list(iter_query(cases_by_status_query(statuses, limit, fields), max_rows=limit))
 
 
-def get_case_comments(case_id: str):
+@coalesce
+@traced_query
+def get_case_comments(case_id: str, max_rows: int = QUERY_MAX_ROWS):
     # INTEGRATED: Used in agent_core.py _load_case_comments()
-    print("case comments")
-    query = f"""
-    SELECT CommentBody, CreatedDate, CreatedBy.Name
-    FROM CaseComment
-    WHERE ParentId = '{case_id}'
-    ORDER BY CreatedDate DESC
-    """
-    return sf.query(query)["records"]
+    return list(iter_query(case_comments_query(case_id), max_rows=max_rows))
 
 
+@coalesce
+@traced_query
 def get_case_history(case_id: str):
     # INTEGRATED: Used in agent_core.py _load_case_history()
-    query = f"""
-    SELECT Field, OldValue, NewValue, CreatedDate, CreatedBy.Name
-    FROM CaseHistory
-    WHERE CaseId = '{case_id}'
-    ORDER BY CreatedDate DESC
-    LIMIT 20
-    """
-    return sf.query(query)["records"]
+    return list(iter_query(case_history_query(case_id)))
 
 
+@coalesce
+@traced_query
 def get_case_feed(case_id: str):
     # INTEGRATED: Used in agent_core.py _load_case_feed()
-    query = f"""
-    SELECT Body, Type, CreatedDate, CreatedBy.Name
-    FROM CaseFeed
-    WHERE ParentId = '{case_id}'
-    ORDER BY CreatedDate DESC
-    LIMIT 20
-    """
-    return sf.query(query)["records"]
+    return list(iter_query(case_feed_query(case_id)))
 
-def get_case_by_compliance(compliance_no: str):
+@coalesce
+@traced_query
+def get_case_by_compliance(compliance_no: str, fields: str = "full"):
     """Search for cases by compliance number in Subject and Description fields"""
-    safe_compliance = compliance_no.replace("'", "\\'")
-    query = f"""
-        SELECT Id, CaseNumber, Subject, Description, Status, Priority, Contact.Name
-        FROM Case
-        WHERE Subject LIKE '%{safe_compliance}%'
-           OR Description LIKE '%{safe_compliance}%'
-        ORDER BY CreatedDate DESC
-        LIMIT 10
-    """
-    return sf.query(query)["records"]
+    return list(iter_query(case_by_compliance_query(compliance_no, fields)))
 
-def get_case_by_subject(subject: str):
+@coalesce
+@traced_query
+def get_case_by_subject(subject: str, fields: str = "full"):
     subject = subject.strip()
-
-    print(f"🔍 Searching with SOSL for: '{subject}'")
-
-    # Escape single quotes for SOSL
-    safe_subject = subject.replace("'", "\\'")
-
-    # SOSL query: searches across all fields
-    sosl_query = f"""
-        FIND '{{{safe_subject}}}' IN ALL FIELDS
-        RETURNING Case(
-            Id, CaseNumber, Subject, Description, Status, Priority
-            ORDER BY CreatedDate DESC
-            LIMIT 10
-        )
-    """
-
-    print("🔎 SOSL query:", sosl_query)
-
+    sosl_query = case_by_subject_search(subject, fields)
     result = sf.search(sosl_query)
     records = result.get("searchRecords", [])
+    log.debug("🔎 SOSL subject search", subject=subject, sosl=sosl_query, matches=len(records))
+    return records
 
-    print("Matches found:", len(records))
+def iter_cases_by_keywords(keywords: str, max_rows: int | None = QUERY_MAX_ROWS, fields: str = "full"):
+    """Streaming variant of search_cases_by_keywords; stop iterating to stop fetching."""
+    return iter_query(cases_by_keywords_query(keywords, limit=max_rows, fields=fields), max_rows=max_rows)
 
+@coalesce
+@traced_query
+def search_cases_by_keywords(keywords: str, max_rows: int | None = QUERY_MAX_ROWS, fields: str = "full"):
+    """Enhanced search across multiple case fields"""
+    return list(iter_cases_by_keywords(keywords, max_rows, fields))
+
+
+@traced_query
+def get_cases_by_ids(case_ids, fields: str = "full"):
+    """Batch lookup by Id, one `Id IN (...)` statement per chunk (used by case_cache.prefetch_cases)."""
+    records = []
+    for chunk in chunked(case_ids):
+        records.extend(iter_query(cases_by_ids_query(chunk, fields), max_rows=None))
     return records
 
-def search_cases_by_keywords(keywords: str):
-    """Enhanced search across multiple case fields"""
-    safe_keywords = keywords.replace("'", "\\'")
-    query = f"""
-        SELECT Id, CaseNumber, Subject, Description, Status, Priority, Contact.Name
-        FROM Case
-        WHERE Subject LIKE '%{safe_keywords}%'
-           OR Description LIKE '%{safe_keywords}%'
-           OR CaseNumber LIKE '%{safe_keywords}%'
-        ORDER BY LastModifiedDate DESC
+
+@coalesce
+@traced_query
+def get_case_with_related(*, case_id: str | None = None, case_number: str | None = None, parts=("comments", "history", "feed")):
+    """
+    Fetch a case and its related collections in a single round trip.
+    Uses SOQL child subqueries; if the org rejects one of the relationships (e.g. feed
+    tracking disabled), falls back to one Composite API request.
+    Returns (case or None, {part: records}, {part: error}).
     """
-    return sf.query(query)["records"]
-           
\ No newline at end of file
+    where = case_where(case_id=case_id, case_number=case_number)
+    try:
+        records = sf.query(case_with_related_query(where, parts)).get("records", [])
+        case, related, errors = split_related(records, parts)
+    except SalesforceMalformedRequest:
+        result = sf.restful("composite", method="POST", json=composite_related_request(where, parts, sf.sf_version))
+        case, related, errors = parse_composite_related(result, parts)
+    return case, {part: list(iter_result(child, max_rows=QUERY_MAX_ROWS)) for part, child in related.items()}, errors
@@ -1,24 +1,263 @@
+"""
+Salesforce connection management.
+
+Logging in is deferred until the first Salesforce call, the session token can be
+persisted to disk so restarts reuse it, tokens are refreshed shortly before they
+expire, and INVALID_SESSION_ID responses trigger one transparent re-login.
+
+`sf` keeps the old module-level interface: it forwards to the managed
+simple_salesforce client, so `from salesforce.connection import sf` still works.
+"""
+
+import asyncio
+import json
 import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
 
+import requests
 from dotenv import load_dotenv
 from simple_salesforce import Salesforce
+from simple_salesforce.exceptions import SalesforceExpiredSession
+
+from observability.log import get_logger
+from salesforce.api_budget import api_budget
+from salesforce.resilience import TIMEOUT_SECONDS, TimeoutSession, guard
 
 load_dotenv()
+log = get_logger(__name__)
+
+
+def _observe_limit_info(response: requests.Response, *args: Any, **kwargs: Any) -> None:
+    api_budget.observe_header(response.headers.get("Sforce-Limit-Info"))
+
+
+class SalesforceConnectionManager:
+    def __init__(
+        self,
+        *,
+        username: Optional[str],
+        password: Optional[str],
+        security_token: Optional[str],
+        domain: str = "login",
+        session_ttl_seconds: float = 7200.0,
+        refresh_margin_seconds: float = 300.0,
+        cache_path: Optional[str] = None,
+        login_backoff_seconds: float = 30.0,
+        client_factory: Callable[..., Salesforce] = Salesforce,
+    ) -> None:
+        self.username = username
+        self.domain = domain
+        self._password = password
+        self._security_token = security_token
+        self.session_ttl_seconds = session_ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.cache_path = cache_path
+        self.login_backoff_seconds = login_backoff_seconds
+        self._client_factory = client_factory
+        self._http: requests.Session = TimeoutSession(TIMEOUT_SECONDS)
+        self._http.hooks["response"].append(_observe_limit_info)
+        self._client: Optional[Salesforce] = None
+        self._issued_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._last_failure: Optional[Exception] = None
+        self._failed_at = 0.0
+        self._consecutive_failures = 0
+        self.logins = 0
+        self.restored_sessions = 0
+        self.session_refreshes = 0
+
+    # ---------------------------------------------------------------- public
+
+    def get(self) -> Salesforce:
+        """Return a usable client, logging in (or restoring a cached session) on first use."""
+        client = self._client
+        if client is not None:
+            age = time.time() - self._issued_at
+            if age < self.session_ttl_seconds - self.refresh_margin_seconds:
+                return client
+            if age < self.session_ttl_seconds:
+                self._refresh_in_background()
+                return client
+        with self._lock:
+            if self._client is None and self._restore():
+                return self._client
+            if self._client is None or time.time() - self._issued_at >= self.session_ttl_seconds:
+                self._login()
+            return self._client
+
+    async def aget(self) -> Salesforce:
+        """
+        get() for coroutines: a fresh client is returned right away; logging in, restoring
+        or refreshing the session (and waiting for another thread doing so) runs off the
+        event loop.
+        """
+        client = self._client
+        if client is not None and time.time() - self._issued_at < self.session_ttl_seconds - self.refresh_margin_seconds:
+            return client
+        return await asyncio.to_thread(self.get)
+
+    def refresh(self, stale_session_id: Optional[str] = None) -> Salesforce:
+        """
+        Log in again. When stale_session_id is given and another caller has already
+        replaced that session, the current client is returned without a new login.
+        """
+        with self._lock:
+            if (
+                stale_session_id is not None
+                and self._client is not None
+                and self._client.session_id != stale_session_id
+            ):
+                return self._client
+            self._login()
+            self.session_refreshes += 1
+            return self._client
+
+    def status(self) -> Dict[str, Any]:
+        client = self._client
+        return {
+            "connected": client is not None,
+            "instance": client.sf_instance if client is not None else None,
+            "session_age_seconds": round(time.time() - self._issued_at, 1) if client is not None else None,
+            "logins": self.logins,
+            "restored_sessions": self.restored_sessions,
+            "session_refreshes": self.session_refreshes,
+            "last_error": f"{type(self._last_failure).__name__}: {self._last_failure}" if self._last_failure else None,
+        }
+
+    # -------------------------------------------------------------- internal
+
+    def _login(self) -> None:
+        # Caller holds the lock. Back off after failures so crash loops don't hit login rate limits.
+        if self._last_failure is not None:
+            backoff = min(self.login_backoff_seconds * (2 ** (self._consecutive_failures - 1)), 600.0)
+            if time.time() - self._failed_at < backoff:
+                raise self._last_failure
+        log.info("Connecting to Salesforce", username=self.username, domain=self.domain)
+        try:
+            client = self._client_factory(
+                username=self.username,
+                password=self._password,
+                security_token=self._security_token,
+                domain=self.domain,
+                session=self._http,
+            )
+        except Exception as e:
+            log.error("❌ Salesforce connection failed", error=f"{type(e).__name__}: {e}")
+            self._last_failure, self._failed_at = e, time.time()
+            self._consecutive_failures += 1
+            raise
+        self._client, self._issued_at = client, time.time()
+        self._last_failure, self._consecutive_failures = None, 0
+        self.logins += 1
+        self._save()
+        log.info("✅ Salesforce connection initialized", instance=client.sf_instance)
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        stale_session_id = self._client.session_id if self._client else None
+
+        def _run() -> None:
+            try:
+                self.refresh(stale_session_id)
+            except Exception:
+                pass  # the current token is still valid; the next get() retries
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, name="sf-session-refresh", daemon=True).start()
+
+    def _restore(self) -> bool:
+        # Caller holds the lock
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("username") != self.username:
+                return False
+            if time.time() - cached["issued_at"] >= self.session_ttl_seconds - self.refresh_margin_seconds:
+                return False
+            restore_kwargs = {"version": cached["version"]} if cached.get("version") else {}
+            self._client = self._client_factory(
+                session_id=cached["session_id"],
+                instance=cached["instance"],
+                session=self._http,
+                **restore_kwargs,
+            )
+            self._issued_at = cached["issued_at"]
+            self.restored_sessions += 1
+            return True
+        except Exception:
+            return False
+
+    def _save(self) -> None:
+        if not self.cache_path or self._client is None:
+            return
+        payload = {
+            "username": self.username,
+            "session_id": self._client.session_id,
+            "instance": self._client.sf_instance,
+            "version": self._client.sf_version,
+            "issued_at": self._issued_at,
+        }
+        try:
+            fd = os.open(self.cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+        except OSError as e:
+            log.warning("⚠️ Could not persist Salesforce session", error=str(e))
+
+
+# Read-only client methods that are safe to retry
+_IDEMPOTENT_METHODS = {"query", "query_more", "query_all", "search", "quick_search", "limits", "describe"}
+
+
+class LazySalesforce:
+    """
+    Stand-in for a simple_salesforce.Salesforce instance that resolves the managed client
+    on each access, runs calls through the resilience guard, and retries a call once after
+    re-login when the session has expired.
+    """
+
+    def __init__(self, manager: SalesforceConnectionManager) -> None:
+        self._manager = manager
+
+    def __getattr__(self, name: str) -> Any:
+        client = self._manager.get()
+        attr = getattr(client, name)
+        if not callable(attr):
+            return attr
+
+        def call_once(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return attr(*args, **kwargs)
+            except SalesforceExpiredSession:
+                fresh = self._manager.refresh(stale_session_id=client.session_id)
+                return getattr(fresh, name)(*args, **kwargs)
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            idempotent = name in _IDEMPOTENT_METHODS or (
+                name == "restful" and kwargs.get("method", "GET").upper() == "GET"
+            )
+            return guard.call(call_once, *args, idempotent=idempotent, **kwargs)
+
+        return call
+
 
-# Debug: Print connection details (remove passwords)
-username = os.getenv("SF_USERNAME")
-domain = os.getenv("SF_DOMAIN", "login")
-print(f"Connecting to Salesforce: {username} @ {domain}")
-
-try:
-    sf = Salesforce(
-        username=username,
-        password=os.getenv("SF_PASSWORD"),
-        security_token=os.getenv("SF_SECURITY_TOKEN"),
-        domain=domain,
-    )
-    print("✅ Salesforce connection initialized")
-except Exception as e:
-    print(f"❌ Salesforce connection failed: {e}")
-    raise
+connection_manager = SalesforceConnectionManager(
+    username=os.getenv("SF_USERNAME"),
+    password=os.getenv("SF_PASSWORD"),
+    security_token=os.getenv("SF_SECURITY_TOKEN"),
+    domain=os.getenv("SF_DOMAIN", "login"),
+    session_ttl_seconds=float(os.getenv("SF_SESSION_TTL_SECONDS", "7200")),
+    refresh_margin_seconds=float(os.getenv("SF_SESSION_REFRESH_MARGIN_SECONDS", "300")),
+    cache_path=os.getenv("SF_SESSION_CACHE_PATH") or None,
+)
 
+sf = LazySalesforce(connection_manager)
@@ -3,6 +3,10 @@ from __future__ import annotations
 from salesforce.connection import sf
 
 
+_USER_QUERY = "SELECT Id, Name, Username FROM User WHERE Id = UserInfo.getUserId() LIMIT 1"
+_ORG_QUERY = "SELECT Id, Name FROM Organization LIMIT 1"
+
+
 def ping() -> dict:
     """
     Lightweight connectivity check.
@@ -10,57 +14,84 @@ def ping() -> dict:
     """
     try:
         # Test connection with a simple query that should always work
-        user_query = sf.query("SELECT Id, Name, Username FROM User WHERE Id = UserInfo.getUserId() LIMIT 1")
+        user_query = sf.query(_USER_QUERY)
         
         if user_query and user_query.get('records'):
-            user = user_query['records'][0]
-            return {
-                "type": "salesforce_health",
-                "ok": True,
-                "user_id": user.get("Id"),
-                "username": user.get("Username"),
-                "display_name": user.get("Name"),
-                "status": "connected",
-                "message": f"✅ Connected to Salesforce as {user.get('Name', 'Unknown User')}"
-            }
+            return _user_health(user_query['records'][0])
         else:
             # Fallback: just test basic connectivity
-            org_query = sf.query("SELECT Id, Name FROM Organization LIMIT 1")
+            org_query = sf.query(_ORG_QUERY)
             if org_query and org_query.get('records'):
-                org = org_query['records'][0]
-                return {
-                    "type": "salesforce_health",
-                    "ok": True,
-                    "organization_id": org.get("Id"),
-                    "organization_name": org.get("Name"),
-                    "status": "connected_basic",
-                    "message": f"✅ Connected to Salesforce org: {org.get('Name', 'Unknown Org')}"
-                }
+                return _org_health(org_query['records'][0])
             
     except Exception as e:
-        # Get more detailed error information
-        error_details = {
-            "type": "salesforce_health",
-            "ok": False,
-            "error_type": type(e).__name__,
-            "error": str(e),
-            "status": "connection_failed"
-        }
-        
-        # Check if it's an authentication vs authorization issue
-        if "NOT_FOUND" in str(e):
-            error_details["message"] = "❌ Salesforce resource not found - check API permissions"
-            error_details["likely_cause"] = "API user lacks permissions or wrong endpoint"
-        elif "INVALID_LOGIN" in str(e):
-            error_details["message"] = "❌ Invalid Salesforce credentials"
-            error_details["likely_cause"] = "Wrong username/password/security token"
-        elif "INVALID_DOMAIN" in str(e):
-            error_details["message"] = "❌ Invalid Salesforce domain"
-            error_details["likely_cause"] = "Wrong domain (login vs test vs custom)"
-        else:
-            error_details["message"] = f"❌ Failed to connect to Salesforce: {str(e)}"
-        
-        return error_details
+        return _error_health(e)
+
+
+async def aping() -> dict:
+    """
+    Async variant of ping() using the pooled async client.
+    """
+    from salesforce.async_client import async_sf
+
+    try:
+        user_query = await async_sf.query(_USER_QUERY)
+        if user_query and user_query.get('records'):
+            return _user_health(user_query['records'][0])
+        org_query = await async_sf.query(_ORG_QUERY)
+        if org_query and org_query.get('records'):
+            return _org_health(org_query['records'][0])
+    except Exception as e:
+        return _error_health(e)
+
+
+def _user_health(user: dict) -> dict:
+    return {
+        "type": "salesforce_health",
+        "ok": True,
+        "user_id": user.get("Id"),
+        "username": user.get("Username"),
+        "display_name": user.get("Name"),
+        "status": "connected",
+        "message": f"✅ Connected to Salesforce as {user.get('Name', 'Unknown User')}"
+    }
+
+
+def _org_health(org: dict) -> dict:
+    return {
+        "type": "salesforce_health",
+        "ok": True,
+        "organization_id": org.get("Id"),
+        "organization_name": org.get("Name"),
+        "status": "connected_basic",
+        "message": f"✅ Connected to Salesforce org: {org.get('Name', 'Unknown Org')}"
+    }
+
+
+def _error_health(e: Exception) -> dict:
+    # Get more detailed error information
+    error_details = {
+        "type": "salesforce_health",
+        "ok": False,
+        "error_type": type(e).__name__,
+        "error": str(e),
+        "status": "connection_failed"
+    }
+    
+    # Check if it's an authentication vs authorization issue
+    if "NOT_FOUND" in str(e):
+        error_details["message"] = "❌ Salesforce resource not found - check API permissions"
+        error_details["likely_cause"] = "API user lacks permissions or wrong endpoint"
+    elif "INVALID_LOGIN" in str(e):
+        error_details["message"] = "❌ Invalid Salesforce credentials"
+        error_details["likely_cause"] = "Wrong username/password/security token"
+    elif "INVALID_DOMAIN" in str(e):
+        error_details["message"] = "❌ Invalid Salesforce domain"
+        error_details["likely_cause"] = "Wrong domain (login vs test vs custom)"
+    else:
+        error_details["message"] = f"❌ Failed to connect to Salesforce: {str(e)}"
+    
+    return error_details
 
 
 def test_connection_details():
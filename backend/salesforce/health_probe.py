@@ -0,0 +1,182 @@
+"""
+Background Salesforce health probe.
+
+Health endpoints answer from the state cached here instead of querying Salesforce on
+every hit. Each worker probes on its event loop every SF_HEALTH_PROBE_SECONDS (spread by
+± SF_HEALTH_PROBE_JITTER so workers and replicas do not probe in lockstep) and keeps the
+last SF_HEALTH_WINDOW results for rolling latency and error rate.
+
+While the API budget is low (salesforce/api_budget.py) probes are skipped and recent
+answers from Salesforce (user traffic or the /limits poll) stand in for them.
+
+Liveness (the process answers) is independent of Salesforce; readiness requires a recent
+successful probe, so a Salesforce outage takes workers out of rotation without getting
+healthy containers restarted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from observability import metrics
+from observability.log import get_logger
+
+log = get_logger(__name__)
+
+SF_HEALTH_PROBE_SECONDS = float(os.getenv("SF_HEALTH_PROBE_SECONDS", "30"))
+SF_HEALTH_PROBE_JITTER = float(os.getenv("SF_HEALTH_PROBE_JITTER", "0.2"))
+SF_HEALTH_WINDOW = int(os.getenv("SF_HEALTH_WINDOW", "20"))
+
+# A result older than this many intervals no longer counts for readiness
+_STALE_INTERVALS = 3
+
+
+def _percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class HealthProber:
+    def __init__(
+        self,
+        *,
+        interval_seconds: float = SF_HEALTH_PROBE_SECONDS,
+        jitter: float = SF_HEALTH_PROBE_JITTER,
+        window: int = SF_HEALTH_WINDOW,
+        probe: Optional[Callable[[], Awaitable[Optional[Dict[str, Any]]]]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.interval_seconds = interval_seconds
+        self.jitter = jitter
+        self._probe = probe
+        self._clock = clock
+        self._results: Deque[Tuple[bool, float]] = deque(maxlen=max(1, window))
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self.last: Optional[Dict[str, Any]] = None
+        self.checked_at: Optional[float] = None
+        self.last_ok_at: Optional[float] = None
+        self.consecutive_failures = 0
+        self.probes = 0
+        self.skipped = 0
+
+    async def check(self) -> Dict[str, Any]:
+        """Run one live probe and cache its result; concurrent callers share a running probe."""
+        inflight = self._inflight
+        if inflight is not None and not inflight.done() and inflight.get_loop() is asyncio.get_running_loop():
+            return await asyncio.shield(inflight)
+        self._inflight = asyncio.ensure_future(self._check())
+        return await asyncio.shield(self._inflight)
+
+    async def _check(self) -> Dict[str, Any]:
+        from salesforce import health  # lazy import
+
+        probe = self._probe or health.aping
+        started = time.perf_counter()
+        try:
+            result = await probe()
+        except Exception as e:
+            result = health._error_health(e)
+        seconds = time.perf_counter() - started
+        if result is None:
+            result = {
+                "type": "salesforce_health",
+                "ok": False,
+                "status": "no_records",
+                "message": "❌ Salesforce returned no user or organization record",
+            }
+        ok = bool(result.get("ok"))
+
+        self.probes += 1
+        self.last, self.checked_at = result, self._clock()
+        self._results.append((ok, seconds))
+        if ok:
+            self.last_ok_at, self.consecutive_failures = self.checked_at, 0
+        else:
+            self.consecutive_failures += 1
+            log.warning("Salesforce health probe failed", status=result.get("status"), error=result.get("error"))
+        metrics.salesforce_up.set(1 if ok else 0)
+        metrics.salesforce_probe_seconds.observe(seconds, outcome="ok" if ok else "error")
+        return result
+
+    def _skip(self) -> None:
+        """
+        Throttled by the API budget: a recent answer from Salesforce counts as a passing probe.
+        On an idle worker the /limits poll is the only traffic, so answers count for one poll
+        period plus the readiness staleness window.
+        """
+        from salesforce.api_budget import api_budget  # lazy import
+
+        self.skipped += 1
+        window = _STALE_INTERVALS * self.interval_seconds + max(0.0, api_budget.poll_seconds)
+        if self.consecutive_failures == 0 and api_budget.responded_within(window):
+            self.checked_at = self.last_ok_at = self._clock()
+
+    async def _run(self) -> None:
+        from salesforce.api_budget import api_budget  # lazy import
+
+        while True:
+            try:
+                if self.last is None or api_budget.allow("health_probe"):
+                    await self.check()
+                else:
+                    self._skip()
+            except Exception:
+                log.exception("Salesforce health probe crashed")
+            spread = 1 + random.uniform(-self.jitter, self.jitter)
+            await asyncio.sleep(max(1.0, self.interval_seconds * spread))
+
+    def start(self) -> None:
+        """Probe in the background on the running event loop (first probe immediately)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        for pending in (task, self._inflight):
+            if pending is not None and not pending.done() and pending.get_loop() is asyncio.get_running_loop():
+                pending.cancel()
+                try:
+                    await pending
+                except asyncio.CancelledError:
+                    pass
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def ready(self) -> bool:
+        """A successful probe within the last few intervals."""
+        return (
+            self.consecutive_failures == 0
+            and self.last_ok_at is not None
+            and self._clock() - self.last_ok_at <= _STALE_INTERVALS * self.interval_seconds
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = [seconds for _, seconds in self._results]
+        failures = sum(1 for ok, _ in self._results if not ok)
+        now = self._clock()
+        return {
+            "running": self.running,
+            "probes": self.probes,
+            "skipped": self.skipped,
+            "age_seconds": round(now - self.checked_at, 1) if self.checked_at is not None else None,
+            "last_ok_age_seconds": round(now - self.last_ok_at, 1) if self.last_ok_at is not None else None,
+            "consecutive_failures": self.consecutive_failures,
+            "error_rate": round(failures / len(self._results), 3) if self._results else None,
+            "latency_ms": {
+                "last": round(latencies[-1] * 1000, 1),
+                "p50": round(_percentile(latencies, 0.5) * 1000, 1),
+                "p95": round(_percentile(latencies, 0.95) * 1000, 1),
+            } if latencies else None,
+            "window": len(self._results),
+        }
+
+
+health_prober = HealthProber()
@@ -0,0 +1,240 @@
+"""
+Failure isolation for Salesforce calls.
+
+Every call goes through `guard`, which applies:
+- jittered exponential retries for idempotent reads that failed transiently
+  (connection errors, timeouts, 5xx)
+- a circuit breaker that opens when the transient error rate in a rolling window
+  crosses a threshold, failing fast with CircuitOpenError until a probe succeeds
+
+Per-call timeouts are applied by the HTTP layers themselves (TimeoutSession for the
+blocking client, httpx.Timeout for the async one).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Tuple
+
+import requests
+from simple_salesforce.exceptions import SalesforceError
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling Salesforce while the circuit breaker is open."""
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    try:
+        import httpx
+
+        if isinstance(exc, httpx.TransportError):
+            return True
+    except ImportError:
+        pass
+    if isinstance(exc, SalesforceError):
+        return (getattr(exc, "status", 0) or 0) >= 500
+    return isinstance(exc, TimeoutError)
+
+
+class TimeoutSession(requests.Session):
+    """requests.Session that applies a default timeout to every request."""
+
+    def __init__(self, timeout_seconds: float) -> None:
+        super().__init__()
+        self.timeout_seconds = timeout_seconds
+
+    def request(self, method, url, **kwargs):  # type: ignore[override]
+        kwargs.setdefault("timeout", self.timeout_seconds)
+        return super().request(method, url, **kwargs)
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        *,
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 10,
+        window_seconds: float = 30.0,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.times_opened = 0
+        self.rejected_calls = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected_calls += 1
+        raise CircuitOpenError("Salesforce circuit breaker is open; failing fast")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._outcomes.clear()
+            self._record(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trip()
+                return
+            self._record(False)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (
+                len(self._outcomes) >= self.minimum_calls
+                and failures / len(self._outcomes) >= self.failure_rate_threshold
+            ):
+                self._trip()
+
+    def _record(self, ok: bool) -> None:
+        now = self._clock()
+        self._outcomes.append((now, ok))
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _trip(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._probe_in_flight = False
+        self._outcomes.clear()
+        self.times_opened += 1
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            calls = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "state": state,
+                "window_calls": calls,
+                "window_failures": failures,
+                "failure_rate": round(failures / calls, 4) if calls else 0.0,
+                "times_opened": self.times_opened,
+                "rejected_calls": self.rejected_calls,
+                "open_for_seconds": round(self._clock() - self._opened_at, 1) if state != self.CLOSED else None,
+            }
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay_seconds: float = 0.2
+    max_delay_seconds: float = 2.0
+
+    def delay(self, attempt: int) -> float:
+        # "Full jitter": uniform between 0 and the capped exponential backoff
+        return random.uniform(0, min(self.max_delay_seconds, self.base_delay_seconds * (2 ** attempt)))
+
+
+class ResilienceGuard:
+    def __init__(self, *, breaker: CircuitBreaker, retry: RetryPolicy) -> None:
+        self.breaker = breaker
+        self.retry = retry
+        self.retries = 0
+
+    def _on_error(self, exc: BaseException) -> bool:
+        """Record the outcome of a failed attempt; returns True when it may be retried."""
+        if isinstance(exc, CircuitOpenError):
+            return False
+        if is_transient(exc):
+            self.breaker.record_failure()
+            return True
+        # Salesforce answered (bad query, not found, ...): the service itself is healthy
+        self.breaker.record_success()
+        return False
+
+    def call(self, fn: Callable[..., Any], *args: Any, idempotent: bool = True, **kwargs: Any) -> Any:
+        attempts = self.retry.max_attempts if idempotent else 1
+        for attempt in range(attempts):
+            self.breaker.before_call()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if self._on_error(e) and attempt + 1 < attempts:
+                    self.retries += 1
+                    time.sleep(self.retry.delay(attempt))
+                    continue
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def acall(
+        self, fn: Callable[..., Awaitable[Any]], *args: Any, idempotent: bool = True, **kwargs: Any
+    ) -> Any:
+        attempts = self.retry.max_attempts if idempotent else 1
+        for attempt in range(attempts):
+            self.breaker.before_call()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                if self._on_error(e) and attempt + 1 < attempts:
+                    self.retries += 1
+                    await asyncio.sleep(self.retry.delay(attempt))
+                    continue
+                raise
+            self.breaker.record_success()
+            return result
+
+    def status(self) -> Dict[str, Any]:
+        return {"circuit_breaker": self.breaker.status(), "retries": self.retries}
+
+
+def _env(name: str, default: str) -> float:
+    return float(os.getenv(name, default))
+
+
+TIMEOUT_SECONDS = _env("SF_TIMEOUT_SECONDS", "15")
+
+guard = ResilienceGuard(
+    breaker=CircuitBreaker(
+        failure_rate_threshold=_env("SF_BREAKER_FAILURE_RATE", "0.5"),
+        minimum_calls=int(_env("SF_BREAKER_MIN_CALLS", "10")),
+        window_seconds=_env("SF_BREAKER_WINDOW_SECONDS", "30"),
+        open_seconds=_env("SF_BREAKER_OPEN_SECONDS", "30"),
+    ),
+    retry=RetryPolicy(
+        max_attempts=int(_env("SF_RETRY_MAX_ATTEMPTS", "3")),
+        base_delay_seconds=_env("SF_RETRY_BASE_DELAY_SECONDS", "0.2"),
+        max_delay_seconds=_env("SF_RETRY_MAX_DELAY_SECONDS", "2"),
+    ),
+)
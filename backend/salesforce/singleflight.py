@@ -0,0 +1,160 @@
+"""
+Request coalescing ("single flight") for Salesforce reads.
+
+When several sessions ask about the same hot case at once, identical queries are
+collapsed: the first caller runs the request and every concurrent caller with the
+same key waits for, and receives, that one result (or exception). Nothing is cached
+once the request completes; see case_cache for that.
+
+Callers receive the same result object, so results must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def _normalize(value: Any) -> Hashable:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    return value
+
+
+def request_key(name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Hashable:
+    """Key identical requests the same way regardless of incidental whitespace."""
+    return (name, _normalize(args), _normalize(kwargs))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self, *, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Tuple[int, Hashable], "asyncio.Task[Any]"] = {}
+        self._waiters: Dict["asyncio.Task[Any]", int] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run fn once for all threads concurrently asking for `key`."""
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def ado(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Async twin of do(). The request runs as its own task, so a caller that is
+        cancelled does not cancel the request for the others waiting on it; it is only
+        cancelled once every waiter has gone.
+        """
+        if not self.enabled:
+            return await fn(*args, **kwargs)
+        # Tasks belong to one event loop, so requests are only shared within a loop
+        task_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = asyncio.ensure_future(fn(*args, **kwargs))
+                self._tasks[task_key] = task
+                self._waiters[task] = 0
+                task.add_done_callback(functools.partial(self._forget, task_key))
+                self.calls += 1
+            else:
+                self.coalesced += 1
+            self._waiters[task] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            with self._lock:
+                abandoned = self._waiters.get(task) == 1 and not task.done()
+                if abandoned and self._tasks.get(task_key) is task:
+                    del self._tasks[task_key]  # later callers start a fresh request
+            if abandoned:
+                task.cancel()
+            raise
+        finally:
+            with self._lock:
+                if task in self._waiters:
+                    self._waiters[task] -= 1
+
+    def _forget(self, task_key: Tuple[int, Hashable], task: "asyncio.Task[Any]") -> None:
+        with self._lock:
+            if self._tasks.get(task_key) is task:
+                del self._tasks[task_key]
+            self._waiters.pop(task, None)
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter was cancelled
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._calls) + len(self._tasks)
+        return {
+            "enabled": self.enabled,
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": in_flight,
+        }
+
+
+single_flight = SingleFlight(enabled=os.getenv("SF_COALESCE_ENABLED", "true").lower() in {"1", "true", "yes"})
+
+
+def coalesce(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorator routing a (sync or async) query function through single_flight."""
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await single_flight.ado(request_key(name, args, kwargs), fn, *args, **kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return single_flight.do(request_key(name, args, kwargs), fn, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,97 @@
+"""
+Small SOQL / SOSL builder with literal escaping and named Case field sets.
+
+Every query text in case_queries is assembled here so user input is always escaped
+the same way, and callers can ask for the narrowest projection they need:
+
+- "status":  list views (in-progress cases)
+- "summary": search candidate lists
+- "full":    a single case answered with the full response (adds Description)
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+CASE_FIELD_SETS: Dict[str, Tuple[str, ...]] = {
+    "status": ("Id", "CaseNumber", "Subject", "Status", "Priority", "LastModifiedDate"),
+    "summary": (
+        "Id", "CaseNumber", "Subject", "Status", "Priority", "Contact.Name", "LastModifiedDate", "SystemModstamp",
+    ),
+    "full": (
+        "Id", "CaseNumber", "Subject", "Description", "Status", "Priority", "Contact.Name",
+        "LastModifiedDate", "SystemModstamp",
+    ),
+}
+
+# Characters with meaning in SOQL string literals, and additionally in LIKE patterns
+_SOQL_ESCAPES = {"\\": "\\\\", "'": "\\'", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+_LIKE_ESCAPES = {**_SOQL_ESCAPES, "%": "\\%", "_": "\\_"}
+# Reserved characters in a SOSL FIND {...} clause
+_SOSL_RESERVED = set('?&|!{}[]()^~*:\\"\'+-')
+
+
+def case_fields(field_set: str = "full") -> str:
+    try:
+        return ", ".join(CASE_FIELD_SETS[field_set])
+    except KeyError:
+        raise ValueError(f"Unknown Case field set: {field_set!r}") from None
+
+
+def has_fields(record: Dict[str, Any], field_set: str) -> bool:
+    """True when a record already carries every (top-level) field of the set."""
+    return all(field.split(".", 1)[0] in record for field in CASE_FIELD_SETS[field_set])
+
+
+def literal(value: Any) -> str:
+    """Quote a value as a SOQL literal."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + "".join(_SOQL_ESCAPES.get(ch, ch) for ch in str(value)) + "'"
+
+
+def contains(value: str) -> str:
+    """LIKE pattern literal matching `value` anywhere, with % and _ taken literally."""
+    return "'%" + "".join(_LIKE_ESCAPES.get(ch, ch) for ch in value) + "%'"
+
+
+def in_list(values: Iterable[Any]) -> str:
+    return "(" + ", ".join(literal(v) for v in values) + ")"
+
+
+def sosl_term(text: str) -> str:
+    return "".join("\\" + ch if ch in _SOSL_RESERVED else ch for ch in text.strip())
+
+
+def select(
+    fields: str,
+    sobject: str,
+    *,
+    where: Optional[str] = None,
+    order_by: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> str:
+    parts = [f"SELECT {fields} FROM {sobject}"]
+    if where:
+        parts.append(f"WHERE {where}")
+    if order_by:
+        parts.append(f"ORDER BY {order_by}")
+    if limit:
+        parts.append(f"LIMIT {int(limit)}")
+    return " ".join(parts)
+
+
+def find(
+    text: str, sobject: str, fields: str, *, order_by: Optional[str] = None, limit: Optional[int] = None
+) -> str:
+    """SOSL search for `text` across all fields, returning `fields` of `sobject`."""
+    returning = fields
+    if order_by:
+        returning += f" ORDER BY {order_by}"
+    if limit:
+        returning += f" LIMIT {int(limit)}"
+    return f"FIND {{{sosl_term(text)}}} IN ALL FIELDS RETURNING {sobject}({returning})"
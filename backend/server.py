@@ -4,12 +4,12 @@ MCP server entrypoint for cloud deployment.
 
 from __future__ import annotations
 
+import asyncio
 import os
 import sys
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
-import uvicorn
 
 # Add project root to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -21,16 +21,48 @@ backend_path = os.path.join(project_root, 'backend')
 if backend_path not in sys.path:
     sys.path.insert(0, backend_path)
 
-from tools.ask_tool import mcp, salesforce_health
+from observability.log import get_logger
+from tools.ask_tool import _memory, mcp, salesforce_health
+
+log = get_logger(__name__)
 
 # Build the MCP ASGI app first so _session_manager is initialized
 _mcp_app = mcp.streamable_http_app()
 
+SERVER_WARMUP = os.getenv("SERVER_WARMUP", "true").lower() in {"1", "true", "yes"}
+SERVER_WARMUP_TIMEOUT_SECONDS = float(os.getenv("SERVER_WARMUP_TIMEOUT_SECONDS", "30"))
+
+
+async def _warm_salesforce():
+    """Log in (or restore the cached session) before this worker accepts connections."""
+    from salesforce.connection import connection_manager
+
+    try:
+        await asyncio.wait_for(asyncio.to_thread(connection_manager.get), SERVER_WARMUP_TIMEOUT_SECONDS)
+    except Exception as e:
+        # Serve anyway; /health reports the connection as failed
+        log.warning("⚠️ Salesforce warm-up failed", pid=os.getpid(), error=f"{type(e).__name__}: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # uvicorn starts accepting connections only after this startup part, so requests
+    # (and the platform health check) only reach workers with a warm Salesforce session
+    if SERVER_WARMUP:
+        await _warm_salesforce()
+    from salesforce.api_budget import api_budget
+    from salesforce.health_probe import health_prober
+
+    # Health endpoints answer from the prober's cached result; /limits is polled for the API budget
+    health_prober.start()
+    api_budget.start()
     # Run the MCP session manager's task group for the lifetime of the server
     async with mcp.session_manager.run():
         yield
+    await health_prober.stop()
+    await api_budget.stop()
+    from salesforce.async_client import async_sf
+
+    await async_sf.aclose()
 
 # Create FastAPI app for health checks and HTTP endpoints
 app = FastAPI(title="Salesforce MCP Server", redirect_slashes=False, lifespan=lifespan)
@@ -39,15 +71,45 @@ app = FastAPI(title="Salesforce MCP Server", redirect_slashes=False, lifespan=li
 async def root():
     return {"message": "Salesforce MCP Server is running", "status": "healthy"}
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness: the worker answers. Independent of Salesforce, so an outage never restarts it."""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness: the last background Salesforce probe succeeded recently (cached, no live query)."""
+    from salesforce.health_probe import health_prober
+
+    if health_prober.ready():
+        return {"status": "ready", "probe": health_prober.snapshot()}
+    return JSONResponse(status_code=503, content={"status": "not_ready", "probe": health_prober.snapshot()})
+
 @app.get("/health")
 async def health_check():
     try:
-        # Test Salesforce connection
-        sf_health = salesforce_health()
+        # Cached Salesforce status from the background probe
+        sf_health = await salesforce_health()
+        from agent.session_locks import session_locks
+        from salesforce.api_budget import api_budget
+        from salesforce.case_cache import case_cache
+        from salesforce.case_mirror import get_mirror
+        from salesforce.connection import connection_manager
+        from salesforce.resilience import guard
+        from salesforce.singleflight import single_flight
+
         return {
             "status": "healthy",
             "mcp_server": "running",
-            "salesforce": sf_health
+            "salesforce": sf_health,
+            "salesforce_session": connection_manager.status(),
+            "case_cache": case_cache.stats(),
+            "case_mirror": mirror.stats() if (mirror := get_mirror()) else None,
+            "resilience": guard.status(),
+            "api_budget": api_budget.stats(),
+            "coalescing": single_flight.stats(),
+            "sessions": _memory.stats(),
+            "session_locks": session_locks.stats(),
         }
     except Exception as e:
         return JSONResponse(
@@ -60,6 +122,14 @@ async def health_check():
             }
         )
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: per-stage latency, queries by type/outcome, Salesforce calls by function"""
+    from fastapi.responses import Response
+    from observability.metrics import CONTENT_TYPE, registry
+
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
 @app.get("/debug/env")
 async def debug_env():
     """Debug endpoint to check environment variables"""
@@ -91,11 +161,12 @@ if __name__ == "__main__":
     print(f"🐍 Python path: {sys.path[:3]}...")
     
     try:
-        # Run FastAPI server with uvicorn for Railway
-        uvicorn.run(app, host=host, port=port)
+        # WEB_CONCURRENCY=auto (or a number) forks that many workers sharing the port
+        from launcher import serve
+
+        serve(app, host=host, port=port)
     except Exception as e:
         print(f"❌ Server failed to start: {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
-
@@ -1,20 +1,49 @@
 from __future__ import annotations
 
-from mcp.server.fastmcp import FastMCP
+import json
+import os
+from typing import Optional
+
+from mcp.server.fastmcp import Context, FastMCP
 from mcp.server.transport_security import TransportSecuritySettings
 
-from agent.agent_core import handle_user_query
-from agent.memory import MemoryStore
+from agent.async_agent import ahandle_user_query, astream_user_query
+from agent.batch_lookup import alookup_cases
+from agent.instructions import INSTRUCTIONS
+from agent.response_format import render
+from agent.session_store import create_session_store
+from launcher import worker_count
+from observability.tracing import span
+
+
+def _stateless_http_default(workers: Optional[str] = None) -> bool:
+    """
+    MCP sessions live in the worker that created them; with several workers each request has
+    to stand alone. Counts workers the way the launcher does ("auto" on one core is one worker).
+    """
+    return worker_count(workers) > 1
+
+
+_MCP_STATELESS_HTTP = os.getenv(
+    "MCP_STATELESS_HTTP", "true" if _stateless_http_default() else "false"
+).lower() in {"1", "true", "yes"}
 
 mcp = FastMCP(
     streamable_http_path="/",
+    stateless_http=_MCP_STATELESS_HTTP,
     transport_security=TransportSecuritySettings(enable_dns_rebinding_protection=False),
 )
-_memory = MemoryStore()
+_memory = create_session_store()
 
 
 @mcp.tool()
-def ask(user_query: str, session_id: str = "default"):
+async def ask(
+    user_query: str,
+    session_id: str = "default",
+    response_format: str | None = None,
+    context_version: str | None = None,
+    ctx: Context | None = None,
+):
     """
     Query Salesforce cases with natural language. This tool can:
     - Get case details by case number or ID
@@ -33,35 +62,117 @@ def ask(user_query: str, session_id: str = "default"):
     Args:
         user_query: Natural language query about Salesforce cases
         session_id: Session identifier for maintaining conversation context
+        response_format: "full" (default) or "compact". Compact responses omit duplicated
+            record data and reference instructions by instructions_ref; fetch those once
+            with get_instructions.
+        context_version: The context_version of the previous follow-up response in this
+            session. When it is still current, the follow-up response carries only the new
+            conversation turns instead of the full case context again.
+        
+    When the request carries a progress token, the case header and then each related
+    collection (comments, history, feed) are sent as progress notifications whose message
+    is a JSON stream event, before the full response is returned.
         
     Returns:
         Structured response with case data, analysis, or search results
     """
-    return handle_user_query(user_query=user_query, session_id=session_id, memory=_memory)
+    emit = None
+    if ctx is not None and ctx.request_context.meta and ctx.request_context.meta.progressToken is not None:
+        sent = 0
+
+        async def emit(event):
+            nonlocal sent
+            sent += 1
+            await ctx.report_progress(sent, message=json.dumps(render(event, response_format), default=str))
+
+    payload = await ahandle_user_query(
+        user_query=user_query, session_id=session_id, memory=_memory, emit=emit, context_version=context_version
+    )
+    with span("serialize"):
+        return render(payload, response_format)
+
+
+async def ask_stream(
+    user_query: str, session_id: str = "default", response_format: str | None = None, context_version: str | None = None
+):
+    """Streaming variant of ask for the HTTP API: yields rendered stream events, ending with "result"."""
+    render({}, response_format)  # reject an unknown format before any Salesforce work
+    async for event in astream_user_query(
+        user_query=user_query, session_id=session_id, memory=_memory, context_version=context_version
+    ):
+        if event["event"] == "result":
+            yield {"event": "result", "response": render(event["response"], response_format)}
+        else:
+            yield render(event, response_format)
 
 
 @mcp.tool()
-def salesforce_health():
+async def get_cases(case_refs: list[str], include_comments: bool = False, response_format: str | None = None):
     """
-    Check Salesforce connectivity and authentication status.
+    Look up many cases at once by CaseNumber or 18-character Case Id, without natural
+    language parsing. Use this instead of calling ask in a loop: the cases are fetched
+    with a few IN (...) queries rather than one Salesforce call per case.
     
+    Args:
+        case_refs: CaseNumbers (e.g. "00001234") and/or Case Ids (e.g. "500...")
+        include_comments: Also return each case's comments (one extra query per 200 cases)
+        response_format: "full" (default) or "compact" (drops Salesforce attributes metadata)
+        
     Returns:
-        Connection status and user identity information
+        {"type": "case_batch", "results": [...]} with one entry per distinct reference, in
+        request order, whose status is found, not_found, invalid or error
     """
-    from salesforce.health import ping
+    payload = await alookup_cases(case_refs, include_comments=include_comments)
+    with span("serialize"):
+        return render(payload, response_format)
 
-    try:
-        identity = ping()
-        return {
-            "type": "salesforce_health", 
-            "ok": True, 
-            "identity": identity,
-            "message": f"✅ Connected to Salesforce as {identity.get('display_name', 'Unknown User')}"
-        }
-    except Exception as e:
+
+@mcp.tool()
+async def get_instructions(template_id: str):
+    """
+    Get the response instructions referenced by a compact response's instructions_ref.
+    The text for a given id and version never changes, so it can be cached.
+    
+    Args:
+        template_id: The "id" of the instructions_ref (e.g. "case_response")
+    """
+    template = INSTRUCTIONS.get(template_id)
+    if template is None:
         return {
-            "type": "salesforce_health",
-            "ok": False, 
-            "error": f"{type(e).__name__}: {e}",
-            "message": "❌ Failed to connect to Salesforce"
+            "type": "error",
+            "error": f"Unknown instruction template '{template_id}'",
+            "available": sorted(INSTRUCTIONS),
         }
+    return template.as_dict()
+
+
+@mcp.tool()
+async def salesforce_health(refresh: bool = False):
+    """
+    Check Salesforce connectivity and authentication status.
+
+    Answers from the background health probe's last result; refresh=True runs a live check.
+
+    Returns:
+        Connection status, user identity information and rolling probe latency/error rate
+    """
+    from salesforce.health_probe import health_prober
+    from salesforce.resilience import guard
+
+    if refresh or health_prober.last is None:
+        await health_prober.check()
+    identity = health_prober.last
+    ok = bool(identity.get("ok"))
+    result = {
+        "type": "salesforce_health",
+        "ok": ok,
+        "identity": identity,
+        "probe": health_prober.snapshot(),
+        "circuit_breaker": guard.breaker.status(),
+        "message": identity.get("message") or (
+            "✅ Connected to Salesforce" if ok else "❌ Failed to connect to Salesforce"
+        ),
+    }
+    if not ok and identity.get("error"):
+        result["error"] = identity["error"]
+    return result
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request routing cost over intent_corpus.json
+
+Usage: python bench_intent_router.py [rounds]
+"""
+
+import sys
+import os
+import json
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from agent.intent_router import route
+
+
+def main(rounds: int = 2000) -> None:
+    with open(os.path.join(os.path.dirname(__file__), 'intent_corpus.json'), encoding="utf-8") as f:
+        queries = [entry["query"] for entry in json.load(f)]
+
+    results = {}
+    for label, resolve in (
+        ("route (signals only)", lambda q: route(q)),
+        ("route + kind", lambda q: route(q).kind),
+    ):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for q in queries:
+                resolve(q)
+        elapsed = time.perf_counter() - started
+        results[label] = elapsed / (rounds * len(queries)) * 1e6
+
+    print(f"{len(queries)} queries x {rounds} rounds")
+    for label, micros in results.items():
+        print(f"  {label:<22} {micros:8.2f} µs/query")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serialized payload size per response type, full vs compact format
+
+Usage: python bench_response_size.py
+"""
+
+import sys
+import os
+import json
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from agent import agent_core
+from agent.data_processing import prepare_case_data, prepare_followup_context, prepare_knowledge_article_data
+from agent.response_format import render
+
+
+def sample_case():
+    return {
+        "attributes": {"type": "Case", "url": "/services/data/v59.0/sobjects/Case/5003000000D8cuIAAR"},
+        "Id": "5003000000D8cuIAAR",
+        "CaseNumber": "00001166",
+        "Subject": "Jira connection fails after SSO certificate rotation",
+        "Description": (
+            "Since the IdP certificate was rotated on Monday, the Jira connector returns 401 for every "
+            "sync. Customer has re-uploaded the metadata twice. Logs attached show SAML assertion "
+            "signature validation failures on the connector host. "
+        ) * 3,
+        "Status": "Working",
+        "Priority": "High",
+        "Contact": {"attributes": {"type": "Contact", "url": "/services/data/v59.0/sobjects/Contact/003"},
+                    "Name": "Ada Lovelace"},
+        "LastModifiedDate": "2024-05-03T08:30:00.000+0000",
+        "SystemModstamp": "2024-05-03T08:30:00.000+0000",
+    }
+
+
+def sample_comments(n=10):
+    return [
+        {
+            "attributes": {"type": "CaseComment", "url": f"/services/data/v59.0/sobjects/CaseComment/00a{i}"},
+            "CommentBody": f"Update {i}: asked customer for the connector logs and the new IdP metadata.",
+            "CreatedDate": "2024-05-02T10:00:00.000+0000",
+            "CreatedBy": {"attributes": {"type": "User", "url": "/services/data/v59.0/sobjects/User/005"},
+                          "Name": "Support Engineer"},
+        }
+        for i in range(n)
+    ]
+
+
+def payloads():
+    case = sample_case()
+    case_data = prepare_case_data(case)
+    history = [{"q": "What has been tried?", "a": "Metadata re-upload, twice."}] * 3
+
+    with_comments = agent_core._case_response_payload(case=case, case_data=case_data, session_id="s1")
+    with_comments["comments"] = sample_comments()
+    return {
+        "case_response": agent_core._case_response_payload(case=case, case_data=case_data, session_id="s1"),
+        "case_response + comments": with_comments,
+        "technical_followup": agent_core._technical_followup_payload(
+            context={"case_context": case_data}, session_id="s1", user_question="is the fix done?",
+            context_version="0c1d2e3f4a5b.4",
+        ),
+        "followup_answer": agent_core._followup_answer_payload(
+            context_data=prepare_followup_context(
+                history_context={"case_context": case_data, "conversation_history": history},
+                user_question="who owns this?",
+            ),
+            session_id="s1",
+            stored=True,
+            context_version="0c1d2e3f4a5b.4",
+        ),
+        "followup_answer (delta)": agent_core._followup_answer_payload(
+            context_data=prepare_followup_context(
+                history_context={"context_base": "0c1d2e3f4a5b.3", "conversation_history": []},
+                user_question="who owns this?",
+            ),
+            session_id="s1",
+            stored=True,
+            context_version="0c1d2e3f4a5b.4",
+        ),
+        "knowledge_article": agent_core._knowledge_article_payload(
+            article_data=prepare_knowledge_article_data(case_data=case_data, conversation_history=history),
+            session_id="s1",
+        ),
+    }
+
+
+def size(payload):
+    return len(json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def main():
+    print(f"{'response type':<26} {'full':>8} {'compact':>8} {'ratio':>6}")
+    for name, payload in payloads().items():
+        full, compact = size(render(payload, "full")), size(render(payload, "compact"))
+        print(f"{name:<26} {full:>8} {compact:>8} {full / compact:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTTP throughput of backend/server.py by worker count
+
+Starts the server with WEB_CONCURRENCY = 1, 2, 4, ... up to the available cores (no
+Salesforce warm-up), drives it with one keep-alive client process per core and prints
+requests per second. Requests go to GET / by default, which measures the serving stack
+rather than Salesforce; pass another path to include more of the app.
+
+Usage: python bench_server_workers.py [seconds] [path]
+"""
+
+import sys
+import os
+import http.client
+import multiprocessing
+import socket
+import subprocess
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from launcher import available_cpus
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def _client(port: int, path: str, seconds: float, results) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    done = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        conn.request("GET", path)
+        conn.getresponse().read()
+        done += 1
+    results.put(done)
+
+
+def run(workers: int, seconds: float, path: str, clients: int) -> float:
+    port = _free_port()
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port), SERVER_WARMUP="false", LOG_LEVEL="WARNING")
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(__file__), "backend", "server.py")],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(port)
+        time.sleep(1.0)  # let every worker finish starting
+        results = multiprocessing.Queue()
+        procs = [multiprocessing.Process(target=_client, args=(port, path, seconds, results)) for _ in range(clients)]
+        for proc in procs:
+            proc.start()
+        total = sum(results.get() for _ in procs)
+        for proc in procs:
+            proc.join()
+        return total / seconds
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main(seconds: float = 5.0, path: str = "/") -> None:
+    cpus = available_cpus()
+    counts = sorted({1, *(n for n in (2, 4, 8, 16, 32) if n <= cpus), cpus})
+    print(f"GET {path}, {cpus} cores, {cpus} client processes, {seconds:g}s per run")
+    baseline = None
+    for workers in counts:
+        rps = run(workers, seconds, path, clients=cpus)
+        baseline = baseline or rps
+        print(f"  {workers:>3} workers {rps:10.0f} req/s  x{rps / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 5.0,
+        sys.argv[2] if len(sys.argv) > 2 else "/",
+    )
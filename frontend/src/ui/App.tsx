@@ -112,9 +112,28 @@ type BackendResponse =
   | { type: "ok"; session_id: string; message: string }
   | { type: "error"; session_id: string; error: string; case_number?: string };
 
+type CasePart = "comments" | "history" | "feed";
+
+type StreamEvent =
+  | {
+      event: "case";
+      case_id?: string;
+      case_number?: string;
+      case_data?: { subject?: string; status?: string; priority?: string; description?: string };
+      case_source?: string;
+    }
+  | { event: "part"; part: CasePart; records?: any[]; error?: string }
+  | { event: "result"; response: BackendResponse };
+
+type PartialCase = {
+  header?: Extract<StreamEvent, { event: "case" }>;
+  parts: Partial<Record<CasePart, { records?: any[]; error?: string }>>;
+};
+
 type ChatMsg =
   | { id: string; role: "user"; text: string }
   | { id: string; role: "assistant"; raw: BackendResponse }
+  | { id: string; role: "assistant"; partial: PartialCase }
   | { id: string; role: "assistant"; text: string; isError?: boolean; isTyping?: boolean };
 
 function uuid() {
@@ -140,6 +159,37 @@ async function postQuery(query: string, session_id: string): Promise<BackendResp
   return (await res.json()) as BackendResponse;
 }
 
+// Streams NDJSON events from /query/stream; resolves with the final response.
+async function postQueryStream(
+  query: string,
+  session_id: string,
+  onEvent: (ev: StreamEvent) => void
+): Promise<BackendResponse> {
+  const res = await fetch("/query/stream", {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "application/x-ndjson" },
+    body: JSON.stringify({ query, session_id })
+  });
+  if (!res.ok || !res.body) return postQuery(query, session_id);
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    buffered += decoder.decode(value, { stream: !done });
+    const lines = buffered.split("\n");
+    buffered = done ? "" : lines.pop() ?? "";
+    for (const line of lines) {
+      if (!line.trim()) continue;
+      const ev = JSON.parse(line) as StreamEvent;
+      if (ev.event === "result") return ev.response;
+      onEvent(ev);
+    }
+    if (done) throw new Error("stream ended without a result");
+  }
+}
+
 export function App() {
   const [sessionId] = useState(() => `ui-${crypto?.randomUUID?.() ?? uuid()}`);
   const [draft, setDraft] = useState("");
@@ -161,7 +211,7 @@ export function App() {
   const headerChips = useMemo(
     () => [
       { label: "Session", value: sessionId },
-      { label: "Endpoint", value: "POST /query" }
+      { label: "Endpoint", value: "POST /query/stream" }
     ],
     [sessionId]
   );
@@ -179,8 +229,22 @@ export function App() {
     setMsgs((m) => [...m, { id: typingId, role: "assistant", text: "", isTyping: true }]);
     
     try {
-      const resp = await postQuery(trimmed, sessionId);
-      // Remove typing indicator and add actual response
+      // Sections are shown as they arrive; the typing indicator becomes a partial case view
+      const resp = await postQueryStream(trimmed, sessionId, (ev) =>
+        setMsgs((m) =>
+          m.map((msg): ChatMsg => {
+            if (msg.id !== typingId) return msg;
+            const partial: PartialCase = "partial" in msg ? msg.partial : { parts: {} };
+            if (ev.event === "case") return { id: typingId, role: "assistant", partial: { ...partial, header: ev } };
+            if (ev.event === "part") {
+              const parts = { ...partial.parts, [ev.part]: { records: ev.records, error: ev.error } };
+              return { id: typingId, role: "assistant", partial: { ...partial, parts } };
+            }
+            return msg;
+          })
+        )
+      );
+      // Remove typing indicator / partial view and add actual response
       setMsgs((m) => m.filter(msg => msg.id !== typingId).concat({ id: uuid(), role: "assistant", raw: resp }));
     } catch (e: any) {
       // Remove typing indicator and add error
@@ -249,6 +313,17 @@ export function App() {
               );
             }
 
+            if ("partial" in m) {
+              return (
+                <div key={m.id} className="row">
+                  <div className="avatar">A</div>
+                  <div className="bubble">
+                    <PartialCaseView partial={m.partial} />
+                  </div>
+                </div>
+              );
+            }
+
             const r = m.raw;
             return (
               <div key={m.id} className="row">
@@ -287,6 +362,58 @@ export function App() {
   );
 }
 
+const PART_TITLES: Record<CasePart, string> = { comments: "Case Comments", history: "Case History", feed: "Case Feed" };
+
+function PartialCaseView({ partial }: { partial: PartialCase }) {
+  const h = partial.header;
+  return (
+    <>
+      {h ? (
+        <>
+          <div>
+            <b>Case {h.case_number}</b> {h.case_data?.subject}
+          </div>
+          <div className="meta">
+            {h.case_data?.status ? <span className="pill">Status: {h.case_data.status}</span> : null}
+            {h.case_data?.priority ? <span className="pill">Priority: {h.case_data.priority}</span> : null}
+            {h.case_source ? <span className="pill">Source: {h.case_source}</span> : null}
+          </div>
+        </>
+      ) : null}
+      <div className="sections">
+        {(Object.keys(partial.parts) as CasePart[]).map((part) => {
+          const p = partial.parts[part]!;
+          return (
+            <div key={part} className="section">
+              <div className="sectionTitle">
+                {PART_TITLES[part]} {p.records ? `(${p.records.length})` : ""}
+              </div>
+              {p.error ? (
+                <div className="bubbleErr">{p.error}</div>
+              ) : (
+                <ul className="list">
+                  {(p.records ?? []).map((r, index) => (
+                    <li key={index}>
+                      {r.CommentBody ?? r.Body ?? `${r.Field}: ${r.OldValue ?? "(empty)"} → ${r.NewValue ?? "(empty)"}`}
+                    </li>
+                  ))}
+                </ul>
+              )}
+            </div>
+          );
+        })}
+      </div>
+      <div className="typingIndicator">
+        <div className="typingDots">
+          <span></span>
+          <span></span>
+          <span></span>
+        </div>
+      </div>
+    </>
+  );
+}
+
 function ResponseView({ resp, onQuickSend }: { resp: BackendResponse; onQuickSend: (t: string) => void }) {
   if (resp.type === "clarification") {
     return (
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script for Salesforce API budget tracking and background call throttling
+"""
+
+import sys
+import os
+import asyncio
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def _budget(**kwargs):
+    from salesforce.api_budget import ApiBudget
+
+    now = [0.0]
+    options = dict(calls_per_minute=60, burst=5, slowdown_fraction=0.5, reserve_fraction=0.1)
+    options.update(kwargs)
+    return ApiBudget(clock=lambda: now[0], **options), now
+
+
+def test_usage_is_read_from_header_and_limits():
+    from observability import metrics
+
+    budget, _ = _budget()
+    assert budget.remaining is None and budget.rate_factor() == 1.0, "unknown budget is not throttled"
+
+    budget.observe_header("api-usage=25/5000; per-app-api-usage=17/250(appName=sample-connected-app)")
+    assert (budget.used, budget.max, budget.remaining) == (25, 5000, 4975)
+    assert metrics.salesforce_api_remaining.value() == 4975
+    assert budget.responded_within(1)
+
+    budget.observe_header("per-app-api-usage=17/250(appName=x)")
+    assert budget.used == 25, "per-app usage is not the org allowance"
+    budget.observe_limits({"DailyApiRequests": {"Max": 5000, "Remaining": 1500}})
+    assert budget.remaining == 1500 and budget.stats()["remaining_fraction"] == 0.3
+
+
+def test_background_rate_shrinks_with_budget_and_stops_at_reserve():
+    budget, now = _budget()
+    budget.observe_limits({"DailyApiRequests": {"Max": 1000, "Remaining": 900}})
+    assert sum(budget.allow("prefetch") for _ in range(10)) == 5, "burst, then empty"
+    now[0] += 3
+    assert sum(budget.allow("prefetch") for _ in range(10)) == 3, "full rate: one token per second"
+
+    budget.observe_limits({"DailyApiRequests": {"Max": 1000, "Remaining": 310}})
+    assert round(budget.rate_factor(), 3) == 0.525
+    now[0] += 4
+    assert sum(budget.allow("prefetch") for _ in range(10)) == 2, "about half rate"
+
+    budget.observe_limits({"DailyApiRequests": {"Max": 1000, "Remaining": 100}})
+    now[0] += 60
+    assert not budget.allow("health_probe"), "the reserve is kept for user queries"
+    assert budget.stats()["background_throttled"] == {"prefetch": 20, "health_probe": 1}
+
+    from observability.metrics import registry
+
+    lines = registry.render().splitlines()
+    assert "# TYPE sf_agent_salesforce_background_calls counter" in lines
+    assert any(
+        line.startswith('sf_agent_salesforce_background_calls_total{kind="health_probe",outcome="throttled"} ')
+        for line in lines
+    )
+
+
+def test_prefetch_and_probes_degrade_when_budget_is_low():
+    from salesforce import api_budget as api_budget_module
+    from salesforce import case_cache
+    from salesforce.health_probe import HealthProber
+
+    budget, now = _budget()
+    budget.observe_limits({"DailyApiRequests": {"Max": 1000, "Remaining": 50}})
+    original = api_budget_module.api_budget
+    api_budget_module.api_budget = budget
+    try:
+        assert case_cache.prefetch_cases(["500A", "500B"]) == []
+
+        # Stale hits are served without revalidating against Salesforce
+        clock = [0.0]
+        cache = case_cache.CaseCache(ttl_seconds=30, stale_ttl_seconds=300, clock=lambda: clock[0], background=False)
+        cache.put({"Id": "500A", "CaseNumber": "00001150", "SystemModstamp": "v1"})
+        clock[0] = 60
+        reloads = []
+        stale = cache.lookup("500A", lambda case_id: reloads.append(case_id) or [], lambda case_id: reloads.append(case_id))
+        assert stale["SystemModstamp"] == "v1" and reloads == [] and cache.refreshes == cache.revalidated == 0
+
+        calls = []
+
+        async def probe():
+            calls.append(1)
+            return {"type": "salesforce_health", "ok": True}
+
+        prober = HealthProber(interval_seconds=1, jitter=0, probe=probe)
+
+        async def run():
+            prober.start()
+            await asyncio.sleep(0.05)
+            budget.observe_header("api-usage=950/1000")  # user traffic still reaches Salesforce
+            await asyncio.sleep(1.1)
+            await prober.stop()
+        asyncio.run(run())
+
+        assert len(calls) == 1, "only the first probe ran"
+        assert prober.skipped == 1 and prober.ready(), "recent traffic stands in for the skipped probe"
+    finally:
+        api_budget_module.api_budget = original
+
+
+def test_idle_worker_stays_ready_on_a_low_budget():
+    from salesforce import api_budget as api_budget_module
+    from salesforce.health_probe import HealthProber
+
+    budget, now = _budget(poll_seconds=300)
+    original = api_budget_module.api_budget
+    api_budget_module.api_budget = budget
+    try:
+        prober = HealthProber(interval_seconds=30, clock=lambda: now[0])
+        prober.last = {"ok": True}
+        prober.checked_at = prober.last_ok_at = now[0]
+        # No user traffic: only the /limits poll answers, every 300s, with 5% of the budget left
+        for second in range(0, 3600, 30):
+            now[0] = float(second)
+            if second % 300 == 0:
+                budget.observe_limits({"DailyApiRequests": {"Max": 1000, "Remaining": 50}})
+            assert not budget.allow("health_probe")
+            prober._skip()
+            assert prober.ready(), f"not ready at {second}s"
+
+        # Salesforce stops answering the poll: readiness drops within a poll period and the window
+        for second in range(3600, 4200, 30):
+            now[0] = float(second)
+            prober._skip()
+        assert not prober.ready()
+    finally:
+        api_budget_module.api_budget = original
+
+
+if __name__ == "__main__":
+    test_usage_is_read_from_header_and_limits()
+    test_background_rate_shrinks_with_budget_and_stops_at_reserve()
+    test_prefetch_and_probes_degrade_when_budget_is_low()
+    test_idle_worker_stays_ready_on_a_low_budget()
+    print("✅ API budget tests passed")
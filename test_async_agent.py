@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script for the async agent entrypoint (Salesforce calls are stubbed)
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def test_concurrent_queries_do_not_block_each_other():
+    from agent import async_agent
+    from agent.agent_core import CaseBundle
+    from agent.memory import MemoryStore
+
+    async def slow_bundle(**kwargs):
+        await asyncio.sleep(0.2)
+        number = kwargs.get("case_number")
+        return CaseBundle(case={"Id": "500" + number, "CaseNumber": number}, source="salesforce", detail=None)
+
+    original = async_agent._ASYNC_OPS["bundle"]
+    async_agent._ASYNC_OPS["bundle"] = slow_bundle
+    memory = MemoryStore()
+
+    async def run_all():
+        return await asyncio.gather(*(
+            async_agent.ahandle_user_query(user_query=f"show case {1000 + i:08d}", session_id=f"s{i}", memory=memory)
+            for i in range(20)
+        ))
+
+    try:
+        started = time.perf_counter()
+        results = asyncio.run(run_all())
+        elapsed = time.perf_counter() - started
+    finally:
+        async_agent._ASYNC_OPS["bundle"] = original
+
+    print(f"20 concurrent queries in {elapsed:.3f}s")
+    assert elapsed < 1.0  # sequential would take 4s
+    assert [r["type"] for r in results] == ["case_response"] * 20
+    assert results[3]["case_number"] == "00001003"
+
+
+def test_queries_on_one_session_are_serialized():
+    from agent import async_agent
+    from agent.agent_core import CaseBundle
+    from agent.memory import MemoryStore
+    from agent.session_locks import session_locks
+
+    running, overlaps = set(), []
+
+    async def slow_bundle(**kwargs):
+        number = kwargs.get("case_number")
+        overlaps.append(sorted(running))
+        running.add(number)
+        await asyncio.sleep(0.1)
+        running.discard(number)
+        return CaseBundle(case={"Id": "500" + number, "CaseNumber": number}, source="salesforce", detail=None)
+
+    original = async_agent._ASYNC_OPS["bundle"]
+    async_agent._ASYNC_OPS["bundle"] = slow_bundle
+    memory = MemoryStore()
+    contended = session_locks.contended
+
+    async def double_submit():
+        return await asyncio.gather(*(
+            async_agent.ahandle_user_query(user_query=f"show case {number}", session_id="same", memory=memory)
+            for number in ("00001001", "00001002")
+        ))
+
+    try:
+        first, second = asyncio.run(double_submit())
+    finally:
+        async_agent._ASYNC_OPS["bundle"] = original
+
+    assert overlaps == [[], []], "the second query on the session waited for the first"
+    assert session_locks.contended == contended + 1
+    assert memory.get("same").case_data["case_number"] == second["case_number"] == "00001002"
+    assert session_locks.stats()["active_sessions"] == 0
+
+
+def test_async_bundle_gathers_parts():
+    from agent import async_agent
+
+    async def fake_case(case_id):
+        await asyncio.sleep(0.1)
+        return {"Id": case_id}, "salesforce", None
+
+    async def fake_records(query_name, *args):
+        await asyncio.sleep(0.1)
+        return ([{"q": query_name}], "salesforce", None)
+
+    originals = (async_agent._aload_case_by_id, async_agent._aload_records)
+    async_agent._aload_case_by_id, async_agent._aload_records = fake_case, fake_records
+    try:
+        started = time.perf_counter()
+        bundle = asyncio.run(async_agent._aload_case_bundle(case_id="500A", parts=("comments", "feed")))
+        elapsed = time.perf_counter() - started
+    finally:
+        async_agent._aload_case_by_id, async_agent._aload_records = originals
+
+    assert elapsed < 0.25
+    assert bundle.parts == {"comments": [{"q": "get_case_comments"}], "feed": [{"q": "get_case_feed"}]}
+
+
+def test_stream_emits_header_before_parts():
+    from agent import async_agent
+    from agent.memory import MemoryStore
+
+    delays = {"get_case_comments": 0.3, "get_case_history": 0.02, "get_case_feed": 0.1}
+
+    async def fake_case(case_id):
+        await asyncio.sleep(0.05)  # history is already back by then
+        return {"Id": case_id, "CaseNumber": "00001234", "Subject": "VPN down"}, "salesforce", None
+
+    async def fake_records(query_name, *args):
+        await asyncio.sleep(delays[query_name])
+        if query_name == "get_case_feed":
+            return [], "salesforce_error", "SalesforceError: feed unavailable"
+        return [{"q": query_name}], "salesforce", None
+
+    async def collect():
+        stream = async_agent.astream_user_query(
+            user_query="full context for case 500A00000000000AAA", session_id="s", memory=MemoryStore()
+        )
+        return [(event, time.perf_counter()) async for event in stream]
+
+    originals = (async_agent._aload_case_by_id, async_agent._aload_records)
+    async_agent._aload_case_by_id, async_agent._aload_records = fake_case, fake_records
+    try:
+        started = time.perf_counter()
+        timed = asyncio.run(collect())
+    finally:
+        async_agent._aload_case_by_id, async_agent._aload_records = originals
+
+    events = [event for event, _ in timed]
+    assert [e.get("part", e["event"]) for e in events] == ["case", "history", "feed", "comments", "result"]
+    assert events[0]["case_data"]["subject"] == "VPN down"
+    assert timed[0][1] - started < 0.2  # header does not wait for the slowest part
+    assert events[2]["error"].startswith("SalesforceError")
+    response = events[-1]["response"]
+    assert response["type"] == "case_response" and response["part_errors"] == {"feed": events[2]["error"]}
+
+
+if __name__ == "__main__":
+    test_concurrent_queries_do_not_block_each_other()
+    test_queries_on_one_session_are_serialized()
+    test_async_bundle_gathers_parts()
+    test_stream_emits_header_before_parts()
+    print("✅ async agent tests passed")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test script for the batch case lookup (the async Salesforce client is stubbed)
+"""
+
+import sys
+import os
+import asyncio
+import re
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+class FakeAsyncSF:
+    """Answers Case / CaseComment IN (...) queries from an in-memory org."""
+
+    def __init__(self, cases, fail_ids=False, comments_per_case=1):
+        self.cases = cases
+        self.fail_ids = fail_ids
+        self.comments_per_case = comments_per_case
+        self.statements = []
+
+    async def query(self, soql, headers=None):
+        self.statements.append(soql)
+        values = re.findall(r"'([^']*)'", soql)
+        if "FROM CaseComment" in soql:
+            records = [
+                {"ParentId": c["Id"], "CommentBody": f"note on {c['CaseNumber']}" + (f" #{n}" if n else "")}
+                for c in self.cases if c["Id"] in values
+                for n in range(self.comments_per_case)
+            ]
+        elif "WHERE Id IN" in soql:
+            if self.fail_ids:
+                raise ConnectionError("connection reset")
+            records = [c for c in self.cases if c["Id"] in values]
+        else:
+            records = [c for c in self.cases if c["CaseNumber"] in values]
+        return {"records": [dict(r) for r in records], "done": True}
+
+
+def _org(n):
+    return [{"Id": f"500{i:015d}", "CaseNumber": f"{i:08d}", "Subject": f"Case {i}"} for i in range(n)]
+
+
+def _run(fake, refs, **kwargs):
+    from agent import batch_lookup
+    from salesforce import async_case_queries, case_cache
+
+    original = async_case_queries.async_sf
+    async_case_queries.async_sf = fake
+    case_cache.case_cache.clear()
+    try:
+        return asyncio.run(batch_lookup.alookup_cases(refs, **kwargs))
+    finally:
+        async_case_queries.async_sf = original
+        case_cache.case_cache.clear()
+
+
+def test_two_hundred_cases_in_a_handful_of_queries():
+    cases = _org(300)
+    refs = [c["CaseNumber"] for c in cases[:150]] + [c["Id"] for c in cases[150:200]]
+    fake = FakeAsyncSF(cases)
+    payload = _run(fake, refs + ["99999999", "not-a-case", refs[0]], include_comments=True)
+
+    assert payload["type"] == "case_batch" and payload["requested"] == 202
+    assert payload["found"] == 200
+    assert len(fake.statements) == payload["salesforce_queries"] == 3  # numbers, ids, comments
+    results = payload["results"]
+    assert [r["ref"] for r in results[:2]] == refs[:2]  # request order
+    assert results[0]["case"]["Subject"] == "Case 0" and results[0]["case_source"] == "salesforce"
+    assert results[0]["comments"] == [{"CommentBody": "note on 00000000"}]
+    assert results[-2]["status"] == "not_found" and results[-1]["status"] == "invalid"
+
+
+def test_chunks_and_failed_chunks():
+    from salesforce import case_queries
+
+    cases = _org(10)
+    fake = FakeAsyncSF(cases, fail_ids=True)
+    original = case_queries.BATCH_CHUNK_SIZE
+    case_queries.BATCH_CHUNK_SIZE = 4
+    try:
+        payload = _run(fake, [c["CaseNumber"] for c in cases] + [cases[0]["Id"]])
+    finally:
+        case_queries.BATCH_CHUNK_SIZE = original
+
+    assert payload["salesforce_queries"] == 4  # 3 CaseNumber chunks + 1 Id chunk
+    statuses = [r["status"] for r in payload["results"]]
+    assert statuses == ["found"] * 10 + ["found"]  # the Id was also found through its CaseNumber
+    assert payload["results"][-1]["case_source"] == "salesforce"
+
+
+def test_unresolved_ref_in_failed_chunk_reports_error():
+    cases = _org(2)
+    payload = _run(FakeAsyncSF(cases, fail_ids=True), ["500999999999999999"])
+    assert payload["results"][0]["status"] == "error"
+    assert payload["results"][0]["error"].startswith("ConnectionError")
+
+
+def test_stale_cache_entries_join_the_batch():
+    from agent import batch_lookup
+    from salesforce import async_case_queries
+    from salesforce.case_cache import case_cache
+
+    cases = _org(200)
+    fake = FakeAsyncSF(cases)
+    original = async_case_queries.async_sf
+    async_case_queries.async_sf = fake
+    case_cache.clear()
+    try:
+        for record in cases[:150]:
+            case_cache.put(dict(record, Subject="old"))
+        for entry in case_cache._entries.values():
+            entry.fetched_at -= case_cache.ttl_seconds + 1
+        case_cache.put(cases[150])  # one fresh entry
+        refreshed = case_cache.refreshes + case_cache.revalidated
+        payload = asyncio.run(batch_lookup.alookup_cases([c["Id"] for c in cases]))
+        assert not case_cache._refreshing and case_cache.refreshes + case_cache.revalidated == refreshed
+    finally:
+        async_case_queries.async_sf = original
+        case_cache.clear()
+
+    assert payload["salesforce_queries"] == len(fake.statements) == 1, "one Id IN (...) chunk, no per-case refreshes"
+    sources = [r["case_source"] for r in payload["results"]]
+    assert sources.count("cache") == 1 and sources.count("salesforce") == 199
+    assert payload["results"][0]["case"]["Subject"] == "Case 0", "stale copies are reloaded"
+
+
+def test_comment_cap_flags_the_cases_it_cut_off():
+    from agent import batch_lookup
+    from salesforce import case_queries
+
+    cases = _org(6)
+    fake = FakeAsyncSF(cases, comments_per_case=2)
+    originals = case_queries.BATCH_CHUNK_SIZE, batch_lookup.BATCH_MAX_COMMENT_ROWS
+    case_queries.BATCH_CHUNK_SIZE, batch_lookup.BATCH_MAX_COMMENT_ROWS = 4, 5
+    try:
+        payload = _run(fake, [c["Id"] for c in cases], include_comments=True)
+    finally:
+        case_queries.BATCH_CHUNK_SIZE, batch_lookup.BATCH_MAX_COMMENT_ROWS = originals
+
+    # First chunk: 8 rows capped at 5, so case 2 lost a comment and case 3 got none
+    results = payload["results"]
+    assert payload["comments_truncated"] is True
+    assert [len(r["comments"]) for r in results] == [2, 2, 1, 0, 2, 2]
+    assert [r.get("comments_truncated", False) for r in results] == [False, False, True, True, False, False]
+
+
+def test_limit():
+    from agent import batch_lookup
+
+    payload = asyncio.run(batch_lookup.alookup_cases([str(i) for i in range(batch_lookup.BATCH_MAX_REFS + 1)]))
+    assert payload["type"] == "error"
+
+
+if __name__ == "__main__":
+    test_two_hundred_cases_in_a_handful_of_queries()
+    test_chunks_and_failed_chunks()
+    test_unresolved_ref_in_failed_chunk_reports_error()
+    test_stale_cache_entries_join_the_batch()
+    test_comment_cap_flags_the_cases_it_cut_off()
+    test_limit()
+    print("✅ batch lookup tests passed")
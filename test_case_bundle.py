@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Test script for the parallel case bundle loader (Salesforce loaders are stubbed)
+"""
+
+import sys
+import os
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def _slow(result, delay=0.2):
+    def loader(_key):
+        time.sleep(delay)
+        return result
+    return loader
+
+
+def test_bundle_loads_parts_concurrently():
+    from agent import agent_core
+
+    originals = {
+        name: getattr(agent_core, name)
+        for name in ("_load_case_by_id", "_load_case_comments", "_load_case_history", "_load_case_feed")
+    }
+    try:
+        agent_core._load_case_by_id = _slow(({"Id": "500A", "CaseNumber": "1"}, "salesforce", None))
+        agent_core._load_case_comments = _slow(([{"CommentBody": "hi"}], "salesforce", None))
+        agent_core._load_case_history = _slow(([], "salesforce_error", "boom"))
+        agent_core._load_case_feed = _slow(([{"Body": "x"}], "salesforce", None))
+
+        started = time.perf_counter()
+        bundle = agent_core._load_case_bundle(case_id="500A", parts=agent_core._CASE_PARTS)
+        elapsed = time.perf_counter() - started
+    finally:
+        for name, fn in originals.items():
+            setattr(agent_core, name, fn)
+
+    print(f"bundle loaded in {elapsed:.3f}s")
+    assert elapsed < 0.6  # four 0.2s calls, run side by side
+    assert bundle.case["Id"] == "500A"
+    assert bundle.parts == {"comments": [{"CommentBody": "hi"}], "feed": [{"Body": "x"}]}
+    assert bundle.errors == {"history": "boom"}
+
+
+_CASE = {"Id": "500A", "CaseNumber": "00001150", "Subject": "SSO login fails"}
+_COMMENTS = [{"CommentBody": "first", "CreatedDate": "2024-01-02"}, {"CommentBody": "second", "CreatedDate": "2024-01-01"}]
+_HISTORY = [{"Field": "Status", "OldValue": "New", "NewValue": "Working", "CreatedDate": "2024-01-01"}]
+
+
+class _FakeSalesforce:
+    """Answers the child-subquery statement, the per-part statements and the Composite request."""
+
+    sf_version = "59.0"
+
+    def __init__(self, reject_subqueries=False):
+        self.reject_subqueries = reject_subqueries
+        self.queries, self.composite_requests = [], []
+
+    def query(self, soql, **kwargs):
+        from simple_salesforce.exceptions import SalesforceMalformedRequest
+
+        self.queries.append(soql)
+        if "FROM CaseComments" in soql:
+            if self.reject_subqueries:
+                raise SalesforceMalformedRequest("query", 400, "query", b"Didn't understand relationship 'Feeds'")
+            case = dict(_CASE)
+            # Child results come back like query results; comments span two pages
+            case["CaseComments"] = {"done": False, "nextRecordsUrl": "/comments-2", "records": _COMMENTS[:1]}
+            case["Histories"] = {"done": True, "records": list(_HISTORY)}
+            case["Feeds"] = None
+            return {"done": True, "records": [case]}
+        if "FROM CaseComment " in soql:
+            return {"done": True, "records": list(_COMMENTS)}
+        if "FROM CaseHistory " in soql:
+            return {"done": True, "records": list(_HISTORY)}
+        if "FROM CaseFeed " in soql:
+            return {"done": True, "records": []}
+        return {"done": True, "records": []}
+
+    def query_more(self, url, **kwargs):
+        assert url == "/comments-2"
+        return {"done": True, "records": _COMMENTS[1:]}
+
+    def restful(self, path, method="GET", json=None, **kwargs):
+        assert path == "composite" and method == "POST"
+        self.composite_requests.append(json)
+        return {"compositeResponse": [
+            {"referenceId": "case", "httpStatusCode": 200, "body": {"done": True, "records": [dict(_CASE)]}},
+            {"referenceId": "comments", "httpStatusCode": 200, "body": {"done": True, "records": list(_COMMENTS)}},
+            {"referenceId": "feed", "httpStatusCode": 400, "body": [{"errorCode": "INVALID_TYPE"}]},
+        ]}
+
+
+def _with_fake_salesforce(fake, test):
+    from salesforce import case_queries
+
+    original = case_queries.sf
+    case_queries.sf = fake
+    try:
+        return test()
+    finally:
+        case_queries.sf = original
+
+
+def test_related_children_match_the_per_part_loaders():
+    from agent import agent_core
+    from salesforce import case_queries
+
+    fake = _FakeSalesforce()
+    case, related, errors = _with_fake_salesforce(
+        fake, lambda: case_queries.get_case_with_related(case_id="500A", parts=("comments", "history", "feed"))
+    )
+    assert len(fake.queries) == 1, "case and children in one statement"
+    assert case == _CASE, "child relationships are popped off the case"
+    assert errors == {}
+
+    # Same shapes as the one-query-per-part loaders
+    for part, loader in (
+        ("comments", agent_core._load_case_comments),
+        ("history", agent_core._load_case_history),
+        ("feed", agent_core._load_case_feed),
+    ):
+        records, source, _ = _with_fake_salesforce(_FakeSalesforce(), lambda: loader("500A"))
+        assert source == "salesforce" and related[part] == records, part
+
+
+def test_rejected_relationship_falls_back_to_composite():
+    from salesforce import case_queries
+
+    fake = _FakeSalesforce(reject_subqueries=True)
+    case, related, errors = _with_fake_salesforce(
+        fake, lambda: case_queries.get_case_with_related(case_number="00001150", parts=("comments", "feed"))
+    )
+    request = fake.composite_requests[0]
+    assert [r["referenceId"] for r in request["compositeRequest"]] == ["case", "comments", "feed"]
+    assert "@{case.records[0].Id}" in request["compositeRequest"][1]["url"]
+    assert case == _CASE and related == {"comments": _COMMENTS}
+    assert "INVALID_TYPE" in errors["feed"], "a failing part is reported, the rest is served"
+
+
+def test_bundle_in_subquery_mode():
+    from agent import agent_core
+    from salesforce.case_cache import case_cache
+
+    fake = _FakeSalesforce()
+    original_mode = agent_core._FETCH_MODE
+    agent_core._FETCH_MODE = "subquery"
+    try:
+        bundle = _with_fake_salesforce(
+            fake, lambda: agent_core._load_case_bundle(case_number="00001150", parts=("comments", "history"))
+        )
+    finally:
+        agent_core._FETCH_MODE = original_mode
+        case_cache.invalidate("500A")
+
+    assert len(fake.queries) == 1
+    assert bundle.source == "salesforce" and bundle.case["Id"] == "500A"
+    assert bundle.parts == {"comments": _COMMENTS, "history": _HISTORY} and bundle.errors == {}
+
+
+def test_requested_parts():
+    from agent.agent_core import _requested_parts
+
+    assert _requested_parts("show comments for case 1") == ("comments",)
+    assert _requested_parts("history and feed for case 1") == ("history", "feed")
+    assert _requested_parts("full context for case 1") == ("comments", "history", "feed")
+    assert _requested_parts("status of case 1") == ()
+
+
+if __name__ == "__main__":
+    test_bundle_loads_parts_concurrently()
+    test_related_children_match_the_per_part_loaders()
+    test_rejected_relationship_falls_back_to_composite()
+    test_bundle_in_subquery_mode()
+    test_requested_parts()
+    print("✅ case bundle tests passed")
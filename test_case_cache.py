@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the read-through case cache (no Salesforce connection needed)
+"""
+
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _case(case_id, number, modstamp="2024-01-01T00:00:00.000+0000", status="New"):
+    return {"Id": case_id, "CaseNumber": number, "Status": status, "SystemModstamp": modstamp}
+
+
+def test_hit_miss_and_number_index():
+    from salesforce.case_cache import CaseCache
+
+    calls = []
+
+    def loader(key):
+        calls.append(key)
+        return [_case("500A", "00001159")]
+
+    cache = CaseCache(clock=FakeClock(), background=False)
+    assert cache.get_by_number("00001159", loader)["Id"] == "500A"
+    assert cache.get_by_id("500A", loader)["CaseNumber"] == "00001159"
+    assert cache.get_by_number("00001159", loader)["Id"] == "500A"
+    assert calls == ["00001159"]
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] == 2
+
+
+def test_stale_entry_revalidated_by_modstamp():
+    from salesforce.case_cache import CaseCache
+
+    clock = FakeClock()
+    loads = []
+    cache = CaseCache(ttl_seconds=10, stale_ttl_seconds=100, clock=clock, background=False)
+    cache.put(_case("500A", "00001159"))
+
+    clock.now = 50  # stale, but within the stale window
+    record = cache.get_by_id("500A", lambda k: loads.append(k) or [], lambda k: "2024-01-01T00:00:00.000+0000")
+    assert record["Status"] == "New"
+    assert loads == []  # unchanged modstamp: no full reload
+    assert cache.stats()["revalidated"] == 1
+
+    clock.now = 100  # stale again, record changed upstream
+    cache.get_by_id("500A", lambda k: [_case("500A", "00001159", "2024-02-01T00:00:00.000+0000", "Closed")],
+                    lambda k: "2024-02-01T00:00:00.000+0000")
+    assert cache.peek("00001159")["Status"] == "Closed"
+
+
+def test_lru_eviction():
+    from salesforce.case_cache import CaseCache
+
+    cache = CaseCache(max_entries=2, clock=FakeClock(), background=False)
+    cache.put(_case("500A", "1"))
+    cache.put(_case("500B", "2"))
+    cache.get_by_id("500A", lambda k: [])  # touch A so B is least recent
+    cache.put(_case("500C", "3"))
+    assert cache.peek("500B") is None
+    assert cache.peek("2") is None
+    assert cache.peek("500A") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+if __name__ == "__main__":
+    test_hit_miss_and_number_index()
+    test_stale_entry_revalidated_by_modstamp()
+    test_lru_eviction()
+    print("✅ case cache tests passed")
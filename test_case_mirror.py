@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the local SQLite case mirror (Salesforce query results are stubbed)
+"""
+
+import sys
+import os
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def _case(case_id, number, subject, modstamp, description="", deleted=False):
+    return {
+        "Id": case_id,
+        "CaseNumber": number,
+        "Subject": subject,
+        "Description": description,
+        "Status": "New",
+        "Priority": "High",
+        "Contact": {"Name": "Ada"},
+        "LastModifiedDate": modstamp,
+        "SystemModstamp": modstamp,
+        "IsDeleted": deleted,
+    }
+
+
+class FakeQueryAll:
+    """Returns the queued batches in order, recording every SOQL statement."""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+        self.soql = []
+
+    def __call__(self, soql):
+        self.soql.append(soql)
+        return iter(self.batches.pop(0) if self.batches else [])
+
+
+def _mirror(tmp):
+    from salesforce.case_mirror import CaseMirror
+
+    return CaseMirror(os.path.join(tmp, "mirror.db"))
+
+
+def test_incremental_sync_uses_watermark_and_applies_deletes():
+    with tempfile.TemporaryDirectory() as tmp:
+        mirror = _mirror(tmp)
+        assert not mirror.ready
+        fake = FakeQueryAll(
+            [
+                _case("500A", "00001001", "Printer offline", "2024-05-01T10:00:00.000+0000"),
+                _case("500B", "00001002", "VPN login failure", "2024-05-02T10:00:00.000+0000"),
+            ],
+            [
+                _case("500B", "00001002", "VPN login failure", "2024-05-03T08:30:00.000+0000", deleted=True),
+            ],
+        )
+        mirror.sync(fake)
+        assert mirror.ready
+        assert "WHERE" not in fake.soql[0]
+        assert mirror.stats()["cases"] == 2
+
+        mirror.sync(fake)
+        assert "SystemModstamp >= 2024-05-02T10:00:00Z" in fake.soql[1]
+        assert mirror.stats()["cases"] == 1
+        assert mirror.get("00001002") is None
+        assert mirror.watermark() == "2024-05-03T08:30:00.000+0000"
+
+
+def test_search_matches_terms_and_phrases():
+    with tempfile.TemporaryDirectory() as tmp:
+        mirror = _mirror(tmp)
+        mirror.sync(FakeQueryAll([
+            _case("500A", "00001001", "Printer offline", "2024-05-01T10:00:00.000+0000",
+                  description="Compliance ref ABC-1234 applies"),
+            _case("500B", "00001002", "Printer jam in lobby", "2024-05-02T10:00:00.000+0000"),
+        ]))
+
+        assert {r["Id"] for r in mirror.search("printer")} == {"500A", "500B"}
+        assert [r["Id"] for r in mirror.search("offline printer")] == ["500A"]
+        assert mirror.search("offline printer", phrase=True) == []
+        hit = mirror.search("ABC-1234", phrase=True)
+        assert [r["CaseNumber"] for r in hit] == ["00001001"]
+        assert hit[0]["Contact"] == {"Name": "Ada"}
+        assert mirror.search("   ") == []
+
+
+if __name__ == "__main__":
+    test_incremental_sync_uses_watermark_and_applies_deletes()
+    test_search_matches_terms_and_phrases()
+    print("✅ case mirror tests passed")
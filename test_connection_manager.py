@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the lazy Salesforce connection manager (simple_salesforce is stubbed)
+"""
+
+import sys
+import os
+import asyncio
+import tempfile
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+class FakeSalesforce:
+    logins = 0
+
+    def __init__(self, username=None, password=None, security_token=None, domain=None,
+                 session=None, session_id=None, instance=None, version="59.0"):
+        if session_id is None:
+            FakeSalesforce.logins += 1
+            session_id = f"token-{FakeSalesforce.logins}"
+        self.session_id = session_id
+        self.sf_instance = instance or "example.my.salesforce.com"
+        self.sf_version = version
+
+    def query(self, soql):
+        from simple_salesforce.exceptions import SalesforceExpiredSession
+
+        if self.session_id == "token-1" and "expire" in soql:
+            raise SalesforceExpiredSession("url", 401, "query", "INVALID_SESSION_ID")
+        return {"records": [{"session": self.session_id}]}
+
+
+def _manager(client_factory=FakeSalesforce, **kwargs):
+    from salesforce.connection import SalesforceConnectionManager
+
+    FakeSalesforce.logins = 0
+    return SalesforceConnectionManager(
+        username="user@example.com", password="pw", security_token="tok",
+        client_factory=client_factory, **kwargs
+    )
+
+
+def test_login_is_lazy_and_persisted():
+    from salesforce.connection import LazySalesforce
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "sf_session.json")
+        manager = _manager(cache_path=cache_path)
+        assert FakeSalesforce.logins == 0  # nothing happens at import/construction
+        sf = LazySalesforce(manager)
+        assert sf.query("SELECT Id FROM Case")["records"][0]["session"] == "token-1"
+        assert FakeSalesforce.logins == 1
+
+        restarted = _manager(cache_path=cache_path)
+        assert restarted.get().session_id == "token-1"
+        assert FakeSalesforce.logins == 0
+        assert restarted.status()["restored_sessions"] == 1
+
+
+def test_expired_session_is_refreshed_transparently():
+    from salesforce.connection import LazySalesforce
+
+    manager = _manager()
+    sf = LazySalesforce(manager)
+    result = sf.query("SELECT Id FROM Case -- expire")
+    assert result["records"][0]["session"] == "token-2"
+    assert manager.status()["session_refreshes"] == 1
+
+
+def test_failed_login_backs_off():
+    class Broken(FakeSalesforce):
+        def __init__(self, **kwargs):
+            FakeSalesforce.logins += 1
+            raise RuntimeError("INVALID_LOGIN")
+
+    manager = _manager(client_factory=Broken)
+    for _ in range(3):
+        try:
+            manager.get()
+        except RuntimeError:
+            pass
+    assert FakeSalesforce.logins == 1
+
+
+def test_async_get_logs_in_off_the_event_loop():
+    def slow_login(**kwargs):
+        time.sleep(0.3)
+        return FakeSalesforce(**kwargs)
+
+    manager = _manager(client_factory=slow_login)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        first = await manager.aget()
+        during_login = ticks
+        second = await manager.aget()
+        task.cancel()
+        return first, second, during_login
+
+    first, second, during_login = asyncio.run(run())
+    assert during_login >= 10, "the loop kept running while the login was in flight"
+    assert first is second and FakeSalesforce.logins == 1, "a fresh client is returned directly"
+
+
+if __name__ == "__main__":
+    test_async_get_logs_in_off_the_event_loop()
+    test_login_is_lazy_and_persisted()
+    test_expired_session_is_refreshed_transparently()
+    test_failed_login_backs_off()
+    print("✅ connection manager tests passed")
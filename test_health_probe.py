@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the background Salesforce health probe and the cached health endpoints
+"""
+
+import sys
+import os
+import asyncio
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+class _FakeProbe:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.001)
+        if self.fail:
+            raise ConnectionError("Salesforce unreachable")
+        return {"type": "salesforce_health", "ok": True, "status": "connected", "message": "✅ Connected"}
+
+
+def test_rolling_error_rate_and_readiness():
+    from salesforce.health_probe import HealthProber
+
+    now = [1000.0]
+    probe = _FakeProbe()
+    prober = HealthProber(interval_seconds=30, window=4, probe=probe, clock=lambda: now[0])
+    assert not prober.ready() and prober.snapshot()["error_rate"] is None
+
+    async def run():
+        await prober.check()
+        assert prober.ready()
+        probe.fail = True
+        for _ in range(3):
+            await prober.check()
+    asyncio.run(run())
+
+    snapshot = prober.snapshot()
+    assert not prober.ready(), "the last probe failed"
+    assert prober.last["ok"] is False and "unreachable" in prober.last["error"]
+    assert snapshot["error_rate"] == 0.75 and snapshot["consecutive_failures"] == 3
+    assert snapshot["latency_ms"]["p95"] >= snapshot["latency_ms"]["p50"] > 0
+
+    probe.fail = False
+    asyncio.run(prober.check())
+    assert prober.ready() and prober.snapshot()["error_rate"] == 0.75, "the first success left the window"
+    now[0] += 91
+    assert not prober.ready(), "a stale success no longer counts"
+
+
+def test_health_endpoints_answer_from_cache():
+    from fastapi.testclient import TestClient
+    from salesforce import health_probe
+    import api
+
+    probe = _FakeProbe()
+    original = health_probe.health_prober
+    prober = health_probe.health_prober = health_probe.HealthProber(interval_seconds=3600, probe=probe)
+    try:
+        with TestClient(api.app) as client:
+            for _ in range(20):
+                assert client.get("/health/salesforce").json()["ok"] is True
+            assert client.get("/health/ready").status_code == 200
+            assert probe.calls == 1, "only the background probe queried Salesforce"
+
+            client.get("/health/salesforce", params={"refresh": "true"})
+            assert probe.calls == 2
+
+            probe.fail = True
+            asyncio.run(prober.check())
+            assert client.get("/health/ready").status_code == 503
+            assert client.get("/health/live").status_code == 200, "liveness ignores Salesforce"
+            body = client.get("/health/salesforce").json()
+            assert body["ok"] is False and body["probe"]["consecutive_failures"] == 1
+        assert not prober.running, "stopped with the app"
+    finally:
+        health_probe.health_prober = original
+
+
+if __name__ == "__main__":
+    test_rolling_error_rate_and_readiness()
+    test_health_endpoints_answer_from_cache()
+    print("✅ Health probe tests passed")
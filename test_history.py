@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for the windowed follow-up history and context-version deltas
+"""
+
+import sys
+import os
+import json
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def _session_with_case():
+    from agent import agent_core
+    from agent.memory import MemoryStore
+
+    memory = MemoryStore()
+    state = memory.get("s")
+    state.case_data = {"case_number": "00001150", "subject": "SSO login fails", "description": "x" * 2000}
+    agent_core.history.reset(state)
+    return agent_core, memory, state
+
+
+def _no_subject_matches(test):
+    """Follow-up questions are tried as subject searches first; make those find nothing."""
+    def run():
+        from agent import agent_core
+
+        original = dict(agent_core._SYNC_OPS)
+        agent_core._SYNC_OPS.update(subject=lambda **kwargs: ([], "salesforce", None))
+        try:
+            test()
+        finally:
+            agent_core._SYNC_OPS.clear()
+            agent_core._SYNC_OPS.update(original)
+
+    run.__name__ = test.__name__
+    return run
+
+
+def _size(payload):
+    return len(json.dumps(payload, separators=(",", ":")))
+
+
+def test_history_is_windowed_and_folded():
+    from agent import history
+
+    agent_core, memory, state = _session_with_case()
+    for i in range(50):
+        history.append(state, {"q": f"question {i} " + "why " * 40, "a": ""})
+    assert len(state.level2_qa) <= history.HISTORY_MAX_TURNS
+    assert state.level2_qa[-1]["q"].startswith("question 49")
+    assert state.history_digest["turns"] + len(state.level2_qa) == 50
+    assert sum(len(q) for q in state.history_digest["questions"]) <= history.HISTORY_DIGEST_MAX_CHARS
+    assert history.context_version(state).endswith(".50")
+
+
+@_no_subject_matches
+def test_followup_payload_size_stays_flat_over_50_turns():
+    agent_core, memory, state = _session_with_case()
+    delta_memory = type(memory)()
+    delta_state = delta_memory.get("s")
+    delta_state.case_data = state.case_data
+    agent_core.history.reset(delta_state)
+
+    full_sizes, delta_sizes = [], []
+    version = None
+    for i in range(50):
+        question = "what do the connector logs and the IdP metadata show? " + "please " * (i % 3)
+        full = agent_core.handle_user_query(user_query=question, session_id="s", memory=memory)
+        full_sizes.append(_size(full))
+        # This client sends back the context_version of the response it holds
+        delta = agent_core.handle_user_query(
+            user_query=question, session_id="s", memory=delta_memory, context_version=version
+        )
+        delta_sizes.append(_size(delta))
+        version = delta["context_version"]
+
+    assert "case_context" in full["context_data"]
+    assert "case_context" not in delta["context_data"] and delta["context_data"]["context_base"]
+    assert delta["context_data"]["conversation_history"] == [], "the client already holds every earlier turn"
+    # Full payloads stop growing once the window and the digest are full; deltas never grow
+    from agent.history import HISTORY_DIGEST_MAX_CHARS
+
+    assert max(full_sizes) < full_sizes[5] + HISTORY_DIGEST_MAX_CHARS + 300
+    assert max(full_sizes[30:]) - min(full_sizes[30:]) < 200
+    assert max(delta_sizes[1:]) - min(delta_sizes[1:]) < 100
+    assert max(delta_sizes[1:]) < full_sizes[-1] / 3
+
+
+@_no_subject_matches
+def test_stale_context_version_gets_full_context():
+    agent_core, memory, state = _session_with_case()
+    first = agent_core.handle_user_query(user_query="who is the owner right now?", session_id="s", memory=memory)
+    for _ in range(20):
+        agent_core.handle_user_query(user_query="and what else was tried here?", session_id="s", memory=memory)
+
+    stale = agent_core.handle_user_query(
+        user_query="anything new?", session_id="s", memory=memory, context_version=first["context_version"]
+    )
+    assert "case_context" in stale["context_data"], "turns the client missed were folded away"
+    other = agent_core.handle_user_query(
+        user_query="anything new?", session_id="s", memory=memory, context_version="unknown.3"
+    )
+    assert "case_context" in other["context_data"]
+
+
+if __name__ == "__main__":
+    test_history_is_windowed_and_folded()
+    test_followup_payload_size_stays_flat_over_50_turns()
+    test_stale_context_version_gets_full_context()
+    print("✅ History tests passed")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-pass intent router, driven by intent_corpus.json
+"""
+
+import sys
+import os
+import json
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), 'intent_corpus.json')
+
+
+def load_corpus():
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_corpus_routes_deterministically():
+    from agent.intent_router import route
+
+    for entry in load_corpus():
+        intent = route(entry["query"])
+        assert intent.kind == entry["kind"], entry
+        for key in ("case_id", "case_number", "compliance_no", "subject"):
+            if key in entry:
+                assert getattr(intent, key) == entry[key], (entry, key)
+        assert list(intent.parts) == entry.get("parts", []), entry
+
+
+def test_phrase_automaton_reports_overlapping_phrases():
+    from agent.intent_router import PhraseAutomaton
+
+    automaton = PhraseAutomaton(["follow", "followup", "up", "in progress", "progress"])
+    found = sorted(automaton.matches("followup on in progress"))
+    assert found == [(0, "follow"), (0, "followup"), (6, "up"), (12, "in progress"), (15, "progress")]
+
+
+def test_extractions_only_run_when_routing_reaches_them():
+    from agent.intent_router import route
+
+    intent = route("status of case 00001166")
+    assert intent.kind == "case_number" and intent.wants_status
+    assert "compliance_no" not in vars(intent) and "subject" not in vars(intent)
+
+
+def test_ordinal_replies():
+    from agent.intent_router import extract_ordinal
+
+    assert extract_ordinal("the second one") == 2
+    assert extract_ordinal("Open the 3rd case.") == 3
+    assert extract_ordinal("#4") == extract_ordinal("option 4") == extract_ordinal("4") == 4
+    assert extract_ordinal("the last one please") == -1
+    assert extract_ordinal("is the first fix deployed?") is None
+    assert extract_ordinal("00001159") is None
+
+
+if __name__ == "__main__":
+    test_corpus_routes_deterministically()
+    test_phrase_automaton_reports_overlapping_phrases()
+    test_extractions_only_run_when_routing_reaches_them()
+    test_ordinal_replies()
+    print("✅ intent router tests passed")
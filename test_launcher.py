@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-worker launcher helpers and fork-safe logging
+"""
+
+import sys
+import os
+import io
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def test_worker_count():
+    from launcher import available_cpus, worker_count
+
+    assert available_cpus() >= 1
+    assert worker_count("3") == 3
+    assert worker_count("auto") == worker_count("0") == available_cpus()
+    assert worker_count("-2") == 1
+
+
+def test_mcp_runs_stateless_only_with_several_workers():
+    import launcher
+    from tools.ask_tool import _stateless_http_default
+
+    original = launcher.available_cpus
+    try:
+        launcher.available_cpus = lambda: 1
+        assert not _stateless_http_default("auto"), "auto on one core is a single worker"
+        assert not _stateless_http_default("1")
+        assert _stateless_http_default("2")
+        launcher.available_cpus = lambda: 4
+        assert _stateless_http_default("auto") and _stateless_http_default("0")
+    finally:
+        launcher.available_cpus = original
+
+
+def test_forked_worker_logs_once():
+    from observability import log
+
+    out = io.StringIO()
+    log.configure(stream=out)
+    logger = log.get_logger("test_launcher")
+    read_end, write_end = os.pipe()
+    try:
+        logger.info("before fork")
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_end)
+            logger.info("in worker")
+            log.flush()
+            os.write(write_end, out.getvalue().encode())
+            os._exit(0)
+        os.close(write_end)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_end) as f:
+            child_output = f.read()
+    finally:
+        log.configure()
+    assert "in worker" in child_output
+    assert child_output.count("before fork") <= 1, "records queued before fork are not written again"
+
+
+if __name__ == "__main__":
+    test_worker_count()
+    test_mcp_runs_stateless_only_with_several_workers()
+    test_forked_worker_logs_once()
+    print("✅ Launcher tests passed")
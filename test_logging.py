@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for the structured, queue-backed logging layer
+"""
+
+import sys
+import os
+import io
+import json
+import logging
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def test_truncate_record_payloads():
+    from observability.log import truncate
+
+    records = [{"Id": f"500{i:015d}", "CommentBody": "x" * 100} for i in range(50)]
+    text = truncate(records, 120)
+    assert text.startswith("[50 items] [{") and text.endswith("chars)")
+    assert len(text) < 160
+    assert truncate("short", 120) == "short"
+    assert len(truncate("y" * 1000, 0)) == 1000  # 0 disables truncation
+
+
+def test_debug_sampling():
+    from observability.log import DebugSampler
+
+    def record(level):
+        return logging.LogRecord("sf_agent.t", level, __file__, 1, "msg", (), None)
+
+    never = DebugSampler(0.0)
+    assert not never.filter(record(logging.DEBUG))
+    assert never.filter(record(logging.INFO)) and never.filter(record(logging.WARNING))
+    assert DebugSampler(1.0).filter(record(logging.DEBUG))
+    half = DebugSampler(0.5)
+    kept = sum(half.filter(record(logging.DEBUG)) for _ in range(2000))
+    assert 800 < kept < 1200
+
+
+def test_json_lines_written_off_thread():
+    from observability import log as obs_log
+
+    class SlowStream(io.StringIO):
+        def write(self, s):
+            time.sleep(0.05)  # a blocked stderr must not slow the caller down
+            return super().write(s)
+
+    stream = SlowStream()
+    obs_log.configure(level="DEBUG", fmt="json", sample_rate=1.0, max_chars=40, stream=stream)
+    try:
+        logger = obs_log.get_logger("test")
+        started = time.perf_counter()
+        for i in range(10):
+            logger.info("🔍 Routed query", kind="case_number", attempt=i, sosl="FIND {" + "z" * 100 + "}")
+        assert time.perf_counter() - started < 0.05
+        obs_log.flush()
+    finally:
+        obs_log.configure()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(lines) == 10
+    assert lines[0]["msg"] == "🔍 Routed query" and lines[0]["logger"] == "sf_agent.test"
+    assert lines[3]["attempt"] == 3 and lines[0]["sosl"].endswith("chars)")
+
+
+if __name__ == "__main__":
+    test_truncate_record_payloads()
+    test_debug_sampling()
+    test_json_lines_written_off_thread()
+    print("✅ logging tests passed")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded session store (idle TTL, LRU eviction, shared case data)
+"""
+
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_idle_sessions_expire():
+    from agent.memory import MemoryStore
+
+    clock = _Clock()
+    store = MemoryStore(idle_ttl_seconds=60, clock=clock)
+    state = store.get("a")
+    state.level2_qa.append({"q": "why?", "a": "because"})
+    store.save(state)
+
+    clock.now += 30
+    assert store.get("a").level2_qa, "session used within the TTL is kept"
+    clock.now += 61
+    assert store.get("a").level2_qa == [], "idle session starts over"
+    assert store.stats()["evictions"]["expired"] == 1
+
+
+def test_least_recently_used_session_is_evicted():
+    from agent.memory import MemoryStore
+
+    store = MemoryStore(max_sessions=2, clock=_Clock())
+    store.get("a")
+    store.get("b")
+    store.get("a")  # "b" is now least recently used
+    store.get("c")
+    assert len(store) == 2
+    assert store.stats()["evictions"]["max_sessions"] == 1
+    assert store.get("a").session_id == "a"
+
+    store = MemoryStore(max_bytes=4000, clock=_Clock())
+    for session_id in ("a", "b"):
+        state = store.get(session_id)
+        state.level2_qa = [{"q": "x" * 1000, "a": "y" * 1000}]
+        store.save(state)
+    assert len(store) == 1, "the older session is dropped to stay under max_bytes"
+    assert store.stats()["evictions"]["max_bytes"] == 1
+    assert store.total_bytes <= 4000
+
+
+def test_identical_case_data_is_shared():
+    from agent.memory import MemoryStore
+
+    store = MemoryStore(clock=_Clock())
+    states = []
+    for session_id in ("a", "b"):
+        state = store.get(session_id)
+        state.case_data = {"case_number": "00001150", "subject": "Printer on fire", "comments": ["a" * 500]}
+        store.save(state)
+        states.append(state)
+    assert states[0].case_data is states[1].case_data
+    stats = store.stats()
+    assert stats["shared_case_data"] == 1 and stats["case_data_reused"] == 1
+
+    pooled_bytes = stats["shared_case_data_bytes"]
+    for state in states:
+        state.case_data = None
+        store.save(state)
+    assert store.stats()["shared_case_data_bytes"] == 0 < pooled_bytes
+
+
+def test_query_flow_saves_the_session():
+    from agent import agent_core
+    from agent.memory import MemoryStore
+
+    store = MemoryStore(clock=_Clock())
+    saved = []
+    original_save = store.save
+    store.save = lambda state: (saved.append(state.session_id), original_save(state))
+    original = dict(agent_core._SYNC_OPS)
+    empty = lambda **kwargs: ([], "salesforce", None)
+    agent_core._SYNC_OPS.update(in_progress=empty, subject=empty, search=lambda **kwargs: [])
+    try:
+        agent_core.handle_user_query(user_query="any in progress cases?", session_id="s1", memory=store)
+    finally:
+        agent_core._SYNC_OPS.clear()
+        agent_core._SYNC_OPS.update(original)
+    assert saved == ["s1"]
+
+
+if __name__ == "__main__":
+    test_idle_sessions_expire()
+    test_least_recently_used_session_is_evicted()
+    test_identical_case_data_is_shared()
+    test_query_flow_saves_the_session()
+    print("✅ Memory store tests passed")
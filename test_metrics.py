@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Test script for latency spans and the Prometheus /metrics endpoint (Salesforce calls are stubbed)
+"""
+
+import sys
+import os
+import asyncio
+from contextlib import contextmanager
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def test_exposition_format():
+    from observability.metrics import Counter, Histogram, Registry
+
+    registry = Registry()
+    calls = registry.register(Counter("t_calls", "Calls", ("function",)))
+    latency = registry.register(Histogram("t_seconds", "Latency", ("stage",), buckets=(0.1, 1.0)))
+    calls.inc(function='say "hi"')
+    latency.observe(0.1, stage="intent")
+    latency.observe(3, stage="intent")
+
+    text = registry.render()
+    assert '# TYPE t_calls counter\nt_calls_total{function="say \\"hi\\""} 1\n' in text
+    assert 't_seconds_bucket{stage="intent",le="0.1"} 1' in text  # upper bounds are inclusive
+    assert 't_seconds_bucket{stage="intent",le="1"} 1' in text
+    assert 't_seconds_bucket{stage="intent",le="+Inf"} 2' in text
+    assert 't_seconds_count{stage="intent"} 2' in text and 't_seconds_sum{stage="intent"} 3.1' in text
+
+
+def test_traced_query_outcomes():
+    from observability import metrics
+    from observability.tracing import traced_query
+
+    @traced_query
+    def lookup(found):
+        if found is None:
+            raise RuntimeError("down")
+        return [{"Id": "500A"}] if found else []
+
+    @traced_query
+    async def alookup():
+        return [{"Id": "500A"}]
+
+    lookup(True)
+    lookup(False)
+    try:
+        lookup(None)
+    except RuntimeError:
+        pass
+    asyncio.run(alookup())
+    for outcome in ("ok", "empty", "error"):
+        assert metrics.salesforce_requests.value(function="lookup", outcome=outcome) == 1
+    assert metrics.salesforce_seconds.count(function="alookup", outcome="ok") == 1
+
+
+def test_query_stages_and_endpoint():
+    from fastapi.testclient import TestClient
+    from agent import async_agent
+    from agent.agent_core import CaseBundle
+    from observability import metrics
+    import api
+
+    async def bundle(**kwargs):
+        return CaseBundle(case={"Id": "500A", "CaseNumber": kwargs["case_number"]}, source="salesforce", detail=None)
+
+    original = async_agent._ASYNC_OPS["bundle"]
+    async_agent._ASYNC_OPS["bundle"] = bundle
+    before = metrics.queries.value(query_type="case_response", outcome="ok")
+    try:
+        client = TestClient(api.app)
+        assert client.post("/query", json={"query": "show case 00001234"}).json()["type"] == "case_response"
+        response = client.get("/metrics")
+    finally:
+        async_agent._ASYNC_OPS["bundle"] = original
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert metrics.queries.value(query_type="case_response", outcome="ok") == before + 1
+    for stage in ("intent", "load.bundle", "payload", "serialize", "serialize.json"):
+        assert f'sf_agent_stage_duration_seconds_count{{stage="{stage}",outcome="ok"}}' in response.text, stage
+
+
+def test_spans_exported_to_tracer():
+    from observability import tracing
+
+    class FakeSpan:
+        def __init__(self):
+            self.attributes = {}
+
+        def set_attribute(self, key, value):
+            self.attributes[key] = value
+
+    class FakeTracer:
+        def __init__(self):
+            self.spans = []
+
+        @contextmanager
+        def start_as_current_span(self, name):
+            self.spans.append((name, FakeSpan()))
+            yield self.spans[-1][1]
+
+    tracer = FakeTracer()
+    tracing.reset_tracer(tracer)
+    try:
+        with tracing.span("intent", session_id="s1") as s:
+            s.set(kind="case_number")
+    finally:
+        tracing.reset_tracer(None)
+
+    name, exported = tracer.spans[0]
+    assert name == "intent"
+    assert exported.attributes == {"session_id": "s1", "kind": "case_number", "outcome": "ok"}
+
+
+if __name__ == "__main__":
+    test_exposition_format()
+    test_traced_query_outcomes()
+    test_query_stages_and_endpoint()
+    test_spans_exported_to_tracer()
+    print("✅ metrics tests passed")
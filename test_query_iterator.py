@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the paginated SOQL iterator (Salesforce client is stubbed)
+"""
+
+import sys
+import os
+import asyncio
+from itertools import islice
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+class PagedSalesforce:
+    """Serves `pages` pages of two records each, recording every request."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def _page(self, index):
+        last = index == self.pages - 1
+        page = {
+            "records": [{"Id": f"500{index}{n}"} for n in range(2)],
+            "done": last,
+        }
+        if not last:
+            page["nextRecordsUrl"] = f"/services/data/v59.0/query/01g-{index + 1}"
+        return page
+
+    def query(self, soql, headers=None):
+        self.requests.append(("query", headers))
+        return self._page(0)
+
+    def query_more(self, url, identifier_is_url=False, headers=None):
+        self.requests.append(("query_more", url))
+        return self._page(int(url.rsplit("-", 1)[1]))
+
+
+def _with_fake_sf(fake):
+    from salesforce import case_queries
+
+    original = case_queries.sf
+    case_queries.sf = fake
+    return case_queries, original
+
+
+def test_pages_are_fetched_lazily():
+    fake = PagedSalesforce(pages=5)
+    case_queries, original = _with_fake_sf(fake)
+    try:
+        first_three = list(islice(case_queries.iter_query("SELECT Id FROM Case"), 3))
+    finally:
+        case_queries.sf = original
+    assert [r["Id"] for r in first_three] == ["50000", "50001", "50010"]
+    assert [kind for kind, _ in fake.requests] == ["query", "query_more"]
+    assert fake.requests[0][1] == {"Sforce-Query-Options": "batchSize=200"}
+
+
+def test_row_cap_stops_fetching():
+    fake = PagedSalesforce(pages=50)
+    case_queries, original = _with_fake_sf(fake)
+    try:
+        records = case_queries.search_cases_by_keywords("login", max_rows=5)
+    finally:
+        case_queries.sf = original
+    assert len(records) == 5
+    assert len(fake.requests) == 3  # 3 pages of 2 rows cover the cap of 5
+
+
+def test_page_ending_at_the_cap_is_the_last_fetched():
+    fake = PagedSalesforce(pages=50)
+    case_queries, original = _with_fake_sf(fake)
+    try:
+        records = list(case_queries.iter_query("SELECT Id FROM Case", max_rows=4))
+    finally:
+        case_queries.sf = original
+    assert len(records) == 4 and len(fake.requests) == 2
+
+    class AsyncPaged(PagedSalesforce):
+        async def query_more(self, url, headers=None):
+            return PagedSalesforce.query_more(self, url)
+
+    from salesforce import async_case_queries
+
+    async_fake = AsyncPaged(pages=50)
+    original_async = async_case_queries.async_sf
+    async_case_queries.async_sf = async_fake
+
+    async def collect():
+        first = async_fake.query("SELECT Id FROM Case")
+        return [r async for r in async_case_queries.aiter_result(first, max_rows=4)]
+    try:
+        assert len(asyncio.run(collect())) == 4
+    finally:
+        async_case_queries.async_sf = original_async
+    assert len(async_fake.requests) == 2
+
+
+def test_all_pages_followed_without_cap():
+    fake = PagedSalesforce(pages=4)
+    case_queries, original = _with_fake_sf(fake)
+    try:
+        records = list(case_queries.iter_query("SELECT Id FROM Case", max_rows=None))
+    finally:
+        case_queries.sf = original
+    assert len(records) == 8
+
+
+if __name__ == "__main__":
+    test_pages_are_fetched_lazily()
+    test_row_cap_stops_fetching()
+    test_page_ending_at_the_cap_is_the_last_fetched()
+    test_all_pages_followed_without_cap()
+    print("✅ query iterator tests passed")
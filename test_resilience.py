@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the Salesforce retry / circuit breaker layer (no network needed)
+"""
+
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+import requests
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _guard(clock, max_attempts=3):
+    from salesforce.resilience import CircuitBreaker, ResilienceGuard, RetryPolicy
+
+    breaker = CircuitBreaker(failure_rate_threshold=0.5, minimum_calls=4, window_seconds=60,
+                             open_seconds=10, clock=clock)
+    return ResilienceGuard(breaker=breaker, retry=RetryPolicy(max_attempts=max_attempts, base_delay_seconds=0))
+
+
+def test_transient_errors_are_retried():
+    guard = _guard(FakeClock())
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise requests.exceptions.ConnectionError("reset")
+        return "ok"
+
+    assert guard.call(flaky) == "ok"
+    assert len(attempts) == 3
+    assert guard.retries == 2
+
+
+def test_non_idempotent_and_client_errors_are_not_retried():
+    from simple_salesforce.exceptions import SalesforceMalformedRequest
+
+    guard = _guard(FakeClock())
+    attempts = []
+
+    def bad_query():
+        attempts.append(1)
+        raise SalesforceMalformedRequest("url", 400, "query", "MALFORMED_QUERY")
+
+    try:
+        guard.call(bad_query)
+    except SalesforceMalformedRequest:
+        pass
+
+    def timed_out_write():
+        attempts.append(1)
+        raise requests.exceptions.Timeout()
+
+    try:
+        guard.call(timed_out_write, idempotent=False)
+    except requests.exceptions.Timeout:
+        pass
+    assert len(attempts) == 2
+    assert guard.breaker.state == "closed"
+
+
+def test_breaker_opens_fails_fast_and_recovers():
+    from salesforce.resilience import CircuitOpenError
+
+    clock = FakeClock()
+    guard = _guard(clock, max_attempts=1)
+
+    def down():
+        raise requests.exceptions.ConnectionError("down")
+
+    for _ in range(4):
+        try:
+            guard.call(down)
+        except requests.exceptions.ConnectionError:
+            pass
+    assert guard.breaker.state == "open"
+
+    calls = []
+    try:
+        guard.call(lambda: calls.append(1))
+    except CircuitOpenError:
+        pass
+    assert calls == []  # failed fast without calling Salesforce
+
+    clock.now = 11  # open period elapsed: one probe is let through
+    assert guard.breaker.state == "half_open"
+    assert guard.call(lambda: "probe ok") == "probe ok"
+    assert guard.breaker.state == "closed"
+    assert guard.breaker.status()["times_opened"] == 1
+
+
+def test_case_cache_serves_last_known_record_during_outage():
+    from salesforce.case_cache import CaseCache
+    from salesforce.resilience import CircuitOpenError
+
+    clock = FakeClock()
+    cache = CaseCache(ttl_seconds=1, stale_ttl_seconds=1, clock=clock, background=False)
+    cache.put({"Id": "500A", "CaseNumber": "00001159", "Status": "New"})
+    clock.now = 100  # long expired
+
+    def breaker_open(_key):
+        raise CircuitOpenError("open")
+
+    assert cache.get_by_number("00001159", breaker_open)["Status"] == "New"
+    assert cache.stats()["fallbacks"] == 1
+
+
+if __name__ == "__main__":
+    test_transient_errors_are_retried()
+    test_non_idempotent_and_client_errors_are_not_retried()
+    test_breaker_opens_fails_fast_and_recovers()
+    test_case_cache_serves_last_known_record_during_outage()
+    print("✅ resilience tests passed")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the compact response format and versioned instruction templates
+"""
+
+import sys
+import os
+import json
+import asyncio
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+from bench_response_size import payloads, size
+
+
+def _walk_keys(value):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield key
+            yield from _walk_keys(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _walk_keys(item)
+
+
+def test_compact_drops_duplicates_and_metadata():
+    from agent.response_format import render
+
+    for name, payload in payloads().items():
+        out = render(payload, "compact")
+        keys = set(_walk_keys(out))
+        assert not keys & {"attributes", "raw_case", "raw_case_data"}, name
+        assert "instructions" not in out and out["instructions_ref"]["version"] >= 1, name
+        assert render(payload, "full") is payload
+
+    case_response = render(payloads()["case_response"], "compact")
+    assert case_response["case_id"] == "5003000000D8cuIAAR"
+    assert case_response["case_data"]["subject"].startswith("Jira connection")
+
+
+def test_instruction_refs_resolve():
+    from agent.instructions import INSTRUCTIONS
+    from tools.ask_tool import get_instructions
+
+    for name, payload in payloads().items():
+        ref = payload["instructions_ref"]
+        template = asyncio.run(get_instructions(ref["id"]))
+        assert template["version"] == ref["version"] and template["text"] == payload["instructions"], name
+    assert "error" in asyncio.run(get_instructions("nope"))
+    assert set(INSTRUCTIONS) == {"case_response", "technical_followup", "followup_answer", "knowledge_article"}
+
+
+def test_unknown_format_raises():
+    from agent.response_format import render
+
+    try:
+        render({"type": "error"}, "xml")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_typical_case_is_much_smaller():
+    from agent.response_format import render
+
+    payload = payloads()["case_response"]
+    assert size(payload) >= 3 * size(render(payload, "compact"))
+    json.dumps(render(payload, "compact"))
+
+
+if __name__ == "__main__":
+    test_compact_drops_duplicates_and_metadata()
+    test_instruction_refs_resolve()
+    test_unknown_format_raises()
+    test_typical_case_is_much_smaller()
+    print("✅ response format tests passed")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the concurrent subject search (Salesforce queries are stubbed)
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def _case(case_id, subject):
+    return {"Id": case_id, "CaseNumber": case_id[-4:], "Subject": subject}
+
+
+def test_merge_dedupes_and_ranks():
+    from agent.search_strategy import SearchRace
+
+    race = SearchRace()
+    race.record("sosl_subject", [_case("500A", "Printer jam"), _case("500B", "VPN printer offline")])
+    race.record("keywords", [_case("500B", "VPN printer offline"), _case("500C", "Printer offline")])
+    race.record_error("find_case", RuntimeError("boom"))
+
+    ranked = [r["Id"] for r in race.merged("printer offline")]
+    assert ranked == ["500B", "500A", "500C"]  # 500B was found twice
+    assert race.winner == "sosl_subject"
+    assert race.outcome("printer offline")[1] == "salesforce"
+
+
+def test_race_waits_for_better_backends_only():
+    from agent.search_strategy import SearchRace
+
+    race = SearchRace()
+    race.record("keywords", [_case("500C", "Printer offline")])
+    assert not race.settled  # the subject SOSL may still answer
+    race.record("sosl_subject", [])
+    assert race.settled and race.winner == "keywords"
+
+    failed = SearchRace()
+    for name in failed.backends:
+        failed.record_error(name, TimeoutError("slow"))
+    assert failed.settled
+    assert failed.outcome("x")[1] == "salesforce_error"
+
+
+def test_async_search_cancels_slower_backends():
+    from agent import async_agent
+    from salesforce import async_case_queries
+
+    cancelled = []
+
+    async def subject(subject, fields):
+        return [_case("500A", "Printer offline")]
+
+    async def slow(*args, **kwargs):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return []
+
+    originals = {name: getattr(async_case_queries, name)
+                 for name in ("get_case_by_subject", "search_cases_by_keywords", "find_case")}
+    async_case_queries.get_case_by_subject = subject
+    async_case_queries.search_cases_by_keywords = slow
+    async_case_queries.find_case = slow
+    try:
+        async def main():
+            started = time.perf_counter()
+            result = await async_agent._asearch_by_subject("printer offline", "summary")
+            await asyncio.sleep(0)  # let cancellations land
+            return result, time.perf_counter() - started
+
+        (records, source, _detail), elapsed = asyncio.run(main())
+    finally:
+        for name, fn in originals.items():
+            setattr(async_case_queries, name, fn)
+
+    assert [r["Id"] for r in records] == ["500A"] and source == "salesforce"
+    assert elapsed < 1
+    assert len(cancelled) == 2
+
+
+def test_sync_search_returns_without_waiting_for_slow_backend():
+    from agent import agent_core
+
+    release = threading.Event()
+    threads = []
+
+    def slow():
+        threads.append(threading.current_thread().name)
+        release.wait(5)
+        return []
+
+    original = agent_core._subject_backends
+    agent_core._subject_backends = lambda subject, fields: {
+        "sosl_subject": lambda: [],
+        "keywords": lambda: [_case("500C", "Printer offline")],
+        "find_case": slow,
+    }
+    try:
+        started = time.perf_counter()
+        records, source, _detail = agent_core._search_by_subject("printer offline", "summary")
+        elapsed = time.perf_counter() - started
+    finally:
+        agent_core._subject_backends = original
+        release.set()
+
+    assert [r["Id"] for r in records] == ["500C"] and source == "salesforce"
+    assert elapsed < 1
+    assert threads[0].startswith("subject-search"), "losing searches do not hold case bundle workers"
+
+
+if __name__ == "__main__":
+    test_merge_dedupes_and_ranks()
+    test_race_waits_for_better_backends_only()
+    test_async_search_cancels_slower_backends()
+    test_sync_search_returns_without_waiting_for_slow_backend()
+    print("✅ search strategy tests passed")
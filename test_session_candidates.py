@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test script for session candidate lists and their background prefetch (Salesforce calls are stubbed)
+"""
+
+import sys
+import os
+import threading
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def _listed(n):
+    return [
+        {"Id": f"500{i:015d}", "CaseNumber": f"{1150 + i:08d}", "Subject": f"Case {i}", "Status": "Working"}
+        for i in range(n)
+    ]
+
+
+def test_reply_picks_listed_case_by_position_or_number():
+    from agent import agent_core
+    from agent.agent_core import CaseBundle
+    from agent.memory import MemoryStore
+
+    listed = _listed(3)
+    calls = []
+
+    def in_progress(fields):
+        return listed, "salesforce", None
+
+    def prefetch(case_ids):
+        calls.append(("prefetch", tuple(case_ids)))
+        return case_ids
+
+    def bundle(**kwargs):
+        calls.append(("bundle", kwargs["case_id"], kwargs["case_number"]))
+        case = next(c for c in listed if c["Id"] == kwargs["case_id"])
+        return CaseBundle(case={**case, "Description": "details"}, source="salesforce", detail=None)
+
+    original = dict(agent_core._SYNC_OPS)
+    agent_core._SYNC_OPS.update(in_progress=in_progress, prefetch=prefetch, bundle=bundle)
+    memory = MemoryStore()
+    try:
+        listing = agent_core.handle_user_query(user_query="any in progress cases?", session_id="s", memory=memory)
+        second = agent_core.handle_user_query(user_query="the second one", session_id="s", memory=memory)
+        by_number = agent_core.handle_user_query(user_query="00001152", session_id="s", memory=memory)
+        last = agent_core.handle_user_query(user_query="the last one", session_id="s", memory=memory)
+    finally:
+        agent_core._SYNC_OPS.clear()
+        agent_core._SYNC_OPS.update(original)
+
+    assert listing["type"] == "in_progress_cases"
+    assert [c["Id"] for c in memory.get("s").candidates] == [c["Id"] for c in listed]
+    assert calls[0] == ("prefetch", tuple(c["Id"] for c in listed))
+    # Replies resolve to the listed Id, so the prefetched cache entry answers them
+    assert calls[1:] == [
+        ("bundle", listed[1]["Id"], None),
+        ("bundle", listed[2]["Id"], None),
+        ("bundle", listed[2]["Id"], None),
+    ]
+    assert second["type"] == by_number["type"] == last["type"] == "case_response"
+    assert second["case_number"] == "00001151"
+
+
+def test_case_loaded_by_number_drops_earlier_candidates():
+    from agent import agent_core
+    from agent.agent_core import CaseBundle
+    from agent.memory import MemoryStore
+
+    listed = _listed(3)
+    other = {"Id": "500999999999999999", "CaseNumber": "00009999", "Subject": "Unrelated", "Status": "New"}
+    calls = []
+
+    def subject(subject, fields):
+        calls.append(("subject", subject))
+        return (listed, "salesforce", None) if "printer" in subject else ([], "salesforce", None)
+
+    def bundle(**kwargs):
+        calls.append(("bundle", kwargs.get("case_id"), kwargs.get("case_number")))
+        case = other if kwargs.get("case_number") == other["CaseNumber"] else listed[1]
+        return CaseBundle(case={**case, "Description": "details"}, source="salesforce", detail=None)
+
+    original = dict(agent_core._SYNC_OPS)
+    agent_core._SYNC_OPS.update(subject=subject, prefetch=lambda case_ids: case_ids, bundle=bundle)
+    memory = MemoryStore()
+    try:
+        listing = agent_core.handle_user_query(user_query="show case details for printer offline", session_id="s", memory=memory)
+        loaded = agent_core.handle_user_query(user_query="00009999", session_id="s", memory=memory)
+        assert memory.get("s").candidates == []
+        agent_core.handle_user_query(user_query="the second one", session_id="s", memory=memory)
+    finally:
+        agent_core._SYNC_OPS.clear()
+        agent_core._SYNC_OPS.update(original)
+
+    assert listing["type"] == "case_search_results"
+    assert loaded["type"] == "case_response" and loaded["case_number"] == "00009999"
+    assert ("bundle", listed[1]["Id"], None) not in calls, "the ordinal did not resolve against the old list"
+
+
+def test_ordinal_without_candidates_is_not_a_pick():
+    from agent import agent_core
+    from agent.memory import MemoryStore
+
+    intent = agent_core.route("the second one")
+    assert agent_core._pick_candidate([], intent) is None
+    assert agent_core._pick_candidate(_listed(1), intent) is None  # out of range
+    assert MemoryStore().get("x").candidates == []
+
+
+def test_prefetch_loads_missing_ids_in_one_batch():
+    from salesforce.case_cache import CaseCache
+
+    cache = CaseCache(background=False)
+    listed = _listed(4)
+    cache.put(listed[0])
+    batches = []
+
+    def loader(case_ids):
+        batches.append(list(case_ids))
+        return [c for c in listed if c["Id"] in case_ids]
+
+    scheduled = cache.prefetch([c["Id"] for c in listed], loader)
+    assert batches == [scheduled] == [[c["Id"] for c in listed[1:]]]
+    assert cache.peek(listed[3]["CaseNumber"])["Subject"] == "Case 3"
+    assert cache.prefetch([c["Id"] for c in listed], loader) == []  # everything is cached now
+    assert cache.stats()["prefetched"] == 3
+
+
+def test_prefetch_does_not_block():
+    from salesforce.case_cache import CaseCache
+
+    cache = CaseCache()
+    release = threading.Event()
+
+    def slow_loader(case_ids):
+        release.wait(2)
+        return _listed(1)
+
+    try:
+        assert cache.prefetch(["500000000000000000"], slow_loader) == ["500000000000000000"]
+        assert cache.prefetch(["500000000000000000"], slow_loader) == []  # already in flight
+    finally:
+        release.set()
+
+
+if __name__ == "__main__":
+    test_reply_picks_listed_case_by_position_or_number()
+    test_case_loaded_by_number_drops_earlier_candidates()
+    test_ordinal_without_candidates_is_not_a_pick()
+    test_prefetch_loads_missing_ids_in_one_batch()
+    test_prefetch_does_not_block()
+    print("✅ session candidate tests passed")
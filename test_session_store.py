@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared session stores (SQLite, and Redis when fakeredis is installed)
+"""
+
+import sys
+import os
+import tempfile
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def _case_data(size=10):
+    return {"case_number": "00001150", "subject": "Printer on fire", "description": "smoke " * size}
+
+
+def test_serialization_is_compact_and_round_trips():
+    from agent.memory import SessionState
+    from agent.session_store import dumps, loads
+
+    state = SessionState(session_id="s", case_data=_case_data(), level2_qa=[{"q": "why?", "a": "toner"}])
+    small = dumps(state)
+    assert small.startswith(b"j") and b"candidates" not in small, "empty fields are left out"
+    assert loads("s", small, 3) == state
+    assert loads("s", small, 3).version == 3
+
+    state.case_data = _case_data(size=2000)
+    big = dumps(state)
+    assert big.startswith(b"z") and len(big) < 1000, "large bodies are compressed"
+    assert loads("s", big, 1).case_data == state.case_data
+
+
+def _check_store(make_store):
+    """Two stores on the same backend stand in for two workers."""
+    worker_a, worker_b = make_store(), make_store()
+
+    state = worker_a.get("s1")
+    state.case_data = _case_data()
+    worker_a.save(state)
+    followup = worker_b.get("s1")
+    assert followup.case_data == _case_data(), "a follow-up on another worker sees the session"
+
+    # Both workers answer a query on the same session version; the later save loses
+    first, second = worker_a.get("s1"), worker_b.get("s1")
+    first.level2_qa = [{"q": "first", "a": "1"}]
+    second.level2_qa = [{"q": "second", "a": "2"}]
+    worker_a.save(first)
+    worker_b.save(second)
+    assert worker_b.stats()["conflicts"] == 1
+    assert worker_b.get("s1").level2_qa == [{"q": "first", "a": "1"}]
+
+    worker_b.reset("s1")
+    assert worker_a.get("s1").case_data is None
+
+
+def test_sqlite_store_shares_sessions_between_workers():
+    from agent.session_store import SQLiteSessionStore, _SharedStore
+
+    class NoDelete(_SharedStore):
+        def _read(self, session_id):
+            return 0, None
+
+        def _write(self, session_id, data, expected_version):
+            return True
+
+    with pytest.raises(TypeError):
+        NoDelete()  # a backend missing a storage method fails when it is built
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        _check_store(lambda: SQLiteSessionStore(path))
+
+        now = [1000.0]
+        store = SQLiteSessionStore(path, idle_ttl_seconds=60, clock=lambda: now[0])
+        state = store.get("idle")
+        state.case_data = _case_data()
+        store.save(state)
+        now[0] += 61
+        expired = store.get("idle")
+        assert expired.case_data is None
+        store.save(expired)
+        assert store.stats()["conflicts"] == 0, "an expired session can be saved again"
+
+
+def test_redis_store_shares_sessions_between_workers():
+    fakeredis = pytest.importorskip("fakeredis")  # pip install -r requirements-dev.txt
+    from agent.session_store import RedisSessionStore
+
+    server = fakeredis.FakeServer()
+    _check_store(lambda: RedisSessionStore(fakeredis.FakeRedis(server=server), idle_ttl_seconds=60))
+
+    # Layout: one hash per session with the version and the serialized body, on a sliding TTL
+    client = fakeredis.FakeRedis(server=server)
+    store = RedisSessionStore(client, idle_ttl_seconds=60)
+    state = store.get("s2")
+    state.case_data = _case_data()
+    store.save(state)
+    store.save(state)
+    key = store.prefix + "s2"
+    assert sorted(client.hkeys(key)) == [b"d", b"v"] and client.hget(key, "v") == b"2"
+    assert 0 < client.ttl(key) <= 60
+    assert store.get("s2").version == 2 and store.get("s2").case_data == _case_data()
+
+
+if __name__ == "__main__":
+    test_serialization_is_compact_and_round_trips()
+    test_sqlite_store_shares_sessions_between_workers()
+    test_redis_store_shares_sessions_between_workers()
+    print("✅ Session store tests passed")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for coalescing identical concurrent Salesforce reads (no network needed)
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def test_concurrent_threads_share_one_request():
+    from salesforce.singleflight import SingleFlight, request_key
+
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow_query(case_number):
+        calls.append(case_number)
+        release.wait(5)
+        return [{"CaseNumber": case_number}]
+
+    results = []
+    key = request_key("get_case", ("00001159",), {})
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do(key, slow_query, "00001159")))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    while flight.coalesced < 4:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == ["00001159"]
+    assert len(results) == 5 and all(r is results[0] for r in results)
+    assert flight.stats() == {"enabled": True, "calls": 1, "coalesced": 4, "in_flight": 0}
+    assert request_key("s", (" vpn   login ",), {}) == request_key("s", ("vpn login",), {})
+
+
+def test_async_callers_share_result_and_errors():
+    from salesforce.singleflight import SingleFlight
+
+    flight = SingleFlight()
+    calls = []
+
+    async def query(text):
+        calls.append(text)
+        await asyncio.sleep(0.01)
+        if text == "bad":
+            raise ValueError("MALFORMED_QUERY")
+        return [text]
+
+    async def main():
+        ok = await asyncio.gather(*(flight.ado(("q", "vpn"), query, "vpn") for _ in range(3)))
+        bad = await asyncio.gather(*(flight.ado(("q", "bad"), query, "bad") for _ in range(3)),
+                                   return_exceptions=True)
+        again = await flight.ado(("q", "vpn"), query, "vpn")  # completed requests are not cached
+        return ok, bad, again
+
+    ok, bad, again = asyncio.run(main())
+    assert ok == [["vpn"]] * 3 and again == ["vpn"]
+    assert all(isinstance(e, ValueError) for e in bad)
+    assert calls == ["vpn", "bad", "vpn"]
+    assert flight.coalesced == 4
+
+
+def test_request_is_cancelled_once_every_waiter_is_gone():
+    from salesforce.singleflight import SingleFlight
+
+    flight = SingleFlight()
+    cancelled = []
+
+    async def slow_query():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def main():
+        waiters = [asyncio.ensure_future(flight.ado("slow", slow_query)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        waiters[0].cancel()
+        await asyncio.sleep(0.01)
+        assert cancelled == []  # the second waiter still wants the result
+        waiters[1].cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert cancelled == [1]
+    assert flight.stats()["in_flight"] == 0
+
+
+if __name__ == "__main__":
+    test_concurrent_threads_share_one_request()
+    test_async_callers_share_result_and_errors()
+    test_request_is_cancelled_once_every_waiter_is_gone()
+    print("✅ single-flight tests passed")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the SOQL/SOSL builder and projection selection (no network needed)
+"""
+
+import sys
+import os
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+
+
+def test_literals_are_escaped():
+    from salesforce import soql
+    from salesforce.case_queries import case_by_number_query, cases_by_keywords_query
+
+    assert soql.literal("User's \\ login") == "'User\\'s \\\\ login'"
+    assert soql.contains("50%_off") == "'%50\\%\\_off%'"
+    assert soql.in_list(["New", "In Progress"]) == "('New', 'In Progress')"
+    assert soql.sosl_term("ABC-1234 (urgent)") == "ABC\\-1234 \\(urgent\\)"
+    assert "CaseNumber = '0001\\' OR Id != \\''" in case_by_number_query("0001' OR Id != '")
+    query = cases_by_keywords_query("vpn", limit=5, fields="summary")
+    assert "Description LIKE '%vpn%'" in query and "Description," not in query
+    assert query.endswith("ORDER BY LastModifiedDate DESC LIMIT 5")
+
+
+def test_field_sets_widen_from_status_to_full():
+    from salesforce import soql
+
+    status, summary, full = (set(soql.CASE_FIELD_SETS[name]) for name in ("status", "summary", "full"))
+    assert status < summary < full
+    assert "Description" in full - summary
+    assert soql.has_fields({"Id": 1, "CaseNumber": 2, "Subject": 3, "Status": 4, "Priority": 5,
+                            "LastModifiedDate": 6}, "status")
+    try:
+        soql.case_fields("everything")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown field set accepted")
+
+
+def test_single_search_hit_is_upgraded_to_full_projection():
+    from agent import agent_core
+    from agent.agent_core import CaseBundle
+    from agent.memory import MemoryStore
+
+    calls = []
+    summary_hit = {"Id": "500000000000001AAA", "CaseNumber": "00001001", "Subject": "Printer offline"}
+    full_case = {**summary_hit, "Description": "Printer on floor 3 is offline"}
+
+    def subject(subject, fields):
+        calls.append(("subject", fields))
+        return [summary_hit], "salesforce", None
+
+    def bundle(**kwargs):
+        calls.append(("bundle", kwargs["case_id"]))
+        return CaseBundle(case=full_case, source="salesforce", detail=None)
+
+    original = dict(agent_core._SYNC_OPS)
+    agent_core._SYNC_OPS.update(subject=subject, bundle=bundle)
+    try:
+        result = agent_core.handle_user_query(
+            user_query="show case details for printer offline", session_id="s1", memory=MemoryStore()
+        )
+    finally:
+        agent_core._SYNC_OPS.update(original)
+
+    assert calls == [("subject", "summary"), ("bundle", "500000000000001AAA")]
+    assert result["type"] == "case_response"
+    assert result["raw_case"]["Description"] == "Printer on floor 3 is offline"
+
+
+if __name__ == "__main__":
+    test_literals_are_escaped()
+    test_field_sets_widen_from_status_to_full()
+    test_single_search_hit_is_upgraded_to_full_projection()
+    print("✅ SOQL builder tests passed")